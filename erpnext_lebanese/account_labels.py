@@ -0,0 +1,301 @@
+"""
+Per-company, per-language index of localized Account labels.
+
+Each (company, language) pair is one Redis hash keyed by Account name, so the Chart of
+Accounts tree is served straight from the cache. The index is built on first use with a
+single Account query over the accounts' own name columns (``account_name``, ``arabic_name``,
+``french_name``) and kept current by the Account doc events registered in hooks.py, which
+rewrite or drop only the entry of the account that changed.
+
+Every change to a company's labels also bumps its version token (`get_labels_version`), so
+clients keeping a copy of the labels can ask whether it is still current, and which
+accounts changed since their version (`get_changed_names`).
+"""
+import pickle
+import re
+import time
+
+import frappe
+from frappe.utils import cstr
+
+from erpnext_lebanese.chart import get_chart_hash, is_lebanese_chart
+from erpnext_lebanese.single_flight import single_flight
+
+LANGUAGES = ("en", "ar", "fr")
+
+# Account column holding the name in each language (see custom_fields.py)
+NAME_FIELDS = {"en": "account_name", "ar": "arabic_name", "fr": "french_name"}
+LABEL_FIELDS = ["name", "account_number", *NAME_FIELDS.values()]
+LABEL_CACHE_PREFIX = "lebanese_account_labels"
+VERSION_CACHE_PREFIX = "lebanese_account_labels_version"
+
+# Accounts remembered per company for delta responses; older changes need a full reload
+CHANGE_LOG_SIZE = 5000
+
+# Field marking a fully built index; an empty company still gets one
+BUILT_MARKER = "__built__"
+
+
+def normalise_language(language: str | None) -> str:
+	"""Map a locale such as "ar-LB" or "fr_FR" to one of ``LANGUAGES``, English by default."""
+	lower = cstr(language).lower()
+	if lower.startswith("ar"):
+		return "ar"
+	if lower.startswith("fr"):
+		return "fr"
+
+	return "en"
+
+
+def uses_lebanese_labels(company: str | None) -> bool:
+	"""Whether ``company`` was set up from a Lebanese chart and so has localized labels."""
+	if not company:
+		return False
+
+	return is_lebanese_chart(frappe.get_cached_value("Company", company, "chart_of_accounts"))
+
+
+def get_company_labels(company: str, language: str) -> dict[str, dict[str, str]]:
+	"""Return ``{account name: {"label", "english"}}`` for ``company`` in ``language``."""
+	labels = _read_company_labels(company, language)
+	if labels is not None:
+		return labels
+
+	# Concurrent first requests for a company share one build
+	return single_flight(
+		f"labels::{company}",
+		lambda: build_company_labels(company)[language],
+		lambda: _read_company_labels(company, language),
+	)
+
+
+def get_labels_for(company: str, language: str, names: list[str]) -> dict[str, dict[str, str]]:
+	"""Return the labels of ``names`` only, read with a single HMGET from the company's index."""
+	if not names:
+		return {}
+
+	cache = frappe.cache()
+	raw = cache.hmget(cache.make_key(_cache_key(company, language)), [BUILT_MARKER, *names])
+	if raw[0] is None:
+		labels = get_company_labels(company, language)
+		return {name: labels[name] for name in names if name in labels}
+
+	labels = {name: pickle.loads(value) for name, value in zip(names, raw[1:]) if value is not None}
+
+	missing = [name for name in names if name not in labels]
+	if missing:
+		# Accounts written without doc events (bulk tools, direct SQL) are indexed on demand
+		accounts = frappe.get_all(
+			"Account",
+			filters={"company": company, "name": ["in", missing]},
+			fields=LABEL_FIELDS,
+		)
+		for account in accounts:
+			for lang in LANGUAGES:
+				label = build_label(account, lang)
+				cache.hset(_cache_key(company, lang), account.name, label)
+				if lang == language:
+					labels[account.name] = label
+		if accounts:
+			bump_labels_version(company, [account.name for account in accounts])
+
+	return labels
+
+
+def build_company_labels(company: str) -> dict[str, dict[str, dict[str, str]]]:
+	"""(Re)build the index of every language for ``company`` from one Account query."""
+	accounts = frappe.get_all(
+		"Account",
+		filters={"company": company},
+		fields=LABEL_FIELDS,
+	)
+
+	by_language = {language: {} for language in LANGUAGES}
+	for account in accounts:
+		for language in LANGUAGES:
+			by_language[language][account.name] = build_label(account, language)
+
+	cache = frappe.cache()
+	pipeline = cache.pipeline()
+	for language, labels in by_language.items():
+		key = cache.make_key(_cache_key(company, language))
+		pipeline.delete(key)
+		for name, label in labels.items():
+			pipeline.hset(key, name, pickle.dumps(label))
+		pipeline.hset(key, BUILT_MARKER, pickle.dumps(True))
+	pipeline.execute()
+
+	return by_language
+
+
+def clear_company_labels(company: str) -> None:
+	"""Drop the index of ``company``; it is rebuilt on the next request."""
+	for language in LANGUAGES:
+		frappe.cache().delete_value(_cache_key(company, language))
+	bump_labels_version(company)
+
+
+def get_labels_version(company: str) -> str:
+	"""
+	Token that changes whenever the labels of ``company`` (or the chart behind them) may have.
+
+	The counter starts from the current time in milliseconds, so a counter lost with the
+	cache never hands out a token an earlier client already holds.
+	"""
+	cache = frappe.cache()
+	key = cache.make_key(_version_key(company))
+	version = cache.get(key)
+	if version is None:
+		initial = _initial_version()
+		if cache.set(key, initial, nx=True):
+			# Nothing before this point is in the change log
+			cache.set(cache.make_key(_floor_key(company)), initial)
+		version = cache.get(key)
+
+	return f"{int(version)}-{get_chart_hash()[:12]}"
+
+
+def bump_labels_version(company: str, names: list[str] | None = None) -> None:
+	"""
+	Invalidate the labels clients hold for ``company``, if any were handed out.
+
+	With ``names`` the change is logged for delta responses; without, every earlier version
+	needs a full reload.
+	"""
+	cache = frappe.cache()
+	key = cache.make_key(_version_key(company))
+	# Without a counter no client holds a token yet: nothing to invalidate. ``key`` is already
+	# prefixed (`exists` would prefix it again), so it is read raw
+	if cache.get(key) is None:
+		return
+
+	version = cache.incr(key)
+	log_key = cache.make_key(_changes_key(company))
+	floor_key = cache.make_key(_floor_key(company))
+	if not names:
+		cache.delete(log_key)
+		cache.set(floor_key, version)
+		return
+
+	cache.zadd(log_key, {name: version for name in names})
+	excess = cache.zcard(log_key) - CHANGE_LOG_SIZE
+	if excess > 0:
+		dropped = cache.zrange(log_key, 0, excess - 1, withscores=True)
+		cache.zremrangebyrank(log_key, 0, excess - 1)
+		cache.set(floor_key, int(dropped[-1][1]))
+
+
+def get_changed_names(company: str, since: str | None) -> list[str] | None:
+	"""
+	Accounts of ``company`` whose labels changed after version ``since``, or ``None`` when
+	the change log cannot tell (unknown, too old or other-chart version): reload everything.
+	"""
+	counter, _, chart_hash = cstr(since).partition("-")
+	current_counter, _, current_hash = get_labels_version(company).partition("-")
+	if not counter.isdigit() or chart_hash != current_hash or int(counter) > int(current_counter):
+		return None
+
+	cache = frappe.cache()
+	floor = cache.get(cache.make_key(_floor_key(company)))
+	if floor is None or int(counter) < int(floor):
+		return None
+
+	changed = cache.zrangebyscore(cache.make_key(_changes_key(company)), f"({counter}", "+inf")
+	return [frappe.safe_decode(name) for name in changed]
+
+
+def build_label(account, language: str) -> dict[str, str]:
+	"""Label of ``account`` in ``language`` from its own name columns, English as fallback."""
+	account_number = cstr(account.get("account_number")).strip()
+	english_label = cstr(account.get("account_name")).strip() or account.name
+	display_text = cstr(account.get(NAME_FIELDS[language])).strip() or english_label
+
+	if account_number:
+		if not display_text.startswith(account_number):
+			display_text = f"{account_number} - {display_text}"
+		if not english_label.startswith(account_number):
+			english_label = f"{account_number} - {english_label}"
+
+	return {"label": display_text, "english": english_label}
+
+
+def resolve_account_number(account) -> str:
+	account_number = cstr(getattr(account, "account_number", "")).strip()
+	if account_number:
+		return account_number
+
+	# Attempt to extract from the account name (e.g. "1000 - Equity ...")
+	name = cstr(getattr(account, "name", "")).strip()
+	match = re.match(r"^([\d\.]+)\s*-", name)
+	if match:
+		return match.group(1).strip()
+
+	return ""
+
+
+def on_account_update(doc, method=None):
+	"""Account after_insert / on_update: refresh this account's entry in every language."""
+	if _is_indexed(doc.company):
+		cache = frappe.cache()
+		for language in LANGUAGES:
+			cache.hset(_cache_key(doc.company, language), doc.name, build_label(doc, language))
+	# Also without an index: the version covers the account search index too
+	bump_labels_version(doc.company, [doc.name])
+
+
+def on_account_rename(doc, method=None, old=None, new=None, merge=False):
+	"""Account after_rename: move the entry from the old name to the new one."""
+	if _is_indexed(doc.company):
+		cache = frappe.cache()
+		for language in LANGUAGES:
+			key = _cache_key(doc.company, language)
+			cache.hdel(key, old)
+			cache.hset(key, new, build_label(doc, language))
+	bump_labels_version(doc.company, [old, new])
+
+
+def on_account_trash(doc, method=None):
+	"""Account on_trash: drop the entry."""
+	if _is_indexed(doc.company):
+		cache = frappe.cache()
+		for language in LANGUAGES:
+			cache.hdel(_cache_key(doc.company, language), doc.name)
+	bump_labels_version(doc.company, [doc.name])
+
+
+def _read_company_labels(company: str, language: str) -> dict | None:
+	# hgetall unpickles the values but leaves the field names as bytes
+	labels = {
+		frappe.safe_decode(name): label
+		for name, label in frappe.cache().hgetall(_cache_key(company, language)).items()
+	}
+	if BUILT_MARKER not in labels:
+		return None
+
+	labels.pop(BUILT_MARKER)
+	return labels
+
+
+def _is_indexed(company: str | None) -> bool:
+	# Companies without a built index (non-Lebanese ones included) have nothing to maintain
+	return bool(company) and frappe.cache().hexists(_cache_key(company, LANGUAGES[0]), BUILT_MARKER)
+
+
+def _cache_key(company: str, language: str) -> str:
+	return f"{LABEL_CACHE_PREFIX}::{company}::{language}"
+
+
+def _version_key(company: str) -> str:
+	return f"{VERSION_CACHE_PREFIX}::{company}"
+
+
+def _changes_key(company: str) -> str:
+	return f"{VERSION_CACHE_PREFIX}::{company}::changes"
+
+
+def _floor_key(company: str) -> str:
+	return f"{VERSION_CACHE_PREFIX}::{company}::floor"
+
+
+def _initial_version() -> int:
+	return int(time.time() * 1000)
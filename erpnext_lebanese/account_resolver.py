@@ -0,0 +1,155 @@
+"""
+Account number -> Account name resolution, per company.
+
+Each company's map is one Redis hash keyed by account number, loaded with a single Account
+query on first use and kept current by the Account doc events registered in hooks.py.
+Accounts inserted without doc events (bulk chart installs, chart sync, clones) are looked
+up on demand and added to the map, so a miss only costs a query. Hits are not checked: an
+account deleted or renumbered without doc events (direct SQL) stays in the map until
+`clear_account_map` is called for its company. The app's own SQL writers never delete or
+renumber accounts.
+
+Entries written while the transaction has uncommitted writes may name its new accounts, so
+the map is dropped if that transaction rolls back. Entries written outside one (read-only
+requests, which Frappe ends with a rollback) are committed state and kept.
+"""
+import functools
+import pickle
+
+import frappe
+from frappe.utils import cstr
+
+ACCOUNT_MAP_PREFIX = "lebanese_account_numbers"
+
+# Field marking a fully loaded map; a company without accounts still gets one
+BUILT_MARKER = "__built__"
+
+
+def resolve_account(company: str, account_number: str) -> str | None:
+	"""Name of the Account numbered ``account_number`` in ``company``, if any."""
+	return resolve_accounts(company, (account_number,)).get(account_number)
+
+
+def resolve_accounts(company: str, account_numbers) -> dict[str, str]:
+	"""Map each of ``account_numbers`` found in ``company`` to its Account name."""
+	numbers = [cstr(number).strip() for number in account_numbers if cstr(number).strip()]
+	if not company or not numbers:
+		return {}
+
+	cache = frappe.cache()
+	raw = cache.hmget(cache.make_key(_cache_key(company)), [BUILT_MARKER, *numbers])
+	if raw[0] is None:
+		accounts = load_account_map(company)
+		return {number: accounts[number] for number in numbers if number in accounts}
+
+	resolved = {number: pickle.loads(value) for number, value in zip(numbers, raw[1:]) if value is not None}
+
+	missing = [number for number in numbers if number not in resolved]
+	if missing:
+		found = _query_accounts(company, missing)
+		if found:
+			_set_entries(company, found)
+			resolved.update(found)
+
+	return resolved
+
+
+def load_account_map(company: str) -> dict[str, str]:
+	"""(Re)load the whole map of ``company`` from one Account query."""
+	accounts = _query_accounts(company)
+
+	cache = frappe.cache()
+	key = cache.make_key(_cache_key(company))
+	pipeline = cache.pipeline()
+	pipeline.delete(key)
+	for number, name in accounts.items():
+		pipeline.hset(key, number, pickle.dumps(name))
+	pipeline.hset(key, BUILT_MARKER, pickle.dumps(True))
+	pipeline.execute()
+	_clear_on_rollback(company)
+
+	return accounts
+
+
+def clear_account_map(company: str) -> None:
+	"""Drop the map of ``company``; it is reloaded on the next lookup."""
+	frappe.cache().delete_value(_cache_key(company))
+
+
+def on_account_update(doc, method=None):
+	"""Account after_insert / on_update: point the account's number at it."""
+	if not _is_loaded(doc.company):
+		return
+
+	before = doc.get_doc_before_save() if method == "on_update" else None
+	old_number = cstr(before.account_number).strip() if before else ""
+	number = cstr(doc.account_number).strip()
+	if old_number and old_number != number:
+		frappe.cache().hdel(_cache_key(doc.company), old_number)
+	if number:
+		_set_entries(doc.company, {number: doc.name})
+
+
+def on_account_rename(doc, method=None, old=None, new=None, merge=False):
+	"""Account after_rename: renumbering goes through a rename, so reload the whole map."""
+	clear_account_map(doc.company)
+
+
+def on_account_trash(doc, method=None):
+	"""Account on_trash: drop the account's number."""
+	number = cstr(doc.account_number).strip()
+	if number and _is_loaded(doc.company):
+		frappe.cache().hdel(_cache_key(doc.company), number)
+
+
+def on_company_trash(doc, method=None):
+	"""Company on_trash: drop the company's map."""
+	clear_account_map(doc.name)
+
+
+def _query_accounts(company: str, numbers: list[str] | None = None) -> dict[str, str]:
+	filters = {"company": company, "account_number": ["in", numbers] if numbers else ["is", "set"]}
+	# Newest first, so the oldest account wins a duplicated number
+	rows = frappe.get_all(
+		"Account", filters=filters, fields=["account_number", "name"], order_by="creation desc", as_list=True
+	)
+	return {cstr(number).strip(): name for number, name in rows}
+
+
+def _set_entries(company: str, entries: dict[str, str]) -> None:
+	cache = frappe.cache()
+	for number, name in entries.items():
+		cache.hset(_cache_key(company), number, name)
+	_clear_on_rollback(company)
+
+
+def _clear_on_rollback(company: str) -> None:
+	if not frappe.db.transaction_writes:
+		# Nothing uncommitted for the entries to name
+		return
+
+	# Entries may name accounts of the running transaction: forget them if it rolls back
+	pending = getattr(frappe.local, "lebanese_account_maps_pending", None)
+	if pending is None:
+		pending = frappe.local.lebanese_account_maps_pending = set()
+	if company in pending:
+		return
+
+	pending.add(company)
+	frappe.db.after_rollback.add(functools.partial(_settle, company, clear=True))
+	frappe.db.after_commit.add(functools.partial(_settle, company))
+
+
+def _settle(company: str, clear: bool = False) -> None:
+	getattr(frappe.local, "lebanese_account_maps_pending", set()).discard(company)
+	if clear:
+		clear_account_map(company)
+
+
+def _is_loaded(company: str | None) -> bool:
+	# Companies without a loaded map have nothing to maintain
+	return bool(company) and frappe.cache().hexists(_cache_key(company), BUILT_MARKER)
+
+
+def _cache_key(company: str) -> str:
+	return f"{ACCOUNT_MAP_PREFIX}::{company}"
@@ -0,0 +1,283 @@
+"""
+Typeahead search over the accounts of a Lebanese company by number or English, Arabic or
+French name.
+
+Each worker keeps one `AccountSearchIndex` per site and company: a prefix map from every
+normalised word prefix (and account number prefix) to the accounts having it, built from one
+Account query. A query costs one Redis read (the company's label version, see
+`account_labels`), which tells when the index must be rebuilt, and a few dictionary lookups.
+
+Account link fields use the index through `search_link` (overriding Frappe's) only when
+they search the accounts of a Lebanese company; every other link search, and Lebanese ones
+with filters the index cannot answer, go to Frappe's own search unchanged.
+
+Arabic is normalised before indexing and searching: diacritics and tatweel are dropped,
+alef/hamza variants fold to bare alef (and hamza carriers to their letter), alef maqsura to
+yaa and taa marbuta to haa. Latin text is case- and accent-folded.
+"""
+import json
+import re
+import unicodedata
+
+import frappe
+from frappe.core.doctype.user_permission.user_permission import get_user_permissions
+from frappe.desk.search import build_for_autosuggest, search_widget
+from frappe.desk.search import search_link as frappe_search_link
+from frappe.utils import cint, cstr
+
+from erpnext_lebanese.account_labels import (
+	LABEL_FIELDS,
+	LANGUAGES,
+	build_label,
+	get_labels_version,
+	normalise_language,
+	uses_lebanese_labels,
+)
+
+# Longest prefix kept in the map; longer words are checked against the candidates
+MAX_PREFIX = 12
+DEFAULT_LIMIT = 20
+
+# Company indexes kept per worker
+MAX_INDEXES = 32
+
+# Link field filters answered from the index; any other filter goes to the database
+INDEXED_FILTERS = ("company", "is_group", "disabled", "account_type", "root_type", "report_type", "account_currency")
+CHECK_FILTERS = ("is_group", "disabled")
+
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+ARABIC_LETTERS = str.maketrans(
+	{
+		"أ": "ا",  # alef with hamza above
+		"إ": "ا",  # alef with hamza below
+		"آ": "ا",  # alef with madda
+		"ٱ": "ا",  # alef wasla
+		"ؤ": "و",  # waw with hamza
+		"ئ": "ي",  # yaa with hamza
+		"ى": "ي",  # alef maqsura
+		"ة": "ه",  # taa marbuta
+	}
+)
+WORD = re.compile(r"[\w.]+")
+
+# (site, company) -> index; one worker may serve several sites
+_indexes: dict[tuple[str, str], "AccountSearchIndex"] = {}
+
+
+class AccountSearchIndex:
+	__slots__ = ("filters", "labels", "names", "numbers", "parents", "positions", "prefixes", "tokens", "version")
+
+	def __init__(self, version: str, accounts: list[dict]):
+		self.version = version
+		self.names = [account.name for account in accounts]
+		self.positions = {name: position for position, name in enumerate(self.names)}
+		self.numbers = [cstr(account.account_number).strip() for account in accounts]
+		self.parents = [account.parent_account for account in accounts]
+		self.labels = {
+			language: [build_label(account, language)["label"] for account in accounts] for language in LANGUAGES
+		}
+		self.filters = {
+			fieldname: [account.get(fieldname) for account in accounts] for fieldname in INDEXED_FILTERS[1:]
+		}
+
+		self.tokens = []
+		prefixes: dict[str, set[int]] = {}
+		for position, account in enumerate(accounts):
+			text = " ".join(cstr(account.get(fieldname)) for fieldname in LABEL_FIELDS)
+			tokens = set(tokenize(text))
+			if self.numbers[position]:
+				tokens.add(self.numbers[position])
+			self.tokens.append(tuple(tokens))
+			for token in tokens:
+				for length in range(1, min(len(token), MAX_PREFIX) + 1):
+					prefixes.setdefault(token[:length], set()).add(position)
+
+		self.prefixes = {prefix: frozenset(positions) for prefix, positions in prefixes.items()}
+
+	def search(self, txt: str, filters: dict | None = None) -> list[int]:
+		"""Positions of the accounts having a word starting with every word of ``txt``, best first."""
+		words = tokenize(txt)
+		if not words:
+			return []
+
+		matches = None
+		for word in sorted(words, key=len, reverse=True):
+			positions = self.prefixes.get(word[:MAX_PREFIX], frozenset())
+			if len(word) > MAX_PREFIX:
+				positions = {p for p in positions if any(token.startswith(word) for token in self.tokens[p])}
+			matches = positions if matches is None else matches & positions
+			if not matches:
+				return []
+
+		for fieldname, value in (filters or {}).items():
+			column = self.filters[fieldname]
+			if fieldname in CHECK_FILTERS:
+				matches = [p for p in matches if cint(column[p]) == cint(value)]
+			else:
+				matches = [p for p in matches if cstr(column[p]) == cstr(value)]
+
+		first = words[0]
+
+		def rank(position):
+			number = self.numbers[position]
+			return (
+				0 if number == first else 1 if number.startswith(first) else 2,
+				cint(self.filters["is_group"][position]),
+				number or "~",
+				self.names[position],
+			)
+
+		return sorted(matches, key=rank)
+
+	def path(self, position: int) -> list[str]:
+		"""Names of the ancestors of the account at ``position``, root first."""
+		path = []
+		parent = self.parents[position]
+		while parent and parent in self.positions and len(path) < 32:
+			path.append(parent)
+			parent = self.parents[self.positions[parent]]
+		return path[::-1]
+
+
+def normalise(text: str) -> str:
+	"""Case-, accent- and Arabic-letter-folded form of ``text`` used for indexing and search."""
+	text = ARABIC_DIACRITICS.sub("", cstr(text)).translate(ARABIC_LETTERS)
+	decomposed = unicodedata.normalize("NFKD", text.casefold())
+	# Only Latin accents are combining marks here; Arabic marks were removed above
+	return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> list[str]:
+	return [word.strip(".") for word in WORD.findall(normalise(text)) if word.strip(".")]
+
+
+def get_search_index(company: str) -> AccountSearchIndex:
+	"""This worker's index of ``company``, rebuilt when the company's labels version moved."""
+	version = get_labels_version(company)
+	key = (frappe.local.site, company)
+	index = _indexes.get(key)
+	if index is None or index.version != version:
+		accounts = frappe.get_all(
+			"Account",
+			filters={"company": company},
+			fields=[*LABEL_FIELDS, *INDEXED_FILTERS[1:], "parent_account"],
+			order_by="lft",
+		)
+		_indexes.pop(key, None)
+		if len(_indexes) >= MAX_INDEXES:
+			_indexes.pop(next(iter(_indexes)))
+		index = _indexes[key] = AccountSearchIndex(version, accounts)
+	return index
+
+
+@frappe.whitelist()
+def search_accounts(
+	company: str,
+	txt: str,
+	language: str | None = None,
+	limit: int = DEFAULT_LIMIT,
+	include_disabled=False,
+):
+	"""
+	Accounts of ``company`` matching ``txt`` by number or name in any language, best first.
+
+	Each result has the account ``value`` (name), its ``label`` in ``language``, its
+	``account_number``, ``is_group`` and the ``path`` of ancestors to expand in the tree.
+	"""
+	frappe.has_permission("Account", "read", throw=True)
+	if not company or not cstr(txt).strip():
+		return []
+
+	if _has_user_permissions():
+		filters = {"company": company, **({} if cint(include_disabled) else {"disabled": 0})}
+		return [
+			{"value": row[0], "label": row[0], "account_number": "", "is_group": 0, "path": []}
+			for row in search_widget("Account", txt, page_length=cint(limit) or DEFAULT_LIMIT, filters=filters)
+		]
+
+	language = normalise_language(language or frappe.local.lang)
+	index = get_search_index(company)
+	filters = None if cint(include_disabled) else {"disabled": 0}
+
+	return [
+		{
+			"value": index.names[position],
+			"label": index.labels[language][position],
+			"account_number": index.numbers[position],
+			"is_group": cint(index.filters["is_group"][position]),
+			"path": index.path(position),
+		}
+		for position in index.search(txt, filters)[: cint(limit) or DEFAULT_LIMIT]
+	]
+
+
+@frappe.whitelist()
+def search_link(
+	doctype: str,
+	txt: str,
+	query: str | None = None,
+	filters=None,
+	page_length: int = 10,
+	searchfield: str | None = None,
+	reference_doctype: str | None = None,
+	ignore_user_permissions: bool = False,
+):
+	"""
+	`frappe.desk.search.search_link`, answered from the index for Account link fields of a
+	Lebanese company without a query of their own. Any other search goes to Frappe's.
+	"""
+	if doctype == "Account" and not query and not ignore_user_permissions:
+		parsed = json.loads(filters) if isinstance(filters, str) and filters else filters
+		if _uses_index(txt, parsed):
+			results = account_query(doctype, txt, searchfield or "name", 0, page_length, parsed)
+			return build_for_autosuggest(results, doctype=doctype)
+
+	return frappe_search_link(
+		doctype,
+		txt,
+		query=query,
+		filters=filters,
+		page_length=page_length,
+		searchfield=searchfield,
+		reference_doctype=reference_doctype,
+		ignore_user_permissions=ignore_user_permissions,
+	)
+
+
+@frappe.whitelist()
+@frappe.validate_and_sanitize_search_inputs
+def account_query(doctype, txt, searchfield, start, page_len, filters):
+	"""
+	Account search by number or name in any language (a link field ``query``).
+
+	Lebanese companies are searched through the index when the filters are plain equality
+	filters on indexed fields; everything else is answered by Frappe's standard search.
+	"""
+	if _uses_index(txt, filters):
+		index = get_search_index(filters["company"])
+		language = normalise_language(frappe.local.lang)
+		filters = {"disabled": 0, **{key: value for key, value in filters.items() if key != "company"}}
+		positions = index.search(txt, filters)[cint(start) : cint(start) + cint(page_len)]
+		return [(index.names[p], index.labels[language][p]) for p in positions]
+
+	return search_widget(
+		doctype, txt, searchfield=searchfield, start=start, page_length=page_len, filters=filters
+	)
+
+
+def _uses_index(txt, filters) -> bool:
+	"""Whether the index can answer a search for ``txt`` with ``filters``."""
+	if not cstr(txt).strip() or not isinstance(filters, dict) or not filters.get("company"):
+		return False
+	if not set(filters) <= set(INDEXED_FILTERS):
+		return False
+	if any(isinstance(value, (list, tuple, dict)) for value in filters.values()):
+		return False
+	return uses_lebanese_labels(filters["company"]) and not _has_user_permissions()
+
+
+def _has_user_permissions() -> bool:
+	# The index holds every account of the company: users restricted by user permissions
+	# go through permission-checked list queries instead
+	user_permissions = get_user_permissions()
+	return bool(user_permissions.get("Account") or user_permissions.get("Company"))
@@ -1,162 +1,141 @@
-import json
-import re
-from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import frappe
-from frappe.utils import cstr
-
-METADATA_KEYS = {
-	"account_name",
-	"account_number",
-	"account_type",
-	"root_type",
-	"is_group",
-	"tax_rate",
-	"account_currency",
-	"arabic_name",
-	"french_name",
-}
+from frappe.utils import cint
+
+from erpnext_lebanese.account_labels import (
+	get_changed_names,
+	get_company_labels,
+	get_labels_for,
+	get_labels_version,
+	normalise_language,
+	resolve_account_number,
+	uses_lebanese_labels,
+)
 
 SUPPORTED_LANGUAGES = {"en", "ar", "fr"}
 
 
 @frappe.whitelist()
-def get_account_language_labels(company: str, language: Optional[str] = "en") -> Dict[str, Dict[str, str]]:
-	"""Return localized account labels for the Chart of Accounts tree view."""
+def get_account_language_labels(
+	company: str,
+	language: Optional[str] = "en",
+	parents: Optional[List[str]] = None,
+	names: Optional[List[str]] = None,
+	version: Optional[str] = None,
+	delta: bool = False,
+	compact: bool = False,
+) -> Dict[str, Dict[str, str]]:
+	"""
+	Return localized account labels for the Chart of Accounts tree view.
+
+	Without ``parents``/``names`` every account of the company is returned. With ``parents``
+	only the children of those accounts are returned, and with ``names`` only those accounts,
+	so the tree can load labels node by node as it expands.
+
+	Every response carries the company's label ``version``. A full request sending the
+	version the client already holds gets ``not_modified`` back instead of the labels; with
+	``delta`` it gets only the labels changed since that version, plus the ``removed``
+	accounts, whenever the change log still covers it.
+
+	With ``compact`` the labels come as parallel arrays (see `_compact_labels`).
+	"""
 	if not company:
 		return {"enabled": False, "labels": {}}
 
-	lang_code = _normalise_language(language)
+	lang_code = normalise_language(language)
+	delta = cint(delta)
+	compact = cint(compact)
 
-	company_row = frappe.db.get_value(
-		"Company",
-		company,
-		["chart_of_accounts"],
-		as_dict=True,
-	)
-
-	if not company_row:
-		return {"enabled": False, "labels": {}}
-
-	chart_name = (company_row.chart_of_accounts or "").strip()
-	if not chart_name or "lebanese" not in chart_name.lower():
+	if not uses_lebanese_labels(company):
 		return {"enabled": False, "labels": {}}
 
-	chart_tree = _get_cached_chart_tree()
-	number_to_labels = _build_label_map(chart_tree)
-
-	accounts = frappe.get_all(
-		"Account",
-		filters={"company": company},
-		fields=["name", "account_number", "account_name"],
-	)
-
-	labels: Dict[str, Dict[str, str]] = {}
-
-	for account in accounts:
-		account_number = _resolve_account_number(account)
-		default_label = account.account_name or account.name
-
-		translations = number_to_labels.get(account_number) if account_number else None
-
-		selected_label = None
-		english_label = None
-
-		if translations:
-			selected_label = translations.get(lang_code) or translations.get("en")
-			english_label = translations.get("en")
-
-		selected_label = selected_label or default_label
-		english_label = english_label or default_label
-
-		display_text = selected_label or ""
-		if account_number and display_text:
-			if not display_text.startswith(account_number):
-				display_text = f"{account_number} - {display_text}"
-
-		if account_number and english_label:
-			if not english_label.startswith(account_number):
-				english_label = f"{account_number} - {english_label}"
-
-		labels[account.name] = {
-			"label": display_text or english_label or "",
-			"english": english_label or default_label or "",
+	parents = _parse_list(parents)
+	names = _parse_list(names)
+	partial = parents is not None or names is not None
+
+	# Read before the labels: a change racing this request then only costs a refetch
+	current_version = get_labels_version(company)
+	if version and not partial and version == current_version:
+		return {"enabled": True, "language": lang_code, "version": current_version, "not_modified": True}
+
+	changed = get_changed_names(company, version) if version and delta and not partial else None
+	if changed is not None:
+		labels = get_labels_for(company, lang_code, changed)
+		return {
+			"enabled": True,
+			"language": lang_code,
+			"version": current_version,
+			"delta": True,
+			"removed": [name for name in changed if name not in labels],
+			"labels": _compact_labels(company, labels) if compact else labels,
 		}
 
+	if partial:
+		requested = list(names or [])
+		if parents:
+			requested += frappe.get_all(
+				"Account",
+				filters={"company": company, "parent_account": ["in", parents]},
+				pluck="name",
+			)
+		labels = get_labels_for(company, lang_code, list(dict.fromkeys(requested)))
+	else:
+		labels = get_company_labels(company, lang_code)
+
 	return {
 		"enabled": True,
 		"language": lang_code,
-		"labels": labels,
+		"partial": partial,
+		"version": current_version,
+		"labels": _compact_labels(company, labels) if compact else labels,
 	}
 
 
-def _normalise_language(language: Optional[str]) -> str:
-	if not language:
-		return "en"
-
-	lower = language.lower()
-	if lower.startswith("ar"):
-		return "ar"
-	if lower.startswith("fr"):
-		return "fr"
+def _compact_labels(company: str, labels: Dict[str, Dict[str, str]]) -> Dict[str, list]:
+	"""
+	Encode ``{name: {"label", "english"}}`` as parallel arrays.
+
+	The company suffix (" - ABBR") is sent once and cut from the names when every name has
+	it. When a row's name and labels all start with "<number> - ", that prefix is cut from
+	them and the number sent alone. ``english`` is null where it equals ``label``. The client
+	rebuilds each entry by putting the prefix and suffix back.
+	"""
+	abbr = frappe.get_cached_value("Company", company, "abbr")
+	suffix = f" - {abbr}" if abbr else ""
+	if not suffix or not all(name.endswith(suffix) for name in labels):
+		suffix = ""
+
+	names, numbers, texts, english = [], [], [], []
+	for name, entry in labels.items():
+		stem = name[: len(name) - len(suffix)] if suffix else name
+		label = entry.get("label") or ""
+		english_label = entry.get("english") or ""
+
+		number = resolve_account_number(frappe._dict(name=name))
+		prefix = f"{number} - "
+		if not number or not all(text.startswith(prefix) for text in (stem, label, english_label)):
+			number, prefix = "", ""
+
+		names.append(stem[len(prefix) :])
+		numbers.append(number)
+		texts.append(label[len(prefix) :])
+		english.append(None if english_label == label else english_label[len(prefix) :])
 
-	return "en"
-
-
-def _get_cached_chart_tree() -> Dict:
-	cache = frappe.cache()
-	cached = cache.get_value("lebanese_standard_chart_tree")
-	if cached:
-		return cached
-
-	chart_path = (
-		Path(frappe.get_app_path("erpnext_lebanese")).resolve()
-		/ "data"
-		/ "chart_of_accounts"
-		/ "lebanese_standard.json"
-	)
-
-	with chart_path.open(encoding="utf-8") as handle:
-		data = json.load(handle)
-
-	tree = data.get("tree") or {}
-	cache.set_value("lebanese_standard_chart_tree", tree)
-	return tree
-
-
-def _build_label_map(tree: Dict) -> Dict[str, Dict[str, Optional[str]]]:
-	number_to_labels: Dict[str, Dict[str, Optional[str]]] = {}
-
-	def walk(children: Dict):
-		for key, child in children.items():
-			if key in METADATA_KEYS or not isinstance(child, dict):
-				continue
-
-			account_number = cstr(child.get("account_number")).strip()
-			if account_number:
-				number_to_labels[account_number] = {
-					"en": child.get("account_name") or key,
-					"ar": child.get("arabic_name"),
-					"fr": child.get("french_name"),
-				}
-
-			walk(child)
-
-	walk(tree)
-	return number_to_labels
-
-
-def _resolve_account_number(account) -> str:
-	account_number = cstr(getattr(account, "account_number", "")).strip()
-	if account_number:
-		return account_number
+	return {
+		"format": "compact",
+		"suffix": suffix,
+		"names": names,
+		"numbers": numbers,
+		"labels": texts,
+		"english": english,
+	}
 
-	# Attempt to extract from the account name (e.g. "1000 - Equity ...")
-	name = cstr(getattr(account, "name", "")).strip()
-	match = re.match(r"^([\d\.]+)\s*-", name)
-	if match:
-		return match.group(1).strip()
 
-	return ""
+def _parse_list(value) -> Optional[List[str]]:
+	if value is None:
+		return None
+	if isinstance(value, str):
+		value = frappe.parse_json(value) if value.startswith("[") else [value]
+	return [name for name in value if name]
 
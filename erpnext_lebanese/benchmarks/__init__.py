@@ -0,0 +1 @@
+"""Benchmarks for erpnext_lebanese, run with `bench --site <site> execute`."""
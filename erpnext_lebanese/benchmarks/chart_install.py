@@ -0,0 +1,91 @@
+"""
+Install time of the Lebanese chart as the number of companies on the site grows.
+
+	bench --site <site> execute erpnext_lebanese.benchmarks.chart_install.run --kwargs "{'companies': 40}"
+
+Every company is inserted through the regular `Company` document (so the whole
+`LebaneseCompany` install runs) and the company-scoped nested-set rebuild is timed on
+its own right after. With the scoped rebuild both numbers should stay flat from the
+first company to the last one.
+"""
+import frappe
+from frappe.utils import random_string
+
+from erpnext_lebanese.nestedset import rebuild_company_tree
+from erpnext_lebanese.profiling import measure
+
+
+def run(companies: int = 20, cleanup: bool = True) -> dict:
+	results = []
+	created = []
+
+	try:
+		for index in range(1, int(companies) + 1):
+			company = _create_company(index)
+			created.append(company["name"])
+
+			with measure() as rebuild:
+				rebuild_company_tree("Account", company["name"])
+
+			results.append(
+				{
+					"company": index,
+					"install": company["install"],
+					"rebuild": rebuild.as_dict(),
+				}
+			)
+			frappe.db.commit()
+	finally:
+		if cleanup:
+			for name in created:
+				frappe.delete_doc("Company", name, force=1, ignore_permissions=True)
+			frappe.db.commit()
+
+	summary = _summarise(results)
+	_print_report(results, summary)
+	return {"results": results, "summary": summary}
+
+
+def _create_company(index: int) -> dict:
+	suffix = random_string(5).upper()
+	doc = frappe.get_doc(
+		{
+			"doctype": "Company",
+			"company_name": f"Chart Bench {index} {suffix}",
+			"abbr": f"B{suffix}"[:5],
+			"country": "Lebanon",
+			"default_currency": "LBP",
+		}
+	)
+	with measure() as install:
+		doc.insert(ignore_permissions=True)
+
+	return {"name": doc.name, "install": install.as_dict()}
+
+
+def _summarise(results: list[dict]) -> dict:
+	if not results:
+		return {}
+
+	first, last = results[0], results[-1]
+	return {
+		"companies": len(results),
+		"install_ratio": _ratio(last["install"]["elapsed"], first["install"]["elapsed"]),
+		"rebuild_ratio": _ratio(last["rebuild"]["elapsed"], first["rebuild"]["elapsed"]),
+		"rebuild_queries_first": first["rebuild"]["queries"],
+		"rebuild_queries_last": last["rebuild"]["queries"],
+	}
+
+
+def _ratio(value: float, baseline: float) -> float:
+	return round(value / baseline, 2) if baseline else 0.0
+
+
+def _print_report(results: list[dict], summary: dict) -> None:
+	print(f"{'company':>8} {'install s':>10} {'install q':>10} {'rebuild s':>10} {'rebuild q':>10}")
+	for row in results:
+		print(
+			f"{row['company']:>8} {row['install']['elapsed']:>10.3f} {row['install']['queries']:>10}"
+			f" {row['rebuild']['elapsed']:>10.3f} {row['rebuild']['queries']:>10}"
+		)
+	print(summary)
@@ -0,0 +1,150 @@
+"""
+Query plans and latency of the Lebanese lookups with and without `indexes.LOOKUP_INDEXES`.
+
+	bench --site <site> execute erpnext_lebanese.benchmarks.lookup_indexes.run \
+		--kwargs "{'companies': 50, 'samples': 500}"
+
+Seeds ``companies`` Lebanese companies (one installed normally, the others cloned from it,
+~570 accounts each), then runs every lookup of `LOOKUPS` ``samples`` times against random
+rows: first with the composite indexes dropped, then with them created. The EXPLAIN plan
+and the median / p95 latency of each phase are written as JSON (``output``, relative to the
+site directory). The indexes are always recreated at the end; run it on a test site, the
+drop briefly slows these lookups down for everyone else.
+"""
+import json
+import os
+import random
+import statistics
+import time
+
+import frappe
+from frappe.utils import random_string
+
+from erpnext_lebanese.indexes import drop_indexes, ensure_indexes
+
+DEFAULT_OUTPUT = "lookup-index-benchmark.json"
+
+# Lookup -> (query, sampled parameter source)
+LOOKUPS = {
+	"account_by_number": (
+		"select name from `tabAccount` where company = %(company)s and account_number = %(account_number)s",
+		"accounts",
+	),
+	"tree_children": (
+		"select name, is_group from `tabAccount`"
+		" where parent_account = %(parent_account)s and docstatus < 2 and disabled = 0",
+		"groups",
+	),
+	"warehouse_by_name": (
+		"select name from `tabWarehouse` where company = %(company)s and warehouse_name = %(warehouse_name)s",
+		"warehouses",
+	),
+}
+
+
+def run(companies: int = 20, samples: int = 200, output: str = DEFAULT_OUTPUT, cleanup: bool = True) -> dict:
+	created = []
+	try:
+		created = _seed(int(companies))
+		params = _sample_params(created, int(samples))
+
+		report = {
+			"companies": len(created),
+			"accounts": frappe.db.count("Account"),
+			"samples": int(samples),
+			"lookups": {name: {} for name in LOOKUPS},
+		}
+		for phase, prepare in (("without_indexes", drop_indexes), ("with_indexes", ensure_indexes)):
+			prepare()
+			for name, (query, source) in LOOKUPS.items():
+				report["lookups"][name][phase] = _measure(query, params[source])
+	finally:
+		ensure_indexes()
+		if cleanup:
+			for name in reversed(created):
+				if frappe.db.exists("Company", name):
+					frappe.delete_doc("Company", name, force=1, ignore_permissions=True)
+			frappe.db.commit()
+
+	path = _write_json(output, report)
+	_print_report(report, path)
+	return report
+
+
+def _seed(companies: int) -> list[str]:
+	created = []
+	suffix = random_string(4).upper()
+	for index in range(1, companies + 1):
+		values = {
+			"doctype": "Company",
+			"company_name": f"Index Bench {index} {suffix}",
+			"abbr": f"I{index}{suffix}"[:8],
+			"country": "Lebanon",
+			"default_currency": "LBP",
+		}
+		if created:
+			# Clones are set-based copies: seeding stays fast however many companies are asked for
+			values.update(create_chart_of_accounts_based_on="Existing Company", existing_company=created[0])
+
+		created.append(frappe.get_doc(values).insert(ignore_permissions=True).name)
+		frappe.db.commit()
+	return created
+
+
+def _sample_params(companies: list[str], samples: int) -> dict[str, list[dict]]:
+	rng = random.Random(0)
+	accounts = frappe.get_all(
+		"Account",
+		filters={"company": ["in", companies], "account_number": ["is", "set"]},
+		fields=["company", "account_number"],
+	)
+	groups = frappe.get_all(
+		"Account", filters={"company": ["in", companies], "is_group": 1}, fields=["name as parent_account"]
+	)
+	warehouses = frappe.get_all(
+		"Warehouse", filters={"company": ["in", companies]}, fields=["company", "warehouse_name"]
+	)
+
+	return {
+		source: [rng.choice(rows) for _ in range(samples)] if rows else []
+		for source, rows in (("accounts", accounts), ("groups", groups), ("warehouses", warehouses))
+	}
+
+
+def _measure(query: str, params: list[dict]) -> dict:
+	if not params:
+		return {}
+
+	plan = frappe.db.sql(f"EXPLAIN {query}", params[0], as_dict=True)
+	timings = []
+	for values in params:
+		start = time.perf_counter()
+		frappe.db.sql(query, values)
+		timings.append((time.perf_counter() - start) * 1000)
+
+	timings.sort()
+	return {
+		"plan": [dict(row) for row in plan],
+		"median_ms": round(statistics.median(timings), 4),
+		"p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+	}
+
+
+def _write_json(path: str, report: dict) -> str:
+	path = frappe.get_site_path(path)
+	os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+	with open(path, "w") as f:
+		json.dump(report, f, indent=1, sort_keys=True, default=str)
+	return path
+
+
+def _print_report(report: dict, path: str) -> None:
+	print(f"{report['companies']} companies, {report['accounts']} accounts, {report['samples']} samples")
+	print(f"{'lookup':<20} {'phase':<16} {'median ms':>10} {'p95 ms':>10}  index used")
+	for name, phases in report["lookups"].items():
+		for phase, result in phases.items():
+			if not result:
+				continue
+			keys = ", ".join(str(row.get("key") or row.get("QUERY PLAN") or "-") for row in result["plan"])
+			print(f"{name:<20} {phase:<16} {result['median_ms']:>10.3f} {result['p95_ms']:>10.3f}  {keys}")
+	print(f"results written to {path}")
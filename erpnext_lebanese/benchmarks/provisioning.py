@@ -0,0 +1,221 @@
+"""
+Per-stage cost of provisioning a Lebanese company, with regression checks.
+
+	bench --site <site> execute erpnext_lebanese.benchmarks.provisioning.run \
+		--kwargs "{'companies': 5, 'baseline': 'provisioning-baseline.json'}"
+
+Companies are created through the manual path (a plain `Company` insert) and through the
+setup wizard's `setup_company` (with a far-future fiscal year and the Lebanese chart, as the
+wizard passes them). Every provisioning stage is timed with its query count and rows
+written. The results are written as JSON (``output``, relative to the site directory unless
+absolute; ``None`` skips the file).
+When a ``baseline`` from an earlier run is given, the run fails if a stage got slower or
+chattier than the thresholds allow.
+"""
+import json
+import os
+import random
+import statistics
+
+import frappe
+from frappe.utils import random_string
+
+from erpnext_lebanese import provisioning
+from erpnext_lebanese.chart import CHART_NAME
+from erpnext_lebanese.overrides import chart_of_accounts_create_override, setup_wizard_override
+from erpnext_lebanese.profiling import measure, measure_calls
+
+PATHS = ("manual", "setup_wizard")
+
+# Allowed growth over the baseline before a stage counts as a regression
+TIME_THRESHOLD = 0.25
+QUERY_THRESHOLD = 0.10
+
+DEFAULT_OUTPUT = "provisioning-benchmark.json"
+
+
+def get_stage_targets() -> dict[str, list[tuple[object, str]]]:
+	"""Stage label -> functions to measure, patched where the pipeline looks them up."""
+	return {
+		"create_charts": [(provisioning, "lebanese_create_charts"), (provisioning, "clone_company")],
+		# The multi-row insert inside create_charts that the default (bulk) path runs
+		"bulk_insert": [(chart_of_accounts_create_override, "bulk_create_charts")],
+		"build_default_account_map": [(provisioning, "build_default_account_map")],
+		"build_company_structural_defaults": [
+			(provisioning, "build_cost_center_defaults"),
+			(provisioning, "build_warehouse_defaults"),
+		],
+		"tax_templates": [(provisioning, "create_lebanese_tax_templates")],
+	}
+
+
+def run(
+	companies: int = 3,
+	paths=PATHS,
+	output: str | None = DEFAULT_OUTPUT,
+	baseline: str | None = None,
+	time_threshold: float = TIME_THRESHOLD,
+	query_threshold: float = QUERY_THRESHOLD,
+	cleanup: bool = True,
+) -> dict:
+	if isinstance(paths, str):
+		paths = [path.strip() for path in paths.split(",")]
+
+	runs = []
+	created = []
+	# Shared by the wizard runs; far enough ahead not to collide with a real fiscal year
+	fiscal_year = str(random.randint(2100, 2999))
+	fiscal_year_existed = frappe.db.exists("Fiscal Year", fiscal_year)
+	try:
+		for path in paths:
+			for index in range(1, int(companies) + 1):
+				result = _provision(path, index, fiscal_year)
+				created.append(result["company"])
+				runs.append(result)
+	finally:
+		if cleanup:
+			for name in created:
+				if frappe.db.exists("Company", name):
+					frappe.delete_doc("Company", name, force=1, ignore_permissions=True)
+			if not fiscal_year_existed and frappe.db.exists("Fiscal Year", fiscal_year):
+				frappe.delete_doc("Fiscal Year", fiscal_year, force=1, ignore_permissions=True)
+			frappe.db.commit()
+
+	report = {"companies": int(companies), "summary": summarise(runs), "runs": runs}
+
+	if baseline:
+		report["regressions"] = compare_to_baseline(
+			report["summary"], _read_json(baseline)["summary"], time_threshold, query_threshold
+		)
+
+	path = _write_json(output, report) if output else None
+	_print_report(report, path)
+
+	if report.get("regressions"):
+		frappe.throw(
+			"Provisioning regressed: "
+			+ "; ".join(regression["message"] for regression in report["regressions"])
+		)
+
+	return report
+
+
+def summarise(runs: list[dict]) -> dict:
+	"""Per path and stage: median wall time, highest query/write counts over the runs."""
+	summary = {}
+	for result in runs:
+		for stage, measurement in result["stages"].items():
+			summary.setdefault(result["path"], {}).setdefault(stage, []).append(measurement)
+
+	return {
+		path: {
+			stage: {
+				"elapsed": round(statistics.median(m["elapsed"] for m in measurements), 6),
+				"queries": max(m["queries"] for m in measurements),
+				"writes": max(m["writes"] for m in measurements),
+				"rows_written": max(m["rows_written"] for m in measurements),
+			}
+			for stage, measurements in stages.items()
+		}
+		for path, stages in summary.items()
+	}
+
+
+def compare_to_baseline(
+	summary: dict,
+	baseline: dict,
+	time_threshold: float = TIME_THRESHOLD,
+	query_threshold: float = QUERY_THRESHOLD,
+) -> list[dict]:
+	"""Return the stages whose time or query count grew past the thresholds."""
+	regressions = []
+	for path, stages in summary.items():
+		for stage, current in stages.items():
+			previous = baseline.get(path, {}).get(stage)
+			if not previous:
+				continue
+
+			for metric, threshold in (("elapsed", time_threshold), ("queries", query_threshold)):
+				limit = previous[metric] * (1 + threshold)
+				if current[metric] > limit:
+					regressions.append(
+						{
+							"path": path,
+							"stage": stage,
+							"metric": metric,
+							"baseline": previous[metric],
+							"current": current[metric],
+							"message": f"{path}/{stage} {metric} {current[metric]} > {round(limit, 6)}",
+						}
+					)
+	return regressions
+
+
+def _provision(path: str, index: int, fiscal_year: str) -> dict:
+	suffix = random_string(5).upper()
+	company_name = f"Provisioning Bench {index} {suffix}"
+	abbr = f"V{suffix}"[:5]
+
+	with measure_calls(get_stage_targets()) as stages, measure() as total:
+		if path == "setup_wizard":
+			setup_wizard_override.setup_company(
+				{
+					"company_name": company_name,
+					"company_abbr": abbr,
+					"currency": "LBP",
+					"chart_of_accounts": CHART_NAME,
+					"fy_start_date": f"{fiscal_year}-01-01",
+					"fy_end_date": f"{fiscal_year}-12-31",
+				}
+			)
+		else:
+			frappe.get_doc(
+				{
+					"doctype": "Company",
+					"company_name": company_name,
+					"abbr": abbr,
+					"country": "Lebanon",
+					"default_currency": "LBP",
+				}
+			).insert(ignore_permissions=True)
+			frappe.db.commit()
+
+	return {
+		"path": path,
+		"company": company_name,
+		"stages": {
+			"total": total.as_dict(),
+			**{stage: measurement.as_dict() for stage, measurement in stages.items()},
+		},
+	}
+
+
+def _resolve_path(path: str) -> str:
+	return path if os.path.isabs(path) else frappe.get_site_path(path)
+
+
+def _read_json(path: str) -> dict:
+	with open(_resolve_path(path)) as f:
+		return json.load(f)
+
+
+def _write_json(path: str, report: dict) -> str:
+	path = _resolve_path(path)
+	os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+	with open(path, "w") as f:
+		json.dump(report, f, indent=1, sort_keys=True)
+	return path
+
+
+def _print_report(report: dict, path: str) -> None:
+	print(f"{'path':<14} {'stage':<36} {'median s':>10} {'queries':>8} {'rows':>8}")
+	for run_path, stages in report["summary"].items():
+		for stage, row in stages.items():
+			print(
+				f"{run_path:<14} {stage:<36} {row['elapsed']:>10.3f} {row['queries']:>8}"
+				f" {row['rows_written']:>8}"
+			)
+	for regression in report.get("regressions", []):
+		print(f"REGRESSION {regression['message']}")
+	if path:
+		print(f"results written to {path}")
@@ -0,0 +1,172 @@
+"""
+Background provisioning of many Lebanese companies at once.
+
+`enqueue_companies` validates a list of company specs and queues one job per company on the
+long queue, so the companies are provisioned in parallel by every worker serving it. Each job
+saves its Company (running the whole provisioning pipeline), commits once, and reports every
+stage over the `PROGRESS_EVENT` realtime event. The progress is also kept in a per-batch Redis
+hash, summarised by `get_batch_status`.
+"""
+import frappe
+from frappe import _
+
+from erpnext_lebanese.provisioning import STAGES
+
+PROGRESS_EVENT = "lebanese_provisioning_progress"
+STATUS_CACHE_PREFIX = "lebanese_provisioning_batch"
+
+# Batch status is kept for a day after the last update
+STATUS_TTL = 24 * 60 * 60
+JOB_TIMEOUT = 30 * 60
+MAX_BATCH_SIZE = 200
+
+DEFAULT_SPEC = {
+	"country": "Lebanon",
+	"default_currency": "LBP",
+	"chart_of_accounts": "Lebanese Standard Chart of Accounts",
+}
+
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+@frappe.whitelist()
+def enqueue_companies(companies) -> dict:
+	"""
+	Queue the provisioning of ``companies``, a list of Company field dicts (JSON accepted).
+
+	Only ``company_name`` and ``abbr`` are required; country, currency and chart default to
+	the Lebanese setup. Companies that already exist, or appear twice, are skipped.
+	"""
+	frappe.has_permission("Company", "create", throw=True)
+	specs = _parse_specs(companies)
+
+	names = [spec["company_name"] for spec in specs]
+	existing = set(frappe.get_all("Company", filters={"name": ["in", names]}, pluck="name"))
+
+	batch = frappe.generate_hash(length=10)
+	queued = {}
+	skipped = []
+	for spec in specs:
+		name = spec["company_name"]
+		if name in existing or name in queued:
+			skipped.append({"company": name, "reason": _("Company already exists or is listed twice")})
+			continue
+		queued[name] = spec
+
+	_write_statuses(batch, {name: {"status": "queued", "stage": None, "error": None} for name in queued})
+
+	user = frappe.session.user
+	for spec in queued.values():
+		frappe.enqueue(
+			"erpnext_lebanese.bulk_provisioning.provision_company_job",
+			queue="long",
+			timeout=JOB_TIMEOUT,
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+			batch=batch,
+			spec=spec,
+			user=user,
+		)
+
+	return {"batch": batch, "queued": list(queued), "skipped": skipped}
+
+
+@frappe.whitelist()
+def get_batch_status(batch: str) -> dict:
+	"""Summarise a batch queued by `enqueue_companies`: per-company status and totals."""
+	frappe.has_permission("Company", "read", throw=True)
+
+	# hgetall leaves the field names (company names) as bytes
+	companies = {
+		frappe.safe_decode(company): status
+		for company, status in frappe.cache().hgetall(_status_key(batch)).items()
+	}
+	totals = {status: 0 for status in ("queued", "running", "completed", "failed")}
+	for status in companies.values():
+		totals[status["status"]] += 1
+
+	return {
+		"batch": batch,
+		"total": len(companies),
+		"totals": totals,
+		"done": bool(companies) and totals["queued"] + totals["running"] == 0,
+		"companies": companies,
+	}
+
+
+def provision_company_job(batch: str, spec: dict, user: str | None = None) -> None:
+	"""Worker side: create one Company, committing once, and report its progress."""
+	company_name = spec["company_name"]
+	_update_status(batch, company_name, user, status="running")
+
+	def observer(company, stage, stage_status):
+		_update_status(batch, company_name, user, stage=stage, stage_status=stage_status)
+
+	frappe.local.flags.lebanese_provisioning_observer = observer
+	try:
+		frappe.get_doc({**DEFAULT_SPEC, **spec, "doctype": "Company"}).insert()
+		frappe.db.commit()
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.log_error(title=f"Lebanese Bulk Provisioning: {company_name}")
+		_update_status(batch, company_name, user, status="failed", error=str(e))
+		return
+	finally:
+		frappe.local.flags.lebanese_provisioning_observer = None
+
+	_update_status(batch, company_name, user, status="completed")
+
+
+def _parse_specs(companies) -> list[dict]:
+	if isinstance(companies, str):
+		companies = frappe.parse_json(companies)
+
+	if not companies:
+		frappe.throw(_("No companies to provision"))
+	if len(companies) > MAX_BATCH_SIZE:
+		frappe.throw(_("At most {0} companies can be provisioned in one batch").format(MAX_BATCH_SIZE))
+
+	specs = []
+	for spec in companies:
+		spec = {key: value for key, value in dict(spec).items() if key not in ("doctype", "name")}
+		if not spec.get("company_name") or not spec.get("abbr"):
+			frappe.throw(_("Each company needs a company_name and an abbr"))
+		specs.append(spec)
+	return specs
+
+
+def _write_statuses(batch: str, statuses: dict[str, dict]) -> None:
+	if not statuses:
+		return
+
+	cache = frappe.cache()
+	key = _status_key(batch)
+	for name, status in statuses.items():
+		cache.hset(key, name, status)
+	cache.expire(cache.make_key(key), STATUS_TTL)
+
+
+def _update_status(batch: str, company: str, user: str | None, **changes) -> None:
+	# Each company field is written by its own job only, so read-modify-write is safe
+	cache = frappe.cache()
+	key = _status_key(batch)
+	status = cache.hget(key, company) or {"status": "queued", "stage": None, "error": None}
+
+	status.update(changes)
+	cache.hset(key, company, status)
+
+	frappe.publish_realtime(
+		PROGRESS_EVENT,
+		{
+			"batch": batch,
+			"company": company,
+			"stage_index": STAGE_NAMES.index(status["stage"]) + 1 if status.get("stage") else 0,
+			"stages": len(STAGE_NAMES),
+			**status,
+		},
+		user=user,
+	)
+
+
+def _status_key(batch: str) -> str:
+	return f"{STATUS_CACHE_PREFIX}::{batch}"
@@ -0,0 +1,256 @@
+"""
+Compiled form of the Lebanese standard chart of accounts.
+
+`lebanese_standard.json` is a nested tree that used to be parsed and walked separately by
+the label API, the chart preview and the installer. It is now compiled once into a flat,
+pre-ordered artifact:
+
+	{
+		"format": 1,
+		"hash": "<sha256 of the source file and format>",
+		"name": "Lebanese Standard Chart of Accounts",
+		"columns": [...ARTIFACT_COLUMNS],
+		"rows": [[...], ...],
+	}
+
+Rows are in nested-set pre-order (siblings sorted by "<number> - <name>", the order
+`rebuild_tree` gives them once installed), so ``parent`` always points to an earlier row and
+``lft``/``rgt`` are ready to be offset into the Account table. The artifact is cached in Redis
+under a key derived from the content hash, so editing the JSON can never serve a stale chart.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import frappe
+from frappe.query_builder.functions import Lower
+from frappe.utils import cstr
+from erpnext.accounts.doctype.account.chart_of_accounts.chart_of_accounts import (
+	add_suffix_if_duplicate,
+)
+
+from erpnext_lebanese.single_flight import single_flight
+
+CHART_NAME = "Lebanese Standard Chart of Accounts"
+ARTIFACT_FORMAT = 1
+ARTIFACT_CACHE_PREFIX = "lebanese_chart_artifact"
+
+METADATA_KEYS = {
+	"account_name",
+	"account_number",
+	"account_type",
+	"root_type",
+	"is_group",
+	"tax_rate",
+	"account_currency",
+	"arabic_name",
+	"french_name",
+}
+
+ARTIFACT_COLUMNS = (
+	"account_number",
+	"account_name",
+	"parent",
+	"lft",
+	"rgt",
+	"is_group",
+	"root_type",
+	"report_type",
+	"account_type",
+	"account_currency",
+	"tax_rate",
+	"name_en",
+	"name_ar",
+	"name_fr",
+)
+
+# Column positions, for consumers iterating raw rows
+(
+	COL_NUMBER,
+	COL_ACCOUNT_NAME,
+	COL_PARENT,
+	COL_LFT,
+	COL_RGT,
+	COL_IS_GROUP,
+	COL_ROOT_TYPE,
+	COL_REPORT_TYPE,
+	COL_ACCOUNT_TYPE,
+	COL_CURRENCY,
+	COL_TAX_RATE,
+	COL_NAME_EN,
+	COL_NAME_AR,
+	COL_NAME_FR,
+) = range(len(ARTIFACT_COLUMNS))
+
+# (path, mtime_ns, size) -> content hash, so loaders only stat() the source file
+_source_hashes: dict[tuple, str] = {}
+
+
+def get_chart_path() -> Path:
+	return (
+		Path(frappe.get_app_path("erpnext_lebanese")).resolve()
+		/ "data"
+		/ "chart_of_accounts"
+		/ "lebanese_standard.json"
+	)
+
+
+def is_lebanese_chart(chart_name: str | None) -> bool:
+	"""Whether ``chart_name`` names a Lebanese chart (the standard one, renamed or suffixed)."""
+	return "lebanese" in cstr(chart_name).lower()
+
+
+def lebanese_chart_condition(chart_field):
+	"""`is_lebanese_chart` as a query condition on a ``chart_of_accounts`` column."""
+	return Lower(chart_field).like("%lebanese%")
+
+
+def compile_chart() -> dict:
+	"""Compile the chart JSON and publish the artifact. Runs after install and migrate."""
+	path = get_chart_path()
+	source = path.read_bytes()
+	content_hash = _hash_source(source)
+	_source_hashes[_source_stamp(path)] = content_hash
+
+	artifact = _compile_source(source, content_hash)
+	frappe.cache().set_value(_cache_key(content_hash), artifact)
+	return artifact
+
+
+def get_chart_hash() -> str:
+	"""Content hash of the chart on disk; the file is only re-read when its stat changes."""
+	path = get_chart_path()
+	stamp = _source_stamp(path)
+	content_hash = _source_hashes.get(stamp)
+	if not content_hash:
+		content_hash = _hash_source(path.read_bytes())
+		_source_hashes[stamp] = content_hash
+	return content_hash
+
+
+def get_chart_artifact() -> dict:
+	"""Return the compiled artifact for the chart currently on disk."""
+	key = _cache_key(get_chart_hash())
+	artifact = frappe.cache().get_value(key)
+	if artifact:
+		return artifact
+
+	# Workers starting together after a deploy compile the chart once between them
+	return single_flight(key, compile_chart, lambda: frappe.cache().get_value(key))
+
+
+def compile_tree(tree: dict, from_coa_importer=None) -> list[list]:
+	"""
+	Flatten a chart tree into artifact rows.
+
+	Account names are de-duplicated with ERPNext's `add_suffix_if_duplicate` in the tree's
+	own depth-first order (as `create_charts` always did) before siblings are sorted.
+	"""
+	seen_accounts = []
+
+	def _collect(children, root_type):
+		nodes = []
+		for key, child in children.items():
+			if key in METADATA_KEYS or not isinstance(child, dict):
+				continue
+
+			current_root_type = child.get("root_type", root_type)
+			account_number = cstr(child.get("account_number")).strip()
+			account_name, account_name_in_db = add_suffix_if_duplicate(
+				key, account_number, seen_accounts
+			)
+			seen_accounts.append(account_name_in_db)
+
+			is_group = identify_is_group(child)
+			if from_coa_importer:
+				account_name = child.get("account_name")
+
+			row = [None] * len(ARTIFACT_COLUMNS)
+			row[COL_NUMBER] = account_number
+			row[COL_ACCOUNT_NAME] = account_name
+			row[COL_IS_GROUP] = is_group
+			row[COL_ROOT_TYPE] = current_root_type
+			row[COL_REPORT_TYPE] = get_report_type(current_root_type)
+			row[COL_ACCOUNT_TYPE] = get_account_type(child, current_root_type, is_group)
+			row[COL_CURRENCY] = child.get("account_currency")
+			row[COL_TAX_RATE] = child.get("tax_rate")
+			row[COL_NAME_EN] = child.get("account_name") or key
+			row[COL_NAME_AR] = child.get("arabic_name")
+			row[COL_NAME_FR] = child.get("french_name")
+
+			nodes.append((row, _collect(child, current_root_type)))
+		return nodes
+
+	rows = []
+
+	def _emit(nodes, parent_index, left):
+		for row, children in sorted(nodes, key=lambda node: get_display_name(node[0])):
+			row[COL_PARENT] = parent_index
+			row[COL_LFT] = left
+			rows.append(row)
+			row[COL_RGT] = _emit(children, len(rows) - 1, left + 1)
+			left = row[COL_RGT] + 1
+		return left
+
+	_emit(_collect(tree, None), -1, 1)
+	return rows
+
+
+def identify_is_group(child):
+	if "is_group" in child:
+		return child.get("is_group", 0) or 0
+
+	extra_keys = set(child.keys()) - METADATA_KEYS
+	return 1 if extra_keys else 0
+
+
+def get_report_type(root_type):
+	return "Balance Sheet" if root_type in ["Asset", "Liability", "Equity"] else "Profit and Loss"
+
+
+def get_account_type(child, root_type, is_group):
+	# Get account_type from child, or set default based on root_type for non-group accounts
+	account_type = child.get("account_type")
+	if not account_type and root_type and not is_group:
+		# Set default account_type based on root_type if not specified (only for non-group accounts)
+		if root_type == "Income":
+			account_type = "Income Account"  # Default for Income accounts
+		elif root_type == "Expense":
+			account_type = "Expense Account"  # Default for Expense accounts
+		# For other root_types (Asset, Liability, Equity), account_type can be None
+		# Group accounts don't need account_type
+	return account_type
+
+
+def get_display_name(row) -> str:
+	"""The "<number> - <name>" value ERPNext shows for a chart row."""
+	if row[COL_NUMBER]:
+		return f"{row[COL_NUMBER]} - {cstr(row[COL_ACCOUNT_NAME])}"
+	return cstr(row[COL_ACCOUNT_NAME])
+
+
+def _compile_source(source: bytes, content_hash: str) -> dict:
+	data = json.loads(source)
+	return {
+		"format": ARTIFACT_FORMAT,
+		"hash": content_hash,
+		"name": data.get("name") or CHART_NAME,
+		"columns": list(ARTIFACT_COLUMNS),
+		"rows": compile_tree(data.get("tree") or {}),
+	}
+
+
+def _hash_source(source: bytes) -> str:
+	digest = hashlib.sha256(source)
+	digest.update(f":{ARTIFACT_FORMAT}".encode())
+	return digest.hexdigest()
+
+
+def _source_stamp(path: Path) -> tuple:
+	stat = os.stat(path)
+	return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _cache_key(content_hash: str) -> str:
+	return f"{ARTIFACT_CACHE_PREFIX}::{content_hash}"
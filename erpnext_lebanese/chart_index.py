@@ -0,0 +1,174 @@
+"""
+Read-only, per-worker index over the compiled Lebanese chart.
+
+One `ChartIndex` is built per worker process from the chart artifact and reused by every
+request until the chart's content hash changes. Integer columns live in `array` buffers and
+string columns in tuples, so the whole chart costs a few flat buffers instead of ~570
+nested dicts, and the common lookups are O(1):
+
+- `position(number)` / `position_of_value(value)`: account number or "<number> - <name>" -> row
+- `children(position)`: child rows, from a CSR-style offsets/children pair of arrays
+- `subtree(position)`: the row range of a whole branch (rows are in nested-set pre-order)
+"""
+import sys
+from array import array
+
+from erpnext_lebanese.chart import (
+	ARTIFACT_COLUMNS,
+	COL_ACCOUNT_NAME,
+	COL_ACCOUNT_TYPE,
+	COL_CURRENCY,
+	COL_IS_GROUP,
+	COL_LFT,
+	COL_NAME_AR,
+	COL_NAME_EN,
+	COL_NAME_FR,
+	COL_NUMBER,
+	COL_PARENT,
+	COL_REPORT_TYPE,
+	COL_RGT,
+	COL_ROOT_TYPE,
+	COL_TAX_RATE,
+	get_chart_artifact,
+	get_chart_hash,
+	get_display_name,
+)
+
+ROOT = -1
+
+_index: "ChartIndex | None" = None
+
+
+class ChartIndex:
+	__slots__ = (
+		"_children",
+		"_child_offsets",
+		"_number_positions",
+		"_value_positions",
+		"account_names",
+		"account_types",
+		"currencies",
+		"hash",
+		"is_group",
+		"lft",
+		"names_ar",
+		"names_en",
+		"names_fr",
+		"numbers",
+		"parents",
+		"report_types",
+		"rgt",
+		"root_types",
+		"tax_rates",
+		"values",
+	)
+
+	def __init__(self, artifact: dict):
+		rows = artifact["rows"]
+		size = len(rows)
+
+		self.hash = artifact["hash"]
+		self.numbers = tuple(row[COL_NUMBER] for row in rows)
+		self.account_names = tuple(row[COL_ACCOUNT_NAME] for row in rows)
+		self.values = tuple(get_display_name(row) for row in rows)
+		self.names_en = tuple(row[COL_NAME_EN] for row in rows)
+		self.names_ar = tuple(row[COL_NAME_AR] for row in rows)
+		self.names_fr = tuple(row[COL_NAME_FR] for row in rows)
+		# Low-cardinality columns: equal strings share one object
+		self.root_types = tuple(_intern(row[COL_ROOT_TYPE]) for row in rows)
+		self.report_types = tuple(_intern(row[COL_REPORT_TYPE]) for row in rows)
+		self.account_types = tuple(_intern(row[COL_ACCOUNT_TYPE]) for row in rows)
+		self.currencies = tuple(_intern(row[COL_CURRENCY]) for row in rows)
+		self.tax_rates = tuple(row[COL_TAX_RATE] for row in rows)
+
+		self.parents = array("i", (row[COL_PARENT] for row in rows))
+		self.lft = array("i", (row[COL_LFT] for row in rows))
+		self.rgt = array("i", (row[COL_RGT] for row in rows))
+		self.is_group = array("b", (row[COL_IS_GROUP] for row in rows))
+
+		self._number_positions = {number: pos for pos, number in enumerate(self.numbers) if number}
+		self._value_positions = {value: pos for pos, value in enumerate(self.values)}
+
+		# children of row p are _children[_child_offsets[p + 1] : _child_offsets[p + 2]],
+		# slot 0 holding the roots (parent -1); pre-order keeps each list in sibling order
+		counts = array("i", [0]) * (size + 2)
+		for parent in self.parents:
+			counts[parent + 2] += 1
+		for slot in range(1, size + 2):
+			counts[slot] += counts[slot - 1]
+		self._child_offsets = array("i", counts)
+
+		self._children = array("i", [0]) * size
+		cursor = array("i", counts)
+		for pos, parent in enumerate(self.parents):
+			self._children[cursor[parent + 1]] = pos
+			cursor[parent + 1] += 1
+
+	def __len__(self) -> int:
+		return len(self.numbers)
+
+	def position(self, account_number: str | None) -> int | None:
+		return self._number_positions.get(account_number) if account_number else None
+
+	def position_of_value(self, value: str | None) -> int | None:
+		return self._value_positions.get(value) if value else None
+
+	def children(self, position: int = ROOT) -> array:
+		start = self._child_offsets[position + 1]
+		end = self._child_offsets[position + 2]
+		return self._children[start:end]
+
+	def subtree(self, position: int) -> range:
+		"""Rows of ``position``'s branch, itself included."""
+		return range(position, position + (self.rgt[position] - self.lft[position] + 1) // 2)
+
+	def parent(self, position: int) -> int:
+		return self.parents[position]
+
+	def labels(self, position: int) -> dict[str, str | None]:
+		return {
+			"en": self.names_en[position],
+			"ar": self.names_ar[position],
+			"fr": self.names_fr[position],
+		}
+
+	def label(self, position: int, language: str) -> str | None:
+		if language == "ar":
+			return self.names_ar[position]
+		if language == "fr":
+			return self.names_fr[position]
+		return self.names_en[position]
+
+	def iter_rows(self):
+		"""Yield rows in the artifact's column layout, e.g. for the chart installer."""
+		for pos in range(len(self)):
+			row = [None] * len(ARTIFACT_COLUMNS)
+			row[COL_NUMBER] = self.numbers[pos]
+			row[COL_ACCOUNT_NAME] = self.account_names[pos]
+			row[COL_PARENT] = self.parents[pos]
+			row[COL_LFT] = self.lft[pos]
+			row[COL_RGT] = self.rgt[pos]
+			row[COL_IS_GROUP] = self.is_group[pos]
+			row[COL_ROOT_TYPE] = self.root_types[pos]
+			row[COL_REPORT_TYPE] = self.report_types[pos]
+			row[COL_ACCOUNT_TYPE] = self.account_types[pos]
+			row[COL_CURRENCY] = self.currencies[pos]
+			row[COL_TAX_RATE] = self.tax_rates[pos]
+			row[COL_NAME_EN] = self.names_en[pos]
+			row[COL_NAME_AR] = self.names_ar[pos]
+			row[COL_NAME_FR] = self.names_fr[pos]
+			yield row
+
+
+def get_chart_index() -> ChartIndex:
+	"""Return this worker's index, rebuilding it only when the chart's content hash changes."""
+	global _index
+
+	content_hash = get_chart_hash()
+	if _index is None or _index.hash != content_hash:
+		_index = ChartIndex(get_chart_artifact())
+	return _index
+
+
+def _intern(value):
+	return sys.intern(value) if isinstance(value, str) else value
@@ -0,0 +1,353 @@
+"""
+Bring installed Lebanese charts up to date with the current `lebanese_standard.json`.
+
+`sync_chart` compares the compiled chart with the accounts of every Lebanese company and
+collects these differences, matched by account number:
+
+- accounts of the chart missing from a company (added under their chart parent);
+- accounts whose root type, report type or account type differ from the chart;
+- accounts whose Arabic or French name differs from the chart, when the account's name is
+  empty or still the one the previous chart had (see `record_chart_names`). Names users
+  edited are kept;
+- installed leaf accounts that get new children, which are converted to groups. A leaf with
+  ledger entries cannot become a group: the new accounts under it are held back and
+  reported as ``blocked``.
+
+Accounts without a chart number (added by users) are left alone, and an empty chart value
+never blanks one set on the account. ``account_name`` is not synced: users rename accounts,
+and the docname (``<number> - <name> - <abbr>``) would no longer match it. Changes are
+written in set-based batches across all companies: one UPDATE per (field, value) pair and
+one multi-row INSERT for the new accounts, followed by a company-scoped nested-set rebuild
+of the companies that got new accounts. With ``dry_run`` only the report is returned.
+"""
+import json
+
+import frappe
+from frappe.query_builder import DocType
+from frappe.utils import cstr, now
+from erpnext.accounts.utils import get_autoname_with_number
+
+from erpnext_lebanese.account_labels import clear_company_labels
+from erpnext_lebanese.chart import lebanese_chart_condition
+from erpnext_lebanese.chart_index import ROOT, get_chart_index
+from erpnext_lebanese.nestedset import rebuild_company_tree
+from erpnext_lebanese.overrides.chart_of_accounts_create_override import (
+	BULK_ACCOUNT_FIELDS,
+	BULK_INSERT_CHUNK_SIZE,
+)
+
+# Fields compared between the chart and the installed accounts
+SYNCED_FIELDS = ("root_type", "report_type", "account_type")
+
+# Translated name field -> chart index column; synced only where the name was not edited
+TRANSLATED_FIELDS = {"arabic_name": "names_ar", "french_name": "names_fr"}
+
+# Global default holding the translated names of the chart last applied
+CHART_NAMES_KEY = "lebanese_chart_names"
+
+# Companies whose accounts are read per query, and names per UPDATE ... IN (...)
+COMPANY_BATCH_SIZE = 50
+UPDATE_CHUNK_SIZE = 1000
+
+# Changes listed per company in the report; the counts always cover everything
+REPORT_SAMPLE_SIZE = 20
+
+
+def sync_chart(companies: list[str] | None = None, dry_run: bool = False) -> dict:
+	"""
+	Diff the compiled chart against ``companies`` (default: every Lebanese company) and,
+	unless ``dry_run``, apply the differences. Returns a report of what changed (or would).
+	"""
+	companies = companies or get_lebanese_companies()
+	index = get_chart_index()
+	previous = get_previous_chart_names()
+
+	report = {
+		"chart_hash": index.hash,
+		"dry_run": bool(dry_run),
+		"companies": {},
+		"totals": {
+			"new_accounts": 0,
+			"groups": 0,
+			"blocked": 0,
+			**{fieldname: 0 for fieldname in (*SYNCED_FIELDS, *TRANSLATED_FIELDS)},
+		},
+	}
+	updates: dict[tuple[str, object], list[str]] = {}
+	new_accounts: dict[str, list[dict]] = {}
+
+	for start in range(0, len(companies), COMPANY_BATCH_SIZE):
+		batch = companies[start : start + COMPANY_BATCH_SIZE]
+		installed = _get_installed_accounts(batch)
+		diffs = {
+			company: diff_company(company, installed.get(company, {}), index, previous) for company in batch
+		}
+		in_use = _accounts_with_entries([name for diff in diffs.values() for name in diff["groups"]])
+
+		for company, diff in diffs.items():
+			_hold_back_branches(diff, in_use)
+			report["companies"][company] = _summarise(diff)
+
+			for change in diff["changes"]:
+				updates.setdefault((change["field"], change["chart"]), []).append(change["name"])
+				report["totals"][change["field"]] += 1
+			if diff["groups"]:
+				updates.setdefault(("is_group", 1), []).extend(diff["groups"])
+				report["totals"]["groups"] += len(diff["groups"])
+			if diff["new_accounts"]:
+				new_accounts[company] = diff["new_accounts"]
+				report["totals"]["new_accounts"] += len(diff["new_accounts"])
+			report["totals"]["blocked"] += len(diff["blocked"])
+
+	if not dry_run:
+		_apply_updates(updates)
+		_insert_new_accounts(new_accounts)
+		for company, summary in report["companies"].items():
+			if summary["new_accounts"] or summary["changes"] or summary["groups"]:
+				clear_company_labels(company)
+		record_chart_names(index)
+
+	return report
+
+
+def diff_company(company: str, installed: dict[str, dict], index=None, previous=None) -> dict:
+	"""
+	Differences between the chart and ``installed`` (account number -> account row).
+
+	``previous`` maps account numbers to the translated names of the chart last applied
+	(see `get_previous_chart_names`); without it only empty names are filled.
+	"""
+	index = index or get_chart_index()
+	previous = previous or {}
+	changes = []
+	new_accounts = []
+	# Installed leaves getting new children
+	groups = []
+	# Chart position -> account name in this company, for parenting new accounts
+	names: dict[int, str] = {}
+
+	for pos in range(len(index)):
+		number = index.numbers[pos]
+		if not number:
+			continue
+
+		account = installed.get(number)
+		if account is None:
+			parent_pos = index.parent(pos)
+			parent = names.get(parent_pos) if parent_pos != ROOT else None
+			if parent_pos != ROOT and not parent:
+				# The parent is missing too and could not be placed: skip the branch
+				continue
+
+			parent_account = installed.get(index.numbers[parent_pos]) if parent_pos != ROOT else None
+			if parent_account and not parent_account.is_group and parent_account.name not in groups:
+				groups.append(parent_account.name)
+
+			name = get_autoname_with_number(number, index.account_names[pos], company)
+			names[pos] = name
+			new_accounts.append({"name": name, "position": pos, "parent_account": parent})
+			continue
+
+		names[pos] = account.name
+		chart_values = {
+			"root_type": index.root_types[pos],
+			"report_type": index.report_types[pos],
+			"account_type": index.account_types[pos],
+		}
+		for fieldname, chart_value in chart_values.items():
+			if chart_value and account.get(fieldname) != chart_value:
+				changes.append(_change(account, number, fieldname, chart_value))
+
+		previous_names = previous.get(number) or ()
+		for position, (fieldname, column) in enumerate(TRANSLATED_FIELDS.items()):
+			chart_value = getattr(index, column)[pos]
+			installed_value = cstr(account.get(fieldname))
+			if not chart_value or installed_value == chart_value:
+				continue
+			previous_value = previous_names[position] if position < len(previous_names) else None
+			if installed_value and installed_value != previous_value:
+				# Edited by a user: the chart no longer speaks for this name
+				continue
+			changes.append(_change(account, number, fieldname, chart_value))
+
+	return {"changes": changes, "new_accounts": new_accounts, "groups": groups, "blocked": []}
+
+
+def get_previous_chart_names() -> dict[str, list[str]]:
+	"""Account number -> translated names (`TRANSLATED_FIELDS` order) of the chart last applied."""
+	return json.loads(frappe.db.get_global(CHART_NAMES_KEY) or "{}")
+
+
+def record_chart_names(index=None, overwrite: bool = True) -> None:
+	"""
+	Remember the translated names of ``index`` (default: the current chart) as applied.
+
+	The next sync overwrites only the names still equal to these. Run after every sync and
+	install-time backfill; with ``overwrite=False`` only when nothing was recorded yet.
+	"""
+	if not overwrite and frappe.db.get_global(CHART_NAMES_KEY):
+		return
+
+	index = index or get_chart_index()
+	columns = [getattr(index, column) for column in TRANSLATED_FIELDS.values()]
+	names = {
+		index.numbers[pos]: [column[pos] or "" for column in columns]
+		for pos in range(len(index))
+		if index.numbers[pos]
+	}
+	frappe.db.set_global(CHART_NAMES_KEY, json.dumps(names, ensure_ascii=False, separators=(",", ":")))
+
+
+def get_lebanese_companies() -> list[str]:
+	company = DocType("Company")
+	return (
+		frappe.qb.from_(company)
+		.select(company.name)
+		.where((company.country == "Lebanon") & lebanese_chart_condition(company.chart_of_accounts))
+		.orderby(company.name)
+		.run(pluck=True)
+	)
+
+
+def _get_installed_accounts(companies: list[str]) -> dict[str, dict[str, dict]]:
+	account = DocType("Account")
+	rows = (
+		frappe.qb.from_(account)
+		.select(
+			account.name,
+			account.company,
+			account.account_number,
+			account.is_group,
+			account.root_type,
+			account.report_type,
+			account.account_type,
+			*(getattr(account, fieldname) for fieldname in TRANSLATED_FIELDS),
+		)
+		.where(account.company.isin(companies) & account.account_number.isnotnull())
+		.where(account.account_number != "")
+		.run(as_dict=True)
+	)
+
+	installed: dict[str, dict[str, dict]] = {}
+	for row in rows:
+		installed.setdefault(row.company, {})[row.account_number] = row
+	return installed
+
+
+def _change(account, number: str, fieldname: str, chart_value) -> dict:
+	return {
+		"name": account.name,
+		"account_number": number,
+		"field": fieldname,
+		"installed": account.get(fieldname),
+		"chart": chart_value,
+	}
+
+
+def _accounts_with_entries(names: list[str]) -> set[str]:
+	if not names:
+		return set()
+	return set(frappe.get_all("GL Entry", filters={"account": ["in", names]}, pluck="account", distinct=True))
+
+
+def _hold_back_branches(diff: dict, in_use: set[str]) -> None:
+	"""Drop the new accounts that would go under a leaf with ledger entries, and their children."""
+	blocked = in_use.intersection(diff["groups"])
+	if not blocked:
+		return
+
+	diff["groups"] = [name for name in diff["groups"] if name not in blocked]
+	kept = []
+	# New accounts are in chart pre-order: a parent is always seen before its children
+	for row in diff["new_accounts"]:
+		if row["parent_account"] in blocked:
+			blocked.add(row["name"])
+			diff["blocked"].append({"name": row["name"], "parent_account": row["parent_account"]})
+		else:
+			kept.append(row)
+	diff["new_accounts"] = kept
+
+
+def _summarise(diff: dict) -> dict:
+	return {
+		"new_accounts": len(diff["new_accounts"]),
+		"changes": len(diff["changes"]),
+		"groups": len(diff["groups"]),
+		"blocked": diff["blocked"],
+		"sample": [
+			*({"new": row["name"]} for row in diff["new_accounts"][:REPORT_SAMPLE_SIZE]),
+			*({"group": name} for name in diff["groups"][:REPORT_SAMPLE_SIZE]),
+			*diff["changes"][:REPORT_SAMPLE_SIZE],
+		],
+	}
+
+
+def _apply_updates(updates: dict[tuple[str, object], list[str]]) -> None:
+	account = DocType("Account")
+	timestamp = now()
+	user = frappe.session.user
+	for (fieldname, value), names in updates.items():
+		for start in range(0, len(names), UPDATE_CHUNK_SIZE):
+			(
+				frappe.qb.update(account)
+				.set(getattr(account, fieldname), value)
+				.set(account.modified, timestamp)
+				.set(account.modified_by, user)
+				.where(account.name.isin(names[start : start + UPDATE_CHUNK_SIZE]))
+			).run()
+
+
+def _insert_new_accounts(new_accounts: dict[str, list[dict]]) -> None:
+	if not new_accounts:
+		return
+
+	index = get_chart_index()
+	currencies = dict(
+		frappe.get_all(
+			"Company",
+			filters={"name": ["in", list(new_accounts)]},
+			fields=["name", "default_currency"],
+			as_list=True,
+		)
+	)
+	timestamp = now()
+	user = frappe.session.user
+
+	values = []
+	for company, rows in new_accounts.items():
+		for row in rows:
+			pos = row["position"]
+			values.append(
+				(
+					row["name"],
+					user,
+					user,
+					timestamp,
+					timestamp,
+					0,
+					0,
+					index.account_names[pos],
+					index.numbers[pos],
+					company,
+					row["parent_account"],
+					row["parent_account"] or "",
+					index.is_group[pos],
+					index.root_types[pos],
+					index.report_types[pos],
+					index.account_types[pos],
+					index.currencies[pos] or currencies.get(company),
+					index.tax_rates[pos],
+					"No",
+					0,
+					# Placed by the rebuild below
+					0,
+					0,
+					index.names_ar[pos],
+					index.names_fr[pos],
+				)
+			)
+
+	frappe.db.bulk_insert("Account", BULK_ACCOUNT_FIELDS, values, chunk_size=BULK_INSERT_CHUNK_SIZE)
+
+	for company in new_accounts:
+		rebuild_company_tree("Account", company)
@@ -0,0 +1,175 @@
+"""
+Set-based cloning of a company's setup into a new company.
+
+Accounts (user-added ones included), cost centers, warehouses and the VAT templates of the
+source company are copied with one ``INSERT ... SELECT`` per table. In each copy:
+
+- names ending in " - <source abbr>" get the new abbreviation instead;
+- links between the copied records are renamed the same way;
+- nested-set bounds are shifted into a freshly reserved range, keeping the source's shape.
+
+No documents are loaded or validated, so a whole chart is copied in a handful of statements.
+"""
+import frappe
+from frappe.query_builder import DocType
+from frappe.query_builder.functions import Max, Min
+from frappe.utils import now
+
+from erpnext_lebanese.company_profile import get_company_profile
+from erpnext_lebanese.nestedset import reserve_tree_range
+from erpnext_lebanese.tax_templates import VAT_TEMPLATES, VAT_TITLE
+
+# Nested-set doctypes copied in this order, with the link fields renamed along the name.
+# ``old_parent`` must follow the parent link: `update_nsm` treats a mismatch as a move.
+TREE_DOCTYPES = {
+	"Account": ("parent_account", "old_parent"),
+	"Cost Center": ("parent_cost_center", "old_parent"),
+	"Warehouse": ("parent_warehouse", "old_parent", "account", "default_in_transit_warehouse"),
+}
+
+# Tax template doctype -> (child table doctype, link fields of the child rows to rename)
+TEMPLATE_DOCTYPES = {
+	"Sales Taxes and Charges Template": ("Sales Taxes and Charges", ("account_head", "cost_center")),
+	"Purchase Taxes and Charges Template": ("Purchase Taxes and Charges", ("account_head", "cost_center")),
+}
+
+# Frappe's per-row metadata columns, not carried over to the copies
+RESET_COLUMNS = ("_assign", "_comments", "_liked_by", "_user_tags", "_seen")
+
+
+def clone_company(company: str, source: str) -> dict[str, int]:
+	"""
+	Copy the chart, cost centers, warehouses and VAT templates of ``source`` into ``company``.
+
+	Returns the number of rows copied per doctype.
+	"""
+	target_profile = get_company_profile(company)
+	source_profile = get_company_profile(source)
+	if not source_profile.exists or not source_profile.abbr:
+		frappe.throw(f"Cannot clone from {source}: company not found")
+
+	params = {
+		"source": source,
+		"target": company,
+		"source_root": f"{source} - {source_profile.abbr}",
+		"target_root": f"{company} - {target_profile.abbr}",
+		"source_like": f"% - {_escape_like(source_profile.abbr)}",
+		"source_suffix_length": len(f" - {source_profile.abbr}"),
+		"target_suffix": f" - {target_profile.abbr}",
+		"source_currency": source_profile.currency,
+		"target_currency": target_profile.currency,
+		"timestamp": now(),
+		"user": frappe.session.user,
+	}
+
+	copied = {}
+	for doctype, link_fields in TREE_DOCTYPES.items():
+		copied[doctype] = _copy_tree(doctype, link_fields, params)
+
+	for doctype in VAT_TEMPLATES:
+		copied[doctype] = _copy_template(doctype, params)
+
+	return copied
+
+
+def _copy_tree(doctype: str, link_fields: tuple[str, ...], params: dict) -> int:
+	table = DocType(doctype)
+	source_lft, source_rgt = (
+		frappe.qb.from_(table)
+		.select(Min(table.lft), Max(table.rgt))
+		.where(table.company == params["source"])
+		.run()[0]
+	)
+	if source_lft is None:
+		return 0
+
+	# The copy keeps the source's bounds, shifted into a range no concurrent copy gets
+	start = reserve_tree_range(doctype, source_rgt - source_lft + 1)
+	params = {**params, "shift": start - source_lft}
+
+	overrides = {
+		"name": _renamed("name"),
+		"company": "%(target)s",
+		"lft": "`lft` + %(shift)s",
+		"rgt": "`rgt` + %(shift)s",
+		**{fieldname: _renamed(fieldname) for fieldname in link_fields},
+	}
+
+	if doctype == "Account":
+		overrides["account_currency"] = (
+			"case when `account_currency` = %(source_currency)s then %(target_currency)s "
+			"else `account_currency` end"
+		)
+	elif doctype == "Cost Center":
+		# The root cost center is named after the company itself
+		for fieldname in ("name", "parent_cost_center", "old_parent"):
+			overrides[fieldname] = (
+				f"case when `{fieldname}` = %(source_root)s then %(target_root)s "
+				f"else {_renamed(fieldname)} end"
+			)
+		overrides["cost_center_name"] = (
+			"case when coalesce(`parent_cost_center`, '') = '' then %(target)s else `cost_center_name` end"
+		)
+
+	return _insert_select(doctype, overrides, "`company` = %(source)s", params)
+
+
+def _copy_template(doctype: str, params: dict) -> int:
+	child_doctype, link_fields = TEMPLATE_DOCTYPES[doctype]
+	params = {**params, "title": VAT_TITLE, "doctype": doctype}
+	source_templates = f"select `name` from `tab{doctype}` where `company` = %(source)s and `title` = %(title)s"
+
+	copied = _insert_select(
+		doctype,
+		{"name": _renamed("name"), "company": "%(target)s"},
+		"`company` = %(source)s and `title` = %(title)s",
+		params,
+	)
+	if copied:
+		_insert_select(
+			child_doctype,
+			{
+				# Child names only need to be unique: derive them from the source row
+				"name": "left(md5(concat(`name`, %(target)s)), 10)",
+				"parent": _renamed("parent"),
+				**{fieldname: _renamed(fieldname) for fieldname in link_fields},
+			},
+			f"`parenttype` = %(doctype)s and `parent` in ({source_templates})",
+			params,
+		)
+	return copied
+
+
+def _insert_select(doctype: str, overrides: dict[str, str], condition: str, params: dict) -> int:
+	overrides = {
+		"owner": "%(user)s",
+		"modified_by": "%(user)s",
+		"creation": "%(timestamp)s",
+		"modified": "%(timestamp)s",
+		**{column: "null" for column in RESET_COLUMNS},
+		**overrides,
+	}
+
+	columns = frappe.db.get_table_columns(doctype)
+	expressions = [overrides.get(column, f"`{column}`") for column in columns]
+
+	frappe.db.sql(
+		f"""insert into `tab{doctype}` ({", ".join(f"`{column}`" for column in columns)})
+		select {", ".join(expressions)} from `tab{doctype}` where {condition}""",
+		params,
+	)
+	return frappe.db._cursor.rowcount
+
+
+def _renamed(fieldname: str) -> str:
+	"""SQL expression giving ``fieldname`` with the source abbreviation swapped for the target's."""
+	return (
+		f"case when coalesce(`{fieldname}`, '') = '' then `{fieldname}` "
+		f"when `{fieldname}` like %(source_like)s "
+		f"then concat(left(`{fieldname}`, char_length(`{fieldname}`) - %(source_suffix_length)s), %(target_suffix)s) "
+		f"else concat(`{fieldname}`, %(target_suffix)s) end"
+	)
+
+
+def _escape_like(value: str) -> str:
+	return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,35 @@
+import json
+
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("lebanese-sync-chart")
+@click.option(
+	"--company",
+	"companies",
+	multiple=True,
+	help="Company to sync (repeatable); default: every Lebanese company",
+)
+@click.option("--dry-run", is_flag=True, default=False, help="Report the differences without writing them")
+@pass_context
+def sync_lebanese_chart(context, companies, dry_run):
+	"""Apply the current Lebanese chart of accounts to installed companies."""
+	import frappe
+
+	from erpnext_lebanese.chart_sync import sync_chart
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		report = sync_chart(list(companies) or None, dry_run=dry_run)
+		if not dry_run:
+			frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+	click.echo(json.dumps(report, indent=1, default=str))
+
+
+commands = [sync_lebanese_chart]
@@ -0,0 +1,99 @@
+"""
+Per-request profile of a company: the handful of values the Lebanese setup code keeps asking for.
+
+`get_company_profile` builds one `CompanyProfile` per company per request or background job
+(it lives in ``frappe.local``) from a single Company read. The primary cost center and the
+key accounts (through `account_resolver`) are resolved lazily on first use. Only hits are
+memoised, so an account or cost center created later in the same request is still found. Saving, renaming or deleting the
+Company drops its profile (see the Company doc events in hooks.py).
+"""
+import frappe
+
+from erpnext_lebanese.account_resolver import resolve_accounts
+from erpnext_lebanese.chart import is_lebanese_chart
+
+# Accounts the setup code looks up by number
+KEY_ACCOUNT_NUMBERS = ("4011", "4111", "4426.6", "4427")
+
+
+class CompanyProfile:
+	__slots__ = (
+		"_accounts",
+		"_cost_center",
+		"abbr",
+		"chart_of_accounts",
+		"country",
+		"currency",
+		"exists",
+		"is_lebanese",
+		"name",
+	)
+
+	def __init__(self, name: str, row: dict | None):
+		row = row or {}
+		self.name = name
+		self.exists = bool(row)
+		self.country = row.get("country")
+		self.chart_of_accounts = row.get("chart_of_accounts")
+		self.abbr = row.get("abbr")
+		self.currency = row.get("default_currency")
+		self.is_lebanese = is_lebanese_setup(self.country, self.chart_of_accounts)
+		self._cost_center = None
+		self._accounts = {}
+
+	@property
+	def cost_center(self) -> str | None:
+		"""The company's primary leaf cost center, if one exists yet."""
+		if not self._cost_center:
+			from erpnext_lebanese.default_accounts import _find_primary_cost_center
+
+			self._cost_center = _find_primary_cost_center(self.name, self.abbr)
+		return self._cost_center
+
+	@cost_center.setter
+	def cost_center(self, value: str | None):
+		self._cost_center = value
+
+	def get_account(self, account_number: str) -> str | None:
+		return self.get_accounts((account_number,)).get(account_number)
+
+	def get_accounts(self, account_numbers=KEY_ACCOUNT_NUMBERS) -> dict[str, str]:
+		"""Map ``account_numbers`` to Account names, resolving only numbers not seen yet."""
+		missing = [number for number in account_numbers if number not in self._accounts]
+		if missing:
+			self._accounts.update(resolve_accounts(self.name, missing))
+
+		return {number: self._accounts[number] for number in account_numbers if number in self._accounts}
+
+
+def get_company_profile(company: str) -> CompanyProfile:
+	"""Return the profile of ``company`` for the current request, reading it on first use."""
+	profiles = _get_profiles()
+	profile = profiles.get(company)
+	if profile is None:
+		row = frappe.db.get_value(
+			"Company",
+			company,
+			["country", "chart_of_accounts", "abbr", "default_currency"],
+			as_dict=True,
+		)
+		profile = profiles[company] = CompanyProfile(company, row)
+	return profile
+
+
+def invalidate_company_profile(doc, method=None, old=None, new=None, merge=False):
+	"""Company on_update / after_rename / on_trash: forget the cached profile."""
+	profiles = _get_profiles()
+	profiles.pop(doc.name, None)
+	if old:
+		profiles.pop(old, None)
+
+
+def is_lebanese_setup(country: str | None, chart_of_accounts: str | None) -> bool:
+	return country == "Lebanon" and is_lebanese_chart(chart_of_accounts)
+
+
+def _get_profiles() -> dict[str, CompanyProfile]:
+	if not hasattr(frappe.local, "lebanese_company_profiles"):
+		frappe.local.lebanese_company_profiles = {}
+	return frappe.local.lebanese_company_profiles
@@ -0,0 +1,32 @@
+"""
+Custom fields the app adds to standard doctypes.
+
+Account carries the Arabic and French names of the Lebanese chart. The chart installers
+fill them from `lebanese_standard.json`, the ``backfill_account_translations`` patch fills
+them for accounts installed before, and users may edit them on any account (renamed or
+added ones included). The localized labels are read from these columns.
+"""
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+CUSTOM_FIELDS = {
+	"Account": [
+		{
+			"fieldname": "arabic_name",
+			"label": "Arabic Name",
+			"fieldtype": "Data",
+			"insert_after": "account_name",
+			"translatable": 0,
+		},
+		{
+			"fieldname": "french_name",
+			"label": "French Name",
+			"fieldtype": "Data",
+			"insert_after": "arabic_name",
+			"translatable": 0,
+		},
+	],
+}
+
+
+def make_custom_fields() -> None:
+	create_custom_fields(CUSTOM_FIELDS, ignore_validate=True, update=True)
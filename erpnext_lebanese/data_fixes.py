@@ -0,0 +1,164 @@
+"""
+Declarative, set-based data fixes for installed Lebanese charts.
+
+Each `AccountFix` in `ACCOUNT_FIXES` states what an account of the chart must look like,
+e.g. "401 is a Liability on the Balance Sheet". `run_fixes` applies every rule to all
+Lebanese companies at once, one UPDATE per rule (covering the account's descendants too
+when ``include_descendants`` is set). Afterwards it checks, with one query each, that every
+account shares its parent's root type and that report types match root types.
+
+Add a rule here and list `erpnext_lebanese.patches.v1_0.apply_data_fixes` again in
+patches.txt (with a new trailing comment) to ship it.
+"""
+from typing import NamedTuple
+
+import frappe
+from frappe.query_builder import DocType
+from frappe.query_builder.functions import Coalesce, Count
+from frappe.utils import now
+
+from erpnext_lebanese.account_labels import clear_company_labels
+from erpnext_lebanese.chart import lebanese_chart_condition
+from erpnext_lebanese.chart_sync import get_lebanese_companies
+from erpnext_lebanese.default_accounts import BS_ROOTS
+
+
+class AccountFix(NamedTuple):
+	name: str
+	account_number: str
+	values: dict[str, str]
+	include_descendants: bool = False
+	description: str = ""
+
+
+ACCOUNT_FIXES = (
+	AccountFix(
+		"account_401_balance_sheet",
+		"401",
+		{"root_type": "Liability", "report_type": "Balance Sheet"},
+		include_descendants=True,
+		description="Suppliers (401) were installed as Profit and Loss accounts",
+	),
+)
+
+
+def run_fixes(fix_names=None, companies=None, dry_run=False) -> dict:
+	"""
+	Apply ``fix_names`` (default: all of `ACCOUNT_FIXES`) to ``companies`` (default: every
+	Lebanese company), then check the root type invariants.
+
+	Returns ``{"fixes": {name: accounts changed (or to change)}, "violations": [...]}``.
+	"""
+	fixes = [fix for fix in ACCOUNT_FIXES if not fix_names or fix.name in fix_names]
+	unknown = set(fix_names or ()) - {fix.name for fix in fixes}
+	if unknown:
+		frappe.throw(f"Unknown data fixes: {', '.join(sorted(unknown))}")
+
+	report = {"dry_run": bool(dry_run), "fixes": {}}
+	for fix in fixes:
+		report["fixes"][fix.name] = apply_fix(fix, companies, dry_run=dry_run)
+
+	if not dry_run and any(report["fixes"].values()):
+		# Written without doc events: the label version (and the account search indexes
+		# filtering on root / report type) must move
+		for company in companies or get_lebanese_companies():
+			clear_company_labels(company)
+
+	report["violations"] = check_root_type_invariants(companies)
+	return report
+
+
+def apply_fix(fix: AccountFix, companies=None, dry_run=False) -> int:
+	"""
+	Apply one rule across ``companies`` with a single UPDATE; returns the number of accounts
+	that differed from the rule.
+	"""
+	account = DocType("Account")
+	differs = None
+	for fieldname, value in fix.values.items():
+		condition = Coalesce(getattr(account, fieldname), "") != value
+		differs = condition if differs is None else differs | condition
+
+	if fix.include_descendants:
+		scope = account.name.isin(_branch_names(fix.account_number, companies))
+	else:
+		scope = (account.account_number == fix.account_number) & _company_condition(account, companies)
+
+	if dry_run:
+		return frappe.qb.from_(account).select(Count("*")).where(scope & differs).run()[0][0]
+
+	query = frappe.qb.update(account).where(scope & differs).set(account.modified, now())
+	for fieldname, value in fix.values.items():
+		query = query.set(getattr(account, fieldname), value)
+
+	query.run()
+	return frappe.db._cursor.rowcount
+
+
+def check_root_type_invariants(companies=None) -> list[dict]:
+	"""
+	Accounts breaking the nested-set root type rules, found with one query per rule:
+	a child must share its parent's root type, and the report type must follow the root type.
+	"""
+	account = DocType("Account")
+	parent = DocType("Account").as_("parent")
+
+	mismatched_parents = (
+		frappe.qb.from_(account)
+		.join(parent)
+		.on(parent.name == account.parent_account)
+		.select(
+			account.company,
+			account.name.as_("account"),
+			account.root_type,
+			parent.name.as_("parent"),
+			parent.root_type.as_("parent_root_type"),
+		)
+		.where(_company_condition(account, companies))
+		.where(Coalesce(account.root_type, "") != Coalesce(parent.root_type, ""))
+		.where(Coalesce(parent.root_type, "") != "")
+		.run(as_dict=True)
+	)
+
+	mismatched_reports = (
+		frappe.qb.from_(account)
+		.select(account.company, account.name.as_("account"), account.root_type, account.report_type)
+		.where(_company_condition(account, companies))
+		.where(
+			(account.root_type.isin(sorted(BS_ROOTS)) & (account.report_type != "Balance Sheet"))
+			| (account.root_type.isin(["Income", "Expense"]) & (account.report_type != "Profit and Loss"))
+		)
+		.run(as_dict=True)
+	)
+
+	return [
+		*({"rule": "parent_root_type", **row} for row in mismatched_parents),
+		*({"rule": "report_type", **row} for row in mismatched_reports),
+	]
+
+
+def _branch_names(account_number: str, companies=None):
+	"""Names of the accounts numbered ``account_number`` and of all their descendants."""
+	account = DocType("Account")
+	branch = DocType("Account").as_("branch")
+	names = (
+		frappe.qb.from_(account)
+		.join(branch)
+		.on((branch.company == account.company) & (account.lft >= branch.lft) & (account.rgt <= branch.rgt))
+		.select(account.name)
+		.where((branch.account_number == account_number) & _company_condition(branch, companies))
+	)
+	# MariaDB refuses a subquery on the table being updated unless it is materialised first
+	return frappe.qb.from_(names).select(names.name)
+
+
+def _company_condition(account, companies=None):
+	if companies:
+		return account.company.isin(list(companies))
+
+	company = DocType("Company")
+	return account.company.isin(
+		frappe.qb.from_(company)
+		.select(company.name)
+		.where((company.country == "Lebanon") & lebanese_chart_condition(company.chart_of_accounts))
+	)
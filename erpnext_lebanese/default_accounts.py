@@ -1,4 +1,10 @@
 import frappe
+from frappe.query_builder import Case, DocType
+from frappe.utils import now
+
+from erpnext_lebanese.account_resolver import resolve_account
+from erpnext_lebanese.company_profile import get_company_profile
+from erpnext_lebanese.instrumentation import traced
 
 BS_ROOTS = {"Asset", "Liability", "Equity"}
 
@@ -90,67 +96,133 @@ WAREHOUSE_BLUEPRINTS = {
 LOGGER = frappe.logger("erpnext_lebanese.default_accounts")
 
 
+@traced
 def build_default_account_map(company: str) -> dict[str, str]:
-	cache: dict[str, str] = {}
+	"""
+	Resolve every blueprint in `ACCOUNT_BLUEPRINTS` to an Account of ``company``.
+
+	All referenced accounts are read with one query, the blueprints are compared against
+	them in memory and every correction is written with a single batched UPDATE.
+	"""
+	accounts = _get_blueprint_accounts(company)
 	defaults: dict[str, str] = {}
+	updates: dict[str, dict[str, str]] = {}
 
 	for fieldname, blueprint in ACCOUNT_BLUEPRINTS.items():
-		account_name = _ensure_account(company, blueprint, cache)
-		if account_name:
-			defaults[fieldname] = account_name
+		account = _match_account(blueprint, accounts)
 
-	return defaults
+		if not account and blueprint.get("create_if_missing"):
+			account_name = _create_account(company, blueprint)
+			if account_name:
+				defaults[fieldname] = account_name
+			continue
 
+		if not account:
+			continue
 
-def _ensure_account(company: str, blueprint: dict, cache: dict[str, str]) -> str | None:
-	account_number = blueprint.get("account_number")
-	account_name = None
+		defaults[fieldname] = account.name
+		changes = _get_blueprint_changes(blueprint, account)
+		if changes:
+			# Apply in memory too, so a later blueprint for the same account sees the fix
+			account.update(changes)
+			updates.setdefault(account.name, {}).update(changes)
+
+	_apply_account_updates(updates)
+	return defaults
 
-	if account_number:
-		account_name = cache.get(account_number)
-		if not account_name:
-			account_name = frappe.db.get_value(
-				"Account", {"company": company, "account_number": account_number}, "name"
-			)
-			if account_name:
-				cache[account_number] = account_name
 
-	if not account_name and blueprint.get("account_name"):
-		account_name = frappe.db.get_value(
-			"Account", {"company": company, "account_name": blueprint["account_name"]}, "name"
+def _get_blueprint_accounts(company: str) -> dict[tuple[str, str], dict]:
+	"""Fetch the accounts referenced by `ACCOUNT_BLUEPRINTS`, keyed by number and by name."""
+	numbers = {bp["account_number"] for bp in ACCOUNT_BLUEPRINTS.values() if bp.get("account_number")}
+	names = {bp["account_name"] for bp in ACCOUNT_BLUEPRINTS.values() if bp.get("account_name")}
+	if not numbers and not names:
+		return {}
+
+	account = DocType("Account")
+	if numbers and names:
+		condition = account.account_number.isin(sorted(numbers)) | account.account_name.isin(sorted(names))
+	elif numbers:
+		condition = account.account_number.isin(sorted(numbers))
+	else:
+		condition = account.account_name.isin(sorted(names))
+
+	rows = (
+		frappe.qb.from_(account)
+		.select(
+			account.name,
+			account.account_number,
+			account.account_name,
+			account.account_type,
+			account.root_type,
+			account.report_type,
 		)
+		.where((account.company == company) & condition)
+		.orderby(account.name)
+		.run(as_dict=True)
+	)
+
+	accounts: dict[tuple[str, str], dict] = {}
+	for row in rows:
+		if row.account_number:
+			accounts.setdefault(("account_number", row.account_number), row)
+		accounts.setdefault(("account_name", row.account_name), row)
+	return accounts
+
 
-	if not account_name and blueprint.get("create_if_missing"):
-		account_name = _create_account(company, blueprint)
-		if account_name and account_number:
-			cache[account_number] = account_name
+def _match_account(blueprint: dict, accounts: dict) -> dict | None:
+	if blueprint.get("account_number"):
+		account = accounts.get(("account_number", blueprint["account_number"]))
+		if account:
+			return account
 
-	if account_name:
-		updates = {}
+	if blueprint.get("account_name"):
+		return accounts.get(("account_name", blueprint["account_name"]))
 
-		if blueprint.get("account_type"):
-			current_type = frappe.db.get_value("Account", account_name, "account_type")
-			if current_type != blueprint["account_type"]:
-				updates["account_type"] = blueprint["account_type"]
+	return None
 
-		desired_root = blueprint.get("root_type")
-		if desired_root:
-			current_root = frappe.db.get_value("Account", account_name, "root_type")
-			if current_root != desired_root:
-				updates["root_type"] = desired_root
 
-		desired_report = blueprint.get("report_type")
-		if not desired_report and desired_root:
-			desired_report = "Balance Sheet" if desired_root in BS_ROOTS else "Profit and Loss"
-		if desired_report:
-			current_report = frappe.db.get_value("Account", account_name, "report_type")
-			if current_report != desired_report:
-				updates["report_type"] = desired_report
+def _get_blueprint_changes(blueprint: dict, account: dict) -> dict[str, str]:
+	changes = {}
 
-		if updates:
-			frappe.db.set_value("Account", account_name, updates)
+	if blueprint.get("account_type") and account.account_type != blueprint["account_type"]:
+		changes["account_type"] = blueprint["account_type"]
 
-	return account_name
+	desired_root = blueprint.get("root_type")
+	if desired_root and account.root_type != desired_root:
+		changes["root_type"] = desired_root
+
+	desired_report = blueprint.get("report_type")
+	if not desired_report and desired_root:
+		desired_report = "Balance Sheet" if desired_root in BS_ROOTS else "Profit and Loss"
+	if desired_report and account.report_type != desired_report:
+		changes["report_type"] = desired_report
+
+	return changes
+
+
+def _apply_account_updates(updates: dict[str, dict[str, str]]) -> None:
+	"""Write per-account field corrections with one UPDATE ... CASE statement."""
+	if not updates:
+		return
+
+	account = DocType("Account")
+	query = frappe.qb.update(account)
+
+	fieldnames = sorted({fieldname for changes in updates.values() for fieldname in changes})
+	for fieldname in fieldnames:
+		column = getattr(account, fieldname)
+		case = Case()
+		for name, changes in updates.items():
+			if fieldname in changes:
+				case = case.when(account.name == name, changes[fieldname])
+		# Accounts that only need other fields fixed keep their current value
+		query = query.set(column, case.else_(column))
+
+	(
+		query.set(account.modified, now())
+		.set(account.modified_by, frappe.session.user)
+		.where(account.name.isin(list(updates)))
+	).run()
 
 
 def _create_account(company: str, blueprint: dict) -> str | None:
@@ -159,9 +231,7 @@ def _create_account(company: str, blueprint: dict) -> str | None:
 		LOGGER.warning("Cannot create account %(number)s without parent in blueprint.", blueprint)
 		return None
 
-	parent_account = frappe.db.get_value(
-		"Account", {"company": company, "account_number": parent_number}, "name"
-	)
+	parent_account = resolve_account(company, parent_number)
 	if not parent_account:
 		LOGGER.warning(
 			"Parent %(parent)s not found while creating %(number)s for %(company)s",
@@ -191,7 +261,7 @@ def _create_account(company: str, blueprint: dict) -> str | None:
 			"root_type": root_type,
 			"report_type": report_type,
 			"account_type": blueprint.get("account_type"),
-			"account_currency": frappe.get_cached_value("Company", company, "default_currency"),
+			"account_currency": get_company_profile(company).currency,
 		}
 	)
 	account_doc.flags.ignore_permissions = True
@@ -200,6 +270,11 @@ def _create_account(company: str, blueprint: dict) -> str | None:
 
 
 def build_company_structural_defaults(company: str) -> dict[str, str]:
+	return {**build_cost_center_defaults(company), **build_warehouse_defaults(company)}
+
+
+@traced
+def build_cost_center_defaults(company: str) -> dict[str, str]:
 	defaults: dict[str, str] = {}
 
 	# Ensure cost center exists first, then get it
@@ -210,6 +285,13 @@ def build_company_structural_defaults(company: str) -> dict[str, str]:
 		defaults["round_off_cost_center"] = primary_cost_center
 		defaults["depreciation_cost_center"] = primary_cost_center
 
+	return defaults
+
+
+@traced
+def build_warehouse_defaults(company: str) -> dict[str, str]:
+	defaults: dict[str, str] = {}
+
 	for fieldname, blueprint in WAREHOUSE_BLUEPRINTS.items():
 		wh_name = _ensure_warehouse(company, **blueprint)
 		if wh_name:
@@ -219,45 +301,43 @@ def build_company_structural_defaults(company: str) -> dict[str, str]:
 
 
 def _get_primary_cost_center(company: str) -> str | None:
-	# First try to find "Main - FE" specifically
-	cost_center = frappe.db.get_value(
-		"Cost Center",
-		{"company": company, "name": "Main - FE", "is_group": 0},
-		"name",
-	)
-	if cost_center:
-		return cost_center
-	
-	# Try with company abbreviation pattern "Main - {abbr}"
-	abbr = frappe.db.get_value("Company", company, "abbr")
+	profile = get_company_profile(company)
+	if profile.cost_center:
+		return profile.cost_center
+
+	# Ensure cost center tree exists - this will create "Main - {abbr}"
+	return _ensure_cost_center_tree(company)
+
+
+def _find_primary_cost_center(company: str, abbr: str | None) -> str | None:
+	# First try to find "Main - FE" specifically, then "Main - {abbr}"
+	names = ["Main - FE"]
 	if abbr:
-		cost_center_name = f"Main - {abbr}"
-		cost_center = frappe.db.get_value(
-			"Cost Center",
-			{"company": company, "name": cost_center_name, "is_group": 0},
-			"name",
-		)
-		if cost_center:
-			return cost_center
-	
-	# Fallback to any "Main" cost center
-	cost_center = frappe.db.get_value(
+		names.append(f"Main - {abbr}")
+
+	leaves = frappe.get_all(
 		"Cost Center",
-		{"company": company, "cost_center_name": "Main", "is_group": 0},
-		"name",
+		filters={"company": company, "is_group": 0},
+		fields=["name", "cost_center_name"],
+		order_by="creation asc",
 	)
-	if cost_center:
-		return cost_center
-	cost_center = frappe.db.get_value("Cost Center", {"company": company, "is_group": 0}, "name")
-	if cost_center:
-		return cost_center
+	leaf_names = {row.name for row in leaves}
+	for name in names:
+		if name in leaf_names:
+			return name
 
-	# Ensure cost center tree exists - this will create "Main - {abbr}"
-	return _ensure_cost_center_tree(company)
+	# Fallback to any "Main" cost center, then any leaf at all
+	for row in leaves:
+		if row.cost_center_name == "Main":
+			return row.name
+
+	return leaves[0].name if leaves else None
 
 
+@traced
 def _ensure_cost_center_tree(company: str) -> str | None:
-	abbr = frappe.db.get_value("Company", company, "abbr")
+	profile = get_company_profile(company)
+	abbr = profile.abbr
 	if not abbr:
 		return None
 
@@ -288,6 +368,7 @@ def _ensure_cost_center_tree(company: str) -> str | None:
 		)
 		main_doc.flags.ignore_permissions = True
 		main_doc.insert()
+		profile.cost_center = main_doc.name
 		# Return the name that was just created
 		return main_doc.name
 
@@ -295,6 +376,7 @@ def _ensure_cost_center_tree(company: str) -> str | None:
 	return main_name
 
 
+@traced
 def _ensure_warehouse(company: str, warehouse_name: str, warehouse_type: str | None = None) -> str | None:
 	existing = frappe.db.get_value(
 		"Warehouse",
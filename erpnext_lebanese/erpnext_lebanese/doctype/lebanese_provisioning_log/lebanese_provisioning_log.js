@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Samuael Ketema and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Lebanese Provisioning Log", {
+	refresh(frm) {
+		frm.disable_save();
+	},
+});
@@ -0,0 +1,71 @@
+# Copyright (c) 2026, Samuael Ketema and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.query_builder import Case, DocType
+from frappe.query_builder.functions import Avg, Count, Max, Sum
+from frappe.utils import add_to_date, getdate
+
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	group_by = filters.get("group_by") or "Step"
+	return get_columns(group_by), get_data(filters, group_by)
+
+
+def get_columns(group_by):
+	if group_by == "Company":
+		key = {"label": _("Company"), "fieldname": "company", "fieldtype": "Link", "options": "Company", "width": 220}
+	else:
+		key = {"label": _("Step"), "fieldname": "span", "fieldtype": "Data", "width": 260}
+
+	return [
+		key,
+		{"label": _("Runs"), "fieldname": "runs", "fieldtype": "Int", "width": 80},
+		{"label": _("Failed"), "fieldname": "failed", "fieldtype": "Int", "width": 80},
+		{"label": _("Avg Duration (s)"), "fieldname": "avg_duration", "fieldtype": "Float", "precision": 3, "width": 140},
+		{"label": _("Max Duration (s)"), "fieldname": "max_duration", "fieldtype": "Float", "precision": 3, "width": 140},
+		{"label": _("Avg Queries"), "fieldname": "avg_queries", "fieldtype": "Float", "precision": 1, "width": 110},
+		{"label": _("Max Queries"), "fieldname": "max_queries", "fieldtype": "Int", "width": 110},
+		{"label": _("Avg Rows Written"), "fieldname": "avg_rows_written", "fieldtype": "Float", "precision": 1, "width": 140},
+	]
+
+
+def get_data(filters, group_by):
+	log = DocType("Lebanese Provisioning Log")
+	step = DocType("Lebanese Provisioning Log Step")
+
+	# Per-company figures come from the log totals, per-step figures from the child rows
+	source = log if group_by == "Company" else step
+	key = log.company if group_by == "Company" else step.span
+
+	query = (
+		frappe.qb.from_(log)
+		.select(
+			key,
+			Count("*").as_("runs"),
+			Sum(Case().when(source.status == "Failed", 1).else_(0)).as_("failed"),
+			Avg(source.duration).as_("avg_duration"),
+			Max(source.duration).as_("max_duration"),
+			Avg(source.queries).as_("avg_queries"),
+			Max(source.queries).as_("max_queries"),
+			Avg(source.rows_written).as_("avg_rows_written"),
+		)
+		.groupby(key)
+		.orderby(Avg(source.duration), order=frappe.qb.desc)
+	)
+
+	if group_by != "Company":
+		query = query.join(step).on((step.parent == log.name) & (step.parenttype == "Lebanese Provisioning Log"))
+
+	if filters.get("company"):
+		query = query.where(log.company == filters.company)
+	if filters.get("operation"):
+		query = query.where(log.operation == filters.operation)
+	if filters.get("from_date"):
+		query = query.where(log.started_at >= getdate(filters.from_date))
+	if filters.get("to_date"):
+		query = query.where(log.started_at < add_to_date(getdate(filters.to_date), days=1))
+
+	return query.run(as_dict=True)
@@ -1,49 +1,30 @@
 """
 Script to fix account 401 - set it to Balance Sheet instead of Profit and Loss
 Run this in the ERPNext console or as a custom script
+
+The fix itself is the "account_401_balance_sheet" rule of `erpnext_lebanese.data_fixes`,
+which the `apply_data_fixes` patch already runs for every Lebanese company on migrate.
 """
 import frappe
 
+from erpnext_lebanese.data_fixes import run_fixes
+
+FIX_NAME = "account_401_balance_sheet"
+
+
 def fix_account_401(company=None):
 	"""
-	Update account 401 to have root_type=Liability and report_type=Balance Sheet
+	Update account 401 (and its sub-accounts) to root_type=Liability and report_type=Balance Sheet
+	for ``company``, or for every Lebanese company when not given
 	"""
-	if not company:
-		# Get the first company if not specified
-		company = frappe.db.get_value("Company", {}, "name")
-		if not company:
-			frappe.throw("No company found. Please specify a company.")
-	
-	# Find account 401
-	account_name = frappe.db.get_value(
-		"Account", 
-		{"company": company, "account_number": "401"}, 
-		"name"
-	)
-	
-	if not account_name:
-		frappe.throw(f"Account 401 not found for company {company}")
-	
-	# Get current values
-	current_root = frappe.db.get_value("Account", account_name, "root_type")
-	current_report = frappe.db.get_value("Account", account_name, "report_type")
-	
-	frappe.msgprint(f"Current values for account 401:")
-	frappe.msgprint(f"  Root Type: {current_root}")
-	frappe.msgprint(f"  Report Type: {current_report}")
-	
-	# Update the account
-	account = frappe.get_doc("Account", account_name)
-	account.root_type = "Liability"
-	account.report_type = "Balance Sheet"
-	account.save()
-	
-	frappe.msgprint(f"Account 401 updated successfully!")
-	frappe.msgprint(f"  New Root Type: {account.root_type}")
-	frappe.msgprint(f"  New Report Type: {account.report_type}")
-	
-	return account_name
+	report = run_fixes([FIX_NAME], companies=[company] if company else None)
+
+	frappe.msgprint(f"Account 401 updated: {report['fixes'][FIX_NAME]} account(s) changed")
+	if report["violations"]:
+		frappe.msgprint(f"{len(report['violations'])} account(s) still disagree with their parent's root type")
+
+	return report
+
 
 if __name__ == "__main__":
 	fix_account_401()
-
@@ -87,6 +87,7 @@ app_include_css = "/assets/erpnext_lebanese/css/account_tree_rtl.css"
 # before_install = "erpnext_lebanese.install.before_install"
 after_install = "erpnext_lebanese.install.after_install"
 after_uninstall = "erpnext_lebanese.install.after_uninstall"
+after_migrate = "erpnext_lebanese.install.after_migrate"
 
 # Uninstallation
 # ------------
@@ -141,6 +142,35 @@ override_doctype_class = {
 # Hook on document methods and events
 # Note: We use override_doctype_class instead of doc_events for Company
 
+doc_events = {
+	"Company": {
+		"on_update": "erpnext_lebanese.company_profile.invalidate_company_profile",
+		"after_rename": "erpnext_lebanese.company_profile.invalidate_company_profile",
+		"on_trash": [
+			"erpnext_lebanese.company_profile.invalidate_company_profile",
+			"erpnext_lebanese.account_resolver.on_company_trash",
+		],
+	},
+	"Account": {
+		"after_insert": [
+			"erpnext_lebanese.account_labels.on_account_update",
+			"erpnext_lebanese.account_resolver.on_account_update",
+		],
+		"on_update": [
+			"erpnext_lebanese.account_labels.on_account_update",
+			"erpnext_lebanese.account_resolver.on_account_update",
+		],
+		"after_rename": [
+			"erpnext_lebanese.account_labels.on_account_rename",
+			"erpnext_lebanese.account_resolver.on_account_rename",
+		],
+		"on_trash": [
+			"erpnext_lebanese.account_labels.on_account_trash",
+			"erpnext_lebanese.account_resolver.on_account_trash",
+		],
+	}
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -174,6 +204,9 @@ override_whitelisted_methods = {
 	"erpnext.setup.setup_wizard.setup_wizard.get_setup_stages": "erpnext_lebanese.overrides.setup_wizard_override.get_setup_stages",
 	"erpnext.setup.setup_wizard.setup_wizard.setup_complete": "erpnext_lebanese.overrides.setup_wizard_override.setup_complete",
 	"erpnext.accounts.utils.get_children": "erpnext_lebanese.overrides.treeview_override.get_children",
+	# Account link fields of Lebanese companies search numbers and en/ar/fr names; other
+	# link searches are passed through
+	"frappe.desk.search.search_link": "erpnext_lebanese.account_search.search_link",
 }
 #
 # each overriding function accepts a `data` argument;
@@ -0,0 +1,50 @@
+"""
+Composite indexes for the lookups the Lebanese setup and the Chart of Accounts tree run most.
+
+A standard install only indexes these columns one by one (if at all):
+
+- Account (company, account_number): number -> account resolution and every blueprint match;
+- Account (parent_account, docstatus, disabled): one tree node expansion;
+- Warehouse (company, warehouse_name): `_ensure_warehouse` and the default warehouses.
+
+`ensure_indexes` is run after install and migrate (and by the ``add_lookup_indexes`` patch); it is
+safe to run again.
+"""
+import frappe
+
+LOOKUP_INDEXES = {
+	"Account": {
+		"lebanese_company_account_number": ("company", "account_number"),
+		"lebanese_parent_docstatus_disabled": ("parent_account", "docstatus", "disabled"),
+	},
+	"Warehouse": {
+		"lebanese_company_warehouse_name": ("company", "warehouse_name"),
+	},
+}
+
+
+def ensure_indexes() -> list[str]:
+	"""Create the missing `LOOKUP_INDEXES`; returns the names of the indexes created."""
+	created = []
+	for doctype, indexes in LOOKUP_INDEXES.items():
+		for index_name, fields in indexes.items():
+			if frappe.db.has_index(f"tab{doctype}", index_name):
+				continue
+			frappe.db.add_index(doctype, list(fields), index_name=index_name)
+			created.append(index_name)
+	return created
+
+
+def drop_indexes() -> list[str]:
+	"""Drop the `LOOKUP_INDEXES` that exist; used to measure the plans without them."""
+	dropped = []
+	for doctype, indexes in LOOKUP_INDEXES.items():
+		for index_name in indexes:
+			if not frappe.db.has_index(f"tab{doctype}", index_name):
+				continue
+			if frappe.db.db_type == "postgres":
+				frappe.db.sql_ddl(f'DROP INDEX IF EXISTS "{index_name}"')
+			else:
+				frappe.db.sql_ddl(f"ALTER TABLE `tab{doctype}` DROP INDEX `{index_name}`")
+			dropped.append(index_name)
+	return dropped
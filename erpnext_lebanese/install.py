@@ -60,6 +60,54 @@ def after_install():
 		# Don't fail installation if this fails
 		pass
 
+	make_custom_fields()
+	compile_lebanese_chart()
+	# A fresh install marks every patch as done without running it: add_lookup_indexes included
+	ensure_lookup_indexes()
+	record_chart_names()
+
+
+def after_migrate():
+	"""Recompile the chart artifact so a changed lebanese_standard.json is picked up"""
+	make_custom_fields()
+	compile_lebanese_chart()
+	ensure_lookup_indexes()
+
+
+def make_custom_fields():
+	"""Add the Arabic / French name fields to Account"""
+	from erpnext_lebanese.custom_fields import make_custom_fields
+
+	make_custom_fields()
+
+
+def record_chart_names():
+	"""Remember the chart's Arabic / French names, so a later chart sync can tell edited ones apart"""
+	from erpnext_lebanese.chart_sync import record_chart_names
+
+	record_chart_names(overwrite=False)
+
+
+def ensure_lookup_indexes():
+	"""Create the missing composite lookup indexes; safe to run on every migrate"""
+	from erpnext_lebanese.indexes import ensure_indexes
+
+	ensure_indexes()
+
+
+def compile_lebanese_chart():
+	"""
+	Build the flat, content-hashed chart artifact consumed by the label API,
+	the chart preview and the installer
+	"""
+	from erpnext_lebanese.chart import compile_chart
+
+	try:
+		compile_chart()
+	except Exception:
+		# Consumers compile lazily on a cache miss, so never block install/migrate
+		frappe.log_error(title="Lebanese Chart Compilation")
+
 
 def after_uninstall():
 	"""
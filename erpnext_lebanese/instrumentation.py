@@ -0,0 +1,162 @@
+"""
+Timed spans around company provisioning, saved as "Lebanese Provisioning Log" records.
+
+`trace` opens a trace for one Company operation (e.g. ``on_update``). Inside it, `span`
+blocks and `traced` functions each record their duration, query count, rows written and
+outcome as one step of the trace. When the outermost trace closes, the steps are saved as
+one log with a child row per step. Outside a trace, spans cost one attribute lookup.
+
+The outermost trace wraps `frappe.db.sql` once to count queries and rows written; spans
+read those counters when they open and close.
+
+A failed operation usually gets its transaction rolled back by the caller, so its log is
+written by a background job instead, on the job's own connection.
+
+Set ``lebanese_provisioning_log: 0`` in site config to turn logging off.
+"""
+import functools
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now
+
+from erpnext_lebanese.profiling import WRITE_STATEMENTS
+
+LOG_DOCTYPE = "Lebanese Provisioning Log"
+
+
+class Trace:
+	__slots__ = ("company", "operation", "started_at", "steps", "depth", "queries", "rows_written")
+
+	def __init__(self, company: str, operation: str):
+		self.company = company
+		self.operation = operation
+		self.started_at = now()
+		self.steps = []
+		self.depth = 0
+		self.queries = 0
+		self.rows_written = 0
+
+
+@contextmanager
+def trace(company: str, operation: str):
+	"""Trace ``operation`` on ``company``; nested calls join the trace already running."""
+	if getattr(frappe.local, "lebanese_trace", None) or not frappe.conf.get("lebanese_provisioning_log", 1):
+		with span(operation):
+			yield
+		return
+
+	current = frappe.local.lebanese_trace = Trace(company, operation)
+	db = frappe.local.db
+	# Another wrapper (a test's measure()) may already sit on the connection
+	wrapped = "sql" in vars(db)
+	original_sql = db.sql
+	db.sql = _counting_sql(current, db, original_sql)
+
+	start = time.perf_counter()
+	error = None
+	try:
+		yield
+	except Exception as e:
+		error = e
+		raise
+	finally:
+		if wrapped:
+			db.sql = original_sql
+		else:
+			del db.sql
+		frappe.local.lebanese_trace = None
+		_save_log(current, time.perf_counter() - start, error)
+
+
+@contextmanager
+def span(name: str):
+	"""Record the block as one step of the running trace, if any."""
+	current = getattr(frappe.local, "lebanese_trace", None)
+	if current is None:
+		yield
+		return
+
+	step = {"span": name, "depth": current.depth, "status": "Success"}
+	current.steps.append(step)
+	current.depth += 1
+	queries, rows_written = current.queries, current.rows_written
+	start = time.perf_counter()
+	try:
+		yield
+	except Exception as e:
+		step["status"] = "Failed"
+		step["error"] = _describe(e)
+		raise
+	finally:
+		current.depth -= 1
+		step["duration"] = round(time.perf_counter() - start, 6)
+		step["queries"] = current.queries - queries
+		step["rows_written"] = current.rows_written - rows_written
+
+
+def traced(function=None, name: str | None = None):
+	"""Decorator form of `span`, named after the function unless ``name`` is given."""
+
+	def decorator(function):
+		label = name or function.__name__
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			if getattr(frappe.local, "lebanese_trace", None) is None:
+				return function(*args, **kwargs)
+			with span(label):
+				return function(*args, **kwargs)
+
+		return wrapper
+
+	return decorator(function) if function else decorator
+
+
+def _counting_sql(current: Trace, db, original_sql):
+	def sql(query, *args, **kwargs):
+		current.queries += 1
+		result = original_sql(query, *args, **kwargs)
+		if str(query).lstrip().lower().startswith(WRITE_STATEMENTS):
+			current.rows_written += max(getattr(db._cursor, "rowcount", 0) or 0, 0)
+		return result
+
+	return sql
+
+
+def _save_log(current: Trace, elapsed: float, error: Exception | None) -> None:
+	values = {
+		"doctype": LOG_DOCTYPE,
+		"company": current.company,
+		"operation": current.operation,
+		"status": "Failed" if error else "Success",
+		"started_at": current.started_at,
+		"duration": round(elapsed, 6),
+		"queries": current.queries,
+		"rows_written": current.rows_written,
+		"error": _describe(error) if error else None,
+		"steps": current.steps,
+	}
+
+	try:
+		if error:
+			# The caller will most likely roll the failure back, and a log written in its
+			# transaction with it
+			frappe.enqueue(insert_log, queue="short", values=values, now=frappe.flags.in_test)
+		else:
+			insert_log(values)
+	except Exception:
+		frappe.log_error(title="Lebanese Provisioning Log")
+
+
+def insert_log(values: dict) -> None:
+	log = frappe.get_doc(values)
+	log.flags.ignore_permissions = True
+	# The company itself may be gone with a rolled-back transaction
+	log.flags.ignore_links = True
+	log.insert()
+
+
+def _describe(error: Exception) -> str:
+	return f"{type(error).__name__}: {error}"[:1000]
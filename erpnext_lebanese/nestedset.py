@@ -0,0 +1,111 @@
+import frappe
+from frappe.query_builder import Case, DocType
+from frappe.query_builder.functions import Max
+from frappe.utils import cint
+
+# Rows renumbered per UPDATE ... CASE statement
+REBUILD_CHUNK_SIZE = 500
+
+HIGH_WATER_PREFIX = "lebanese_nested_set_high"
+
+# Moves the high-water mark past ARGV[2] values from where the last reservation or the
+# table's max(rgt) (ARGV[1]) ends, whichever is higher, and returns the range's first value
+RESERVE_SCRIPT = """
+local high = math.max(tonumber(redis.call("get", KEYS[1]) or "0"), tonumber(ARGV[1]))
+redis.call("set", KEYS[1], high + tonumber(ARGV[2]))
+return high + 1
+"""
+
+
+def reserve_tree_range(doctype: str, size: int) -> int:
+	"""
+	Reserve ``size`` consecutive nested-set values after every bound in use; return the first.
+
+	Concurrent workers placing company subtrees would otherwise read the same ``max(rgt)``
+	and hand out overlapping bounds. The reservation is one atomic Redis call on a
+	high-water mark, outside the database transaction: workers never wait for each other's
+	commit, and a transaction that rolls back only leaves a gap in the numbering, which
+	nested-set queries do not mind. Without the mark (Redis flushed) ranges start after the
+	table's ``max(rgt)`` again.
+	"""
+	cache = frappe.cache()
+	key = cache.make_key(f"{HIGH_WATER_PREFIX}::{doctype}")
+	return cint(cache.eval(RESERVE_SCRIPT, 1, key, get_max_rgt(doctype), cint(size)))
+
+
+def get_max_rgt(doctype: str, exclude_company: str | None = None) -> int:
+	"""Return the highest ``rgt`` allocated in ``doctype``, optionally ignoring one company's rows."""
+	table = DocType(doctype)
+	query = frappe.qb.from_(table).select(Max(table.rgt))
+	if exclude_company:
+		query = query.where(table.company != exclude_company)
+	return query.run()[0][0] or 0
+
+
+def rebuild_company_tree(doctype: str, company: str, parent_field: str | None = None) -> int:
+	"""
+	Renumber the nested set of one company's rows only.
+
+	Unlike `frappe.utils.nestedset.rebuild_tree`, rows belonging to other companies are
+	never read or written: the company's forest is placed after the highest ``rgt`` of
+	everybody else, siblings ordered by name exactly like `rebuild_tree` orders them.
+	The cost is one read, one ``max(rgt)`` lookup and a handful of batched updates,
+	independent of how many companies already live in the table.
+
+	Returns the number of rows renumbered.
+	"""
+	parent_field = parent_field or f"parent_{frappe.scrub(doctype)}"
+	table = DocType(doctype)
+	parent_column = getattr(table, parent_field)
+
+	rows = (
+		frappe.qb.from_(table)
+		.select(table.name, parent_column.as_("parent"))
+		.where(table.company == company)
+		.run(as_dict=True)
+	)
+	if not rows:
+		return 0
+
+	members = {row.name for row in rows}
+	children: dict[str | None, list[str]] = {}
+	for row in rows:
+		# Parents outside the company (or missing) make the row a root of the company forest
+		parent = row.parent if row.parent in members else None
+		children.setdefault(parent, []).append(row.name)
+
+	bounds: dict[str, tuple[int, int]] = {}
+	left = reserve_tree_range(doctype, 2 * len(rows))
+
+	# Iterative pre-order walk so deep trees do not hit the recursion limit
+	stack = [(name, False) for name in sorted(children.get(None, []), reverse=True)]
+	lefts: dict[str, int] = {}
+	while stack:
+		name, visited = stack.pop()
+		if visited:
+			bounds[name] = (lefts[name], left)
+			left += 1
+			continue
+
+		lefts[name] = left
+		left += 1
+		stack.append((name, True))
+		stack.extend((child, False) for child in sorted(children.get(name, []), reverse=True))
+
+	items = list(bounds.items())
+	for start in range(0, len(items), REBUILD_CHUNK_SIZE):
+		chunk = items[start : start + REBUILD_CHUNK_SIZE]
+		lft_case = Case()
+		rgt_case = Case()
+		for name, (lft, rgt) in chunk:
+			lft_case = lft_case.when(table.name == name, lft)
+			rgt_case = rgt_case.when(table.name == name, rgt)
+
+		(
+			frappe.qb.update(table)
+			.set(table.lft, lft_case)
+			.set(table.rgt, rgt_case)
+			.where(table.name.isin([name for name, _bounds in chunk]))
+		).run()
+
+	return len(items)
@@ -3,111 +3,190 @@
 Override create_charts to handle arabic_name and french_name metadata fields
 """
 import frappe
-from frappe.utils import cstr
-from frappe.utils.nestedset import rebuild_tree
-from erpnext.accounts.doctype.account.chart_of_accounts.chart_of_accounts import (
-	add_suffix_if_duplicate,
-	get_chart
+from frappe.utils import now
+from erpnext.accounts.doctype.account.chart_of_accounts.chart_of_accounts import get_chart
+from erpnext.accounts.utils import get_autoname_with_number
+
+from erpnext_lebanese.chart import (
+	COL_ACCOUNT_NAME,
+	COL_ACCOUNT_TYPE,
+	COL_CURRENCY,
+	COL_IS_GROUP,
+	COL_LFT,
+	COL_NAME_AR,
+	COL_NAME_FR,
+	COL_NUMBER,
+	COL_PARENT,
+	COL_REPORT_TYPE,
+	COL_RGT,
+	COL_ROOT_TYPE,
+	COL_TAX_RATE,
+	compile_tree,
+	is_lebanese_chart,
+)
+from erpnext_lebanese.chart_index import get_chart_index
+from erpnext_lebanese.nestedset import rebuild_company_tree, reserve_tree_range
+
+# Rows per multi-row INSERT issued by the bulk installer (~570 accounts -> 3 statements)
+BULK_INSERT_CHUNK_SIZE = 250
+
+BULK_ACCOUNT_FIELDS = (
+	"name",
+	"owner",
+	"modified_by",
+	"creation",
+	"modified",
+	"docstatus",
+	"idx",
+	"account_name",
+	"account_number",
+	"company",
+	"parent_account",
+	# Set like update_nsm sets it, so a first save is not taken for a move
+	"old_parent",
+	"is_group",
+	"root_type",
+	"report_type",
+	"account_type",
+	"account_currency",
+	"tax_rate",
+	"freeze_account",
+	"disabled",
+	"lft",
+	"rgt",
+	"arabic_name",
+	"french_name",
 )
 
 
 def create_charts(
-	company, chart_template=None, existing_company=None, custom_chart=None, from_coa_importer=None
+	company,
+	chart_template=None,
+	existing_company=None,
+	custom_chart=None,
+	from_coa_importer=None,
+	bulk=False,
 ):
 	"""
 	Override create_charts to handle arabic_name and french_name metadata fields
-	These fields should be ignored when processing the chart structure
+	They are not accounts of the chart; they are stored on the Account's own columns
+
+	With ``bulk=True`` the accounts are written with a handful of multi-row inserts
+	and their nested-set bounds are computed in Python instead of inserting one
+	Account document at a time and rebuilding the tree afterwards.
+	"""
+	rows = get_chart_rows(chart_template, existing_company, custom_chart, from_coa_importer)
+	if not rows:
+		return
+
+	if bulk:
+		bulk_create_charts(company, rows)
+		return
+
+	default_currency = frappe.get_cached_value("Company", company, "default_currency")
+	names = []
+
+	frappe.local.flags.ignore_update_nsm = True
+	for row in rows:
+		root_account = row[COL_PARENT] < 0
+		account = frappe.get_doc(
+			{
+				"doctype": "Account",
+				"account_name": row[COL_ACCOUNT_NAME],
+				"company": company,
+				"parent_account": None if root_account else names[row[COL_PARENT]],
+				"is_group": row[COL_IS_GROUP],
+				"root_type": row[COL_ROOT_TYPE],
+				"report_type": row[COL_REPORT_TYPE],
+				"account_number": row[COL_NUMBER],
+				"account_type": row[COL_ACCOUNT_TYPE],
+				"account_currency": row[COL_CURRENCY] or default_currency,
+				"tax_rate": row[COL_TAX_RATE],
+				"arabic_name": row[COL_NAME_AR],
+				"french_name": row[COL_NAME_FR],
+			}
+		)
+
+		if root_account or frappe.local.flags.allow_unverified_charts:
+			account.flags.ignore_mandatory = True
+
+		account.flags.ignore_permissions = True
+
+		account.insert()
+		names.append(account.name)
+
+	# Rebuild the company's NestedSet HSM subtree after all accounts are inserted;
+	# other companies' accounts keep their bounds.
+	rebuild_company_tree("Account", company)
+	frappe.local.flags.ignore_update_nsm = False
+
+
+def get_chart_rows(chart_template=None, existing_company=None, custom_chart=None, from_coa_importer=None):
 	"""
+	Return the chart to install as compiled artifact rows.
+
+	The Lebanese standard chart comes straight from the worker's chart index; any other
+	chart (custom, another company's, other templates) is compiled on the fly.
+	"""
+	if not custom_chart and not existing_company and is_lebanese_chart(chart_template):
+		return list(get_chart_index().iter_rows())
+
 	chart = custom_chart or get_chart(chart_template, existing_company)
-	if chart:
-		accounts = []
-		metadata_keys = {
-			"account_name",
-			"account_number",
-			"account_type",
-			"root_type",
-			"is_group",
-			"tax_rate",
-			"account_currency",
-			"arabic_name",
-			"french_name",
-		}
-
-		def identify_is_group(child):
-			if "is_group" in child:
-				return child.get("is_group", 0) or 0
-
-			extra_keys = set(child.keys()) - metadata_keys
-			return 1 if extra_keys else 0
-
-		def _import_accounts(children, parent, root_type, root_account=False):
-			for account_name, child in children.items():
-				# Skip metadata keys early
-				if account_name in metadata_keys:
-					continue
-
-				# Ensure nested structure is a dict (ignore stray values like numbers/strings)
-				if not isinstance(child, dict):
-					continue
-
-				# Allow root_type to be overridden at any level, not just root accounts
-				current_root_type = child.get("root_type", root_type)
-
-				account_number = cstr(child.get("account_number")).strip()
-				account_name, account_name_in_db = add_suffix_if_duplicate(
-					account_name, account_number, accounts
-				)
-
-				is_group = identify_is_group(child)
-				report_type = (
-					"Balance Sheet"
-					if current_root_type in ["Asset", "Liability", "Equity"]
-					else "Profit and Loss"
-				)
-
-				# Get account_type from child, or set default based on root_type for non-group accounts
-				account_type = child.get("account_type")
-				if not account_type and current_root_type and not is_group:
-					# Set default account_type based on root_type if not specified (only for non-group accounts)
-					if current_root_type == "Income":
-						account_type = "Income Account"  # Default for Income accounts
-					elif current_root_type == "Expense":
-						account_type = "Expense Account"  # Default for Expense accounts
-					# For other root_types (Asset, Liability, Equity), account_type can be None
-					# Group accounts don't need account_type
-
-				account = frappe.get_doc(
-					{
-						"doctype": "Account",
-						"account_name": child.get("account_name") if from_coa_importer else account_name,
-						"company": company,
-						"parent_account": parent,
-						"is_group": is_group,
-						"root_type": current_root_type,
-						"report_type": report_type,
-						"account_number": account_number,
-						"account_type": account_type,
-						"account_currency": child.get("account_currency")
-						or frappe.get_cached_value("Company", company, "default_currency"),
-						"tax_rate": child.get("tax_rate"),
-					}
-				)
-
-				if root_account or frappe.local.flags.allow_unverified_charts:
-					account.flags.ignore_mandatory = True
-
-				account.flags.ignore_permissions = True
-
-				account.insert()
-
-				accounts.append(account_name_in_db)
-
-				_import_accounts(child, account.name, current_root_type)
-
-		# Rebuild NestedSet HSM tree for Account Doctype
-		# after all accounts are already inserted.
-		frappe.local.flags.ignore_update_nsm = True
-		_import_accounts(chart, None, None, root_account=True)
-		rebuild_tree("Account")
-		frappe.local.flags.ignore_update_nsm = False
+	if not chart:
+		return []
 
+	return compile_tree(chart, from_coa_importer=from_coa_importer)
+
+
+def bulk_create_charts(company, rows):
+	"""
+	Install compiled chart ``rows`` for ``company`` with multi-row inserts.
+
+	Rows are already in nested-set pre-order with chart-relative ``lft``/``rgt``; they are
+	shifted into a range reserved past every bound in use (see `reserve_tree_range`), so
+	no existing account has to be renumbered and concurrent installs do not wait on each other.
+	"""
+	default_currency = frappe.get_cached_value("Company", company, "default_currency")
+	# Chart bounds run from 1 to 2 * len(rows)
+	offset = reserve_tree_range("Account", 2 * len(rows)) - 1
+	timestamp = now()
+	user = frappe.session.user
+	names = []
+	values = []
+
+	for row in rows:
+		name = get_autoname_with_number(row[COL_NUMBER], row[COL_ACCOUNT_NAME], company)
+		parent = None if row[COL_PARENT] < 0 else names[row[COL_PARENT]]
+		names.append(name)
+		values.append(
+			(
+				name,
+				user,
+				user,
+				timestamp,
+				timestamp,
+				0,
+				0,
+				row[COL_ACCOUNT_NAME],
+				row[COL_NUMBER],
+				company,
+				parent,
+				parent or "",
+				row[COL_IS_GROUP],
+				row[COL_ROOT_TYPE],
+				row[COL_REPORT_TYPE],
+				row[COL_ACCOUNT_TYPE],
+				row[COL_CURRENCY] or default_currency,
+				row[COL_TAX_RATE],
+				"No",
+				0,
+				row[COL_LFT] + offset,
+				row[COL_RGT] + offset,
+				row[COL_NAME_AR],
+				row[COL_NAME_FR],
+			)
+		)
+
+	frappe.db.bulk_insert(
+		"Account", BULK_ACCOUNT_FIELDS, values, chunk_size=BULK_INSERT_CHUNK_SIZE
+	)
@@ -3,6 +3,9 @@ import frappe, json, os
 from frappe import _
 from frappe.utils import cstr
 
+from erpnext_lebanese.chart import is_lebanese_chart
+from erpnext_lebanese.chart_index import ROOT, get_chart_index
+
 @frappe.whitelist()
 def get_lebanese_charts(country=None, with_standard=False):
     """
@@ -19,7 +22,7 @@ def get_lebanese_charts(country=None, with_standard=False):
     charts = get_charts_for_country(country, with_standard=with_standard)
     
     # Filter to only return Lebanese charts, or return all if none found
-    lebanese_charts = [c for c in charts if "Lebanese" in c or "lebanese" in c.lower()]
+    lebanese_charts = [c for c in charts if is_lebanese_chart(c)]
     
     return lebanese_charts if lebanese_charts else charts
 
@@ -39,6 +42,10 @@ def get_lebanese_coa(doctype, parent, is_root=None, chart=None):
     frappe.flags.chart = chart
     
     parent = None if parent == _("All Accounts") else parent
+
+    # The Lebanese chart is served from the shared chart index instead of the raw tree
+    if is_lebanese_chart(chart):
+        return _get_lebanese_artifact_nodes(parent)
     
     # Get chart tree from ERPNext's standard method
     chart_tree = get_chart(chart)
@@ -91,6 +98,25 @@ def get_lebanese_coa(doctype, parent, is_root=None, chart=None):
     
     return filtered_accounts
 
+def _get_lebanese_artifact_nodes(parent):
+    """Children of ``parent`` (a "<number> - <name>" value, or None for roots) from the chart index."""
+    index = get_chart_index()
+
+    position = ROOT
+    if parent is not None:
+        position = index.position_of_value(parent)
+        if position is None:
+            return []
+
+    return [
+        {
+            "parent_account": parent,
+            "expandable": index.is_group[child],
+            "value": index.values[child],
+        }
+        for child in index.children(position)
+    ]
+
 # Removed - now using ERPNext's standard get_chart method
 
 def identify_is_group(child):
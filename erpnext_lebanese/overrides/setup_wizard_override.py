@@ -7,6 +7,8 @@ from erpnext.setup.setup_wizard.operations.install_fixtures import (
 	install_defaults as install_defaults_op,
 )
 
+from erpnext_lebanese.chart import is_lebanese_chart
+
 LEBANESE_CHART_NAME = "Lebanese Standard Chart of Accounts"
 LEBANESE_COUNTRY = "Lebanon"
 LEBANESE_CURRENCY = "LBP"
@@ -36,8 +38,7 @@ def _ensure_lebanese_defaults(args_dict):
 	if not args_dict.get("chart_of_accounts"):
 		args_dict.chart_of_accounts = LEBANESE_CHART_NAME
 
-	chart = (args_dict.get("chart_of_accounts") or "").lower()
-	if "lebanese" in chart:
+	if is_lebanese_chart(args_dict.get("chart_of_accounts")):
 		args_dict.country = LEBANESE_COUNTRY
 		args_dict.currency = args_dict.get("currency") or LEBANESE_CURRENCY
 
@@ -1,58 +1,191 @@
 import frappe
-from frappe.query_builder import DocType
-from erpnext.accounts.report.financial_statements import sort_accounts
+from frappe.query_builder import Case, DocType, Parameter
+from frappe.query_builder.functions import Coalesce
+from frappe.utils import cint
+
+from erpnext_lebanese.account_labels import (
+	get_labels_for,
+	normalise_language,
+	uses_lebanese_labels,
+)
+
+# Root accounts of an unnumbered chart, in the order erpnext's sort_accounts gives them
+ROOT_TYPE_ORDER = ("Asset", "Liability", "Equity", "Income", "Expense")
+
+# (site, doctype, schema version, is_root, include_disabled, by_company) -> compiled SQL.
+# Per site: one worker serves several sites, whose schemas (and so compiled SQL) differ
+_query_cache: dict[tuple, str] = {}
 
 
 @frappe.whitelist()
-def get_children(doctype, parent, company, is_root=False, include_disabled=False):
+def get_children(doctype, parent, company, is_root=False, include_disabled=False, language=None):
 	"""
 	Drop-in replacement for erpnext.accounts.utils.get_children that avoids raw SQL expressions
 	in filters (unsupported by the current frappe.qb query engine).
+
+	Each expansion runs one query, compiled once per doctype, node kind and schema version
+	and ordered in SQL the way erpnext's ``sort_accounts`` would order it.
+
+	With ``language`` set, Accounts of a Lebanese-chart company come back with their localized
+	``label`` and ``english`` label inline, so the tree needs no separate label request.
 	"""
 	if isinstance(include_disabled, str):
 		include_disabled = frappe.parse_json(include_disabled)
 	if isinstance(is_root, str):
 		is_root = frappe.parse_json(is_root)
 
-	parent_fieldname = f"parent_{frappe.scrub(doctype)}"
+	query = get_children_query(doctype, bool(is_root), bool(include_disabled), bool(company))
+	records = frappe.db.sql(query, {"parent": parent, "company": company}, as_dict=True)
+
+	if doctype == "Account" and language and uses_lebanese_labels(company):
+		add_localized_labels(records, company, language)
+
+	return records
+
+
+def get_children_query(doctype: str, is_root: bool, include_disabled: bool, by_company: bool) -> str:
+	"""SQL of one tree expansion, with ``%(parent)s`` / ``%(company)s`` placeholders."""
+	# Meta changes with every schema change of the doctype (a custom ``disabled`` field, ...)
+	key = (frappe.local.site, doctype, str(frappe.get_meta(doctype).modified), is_root, include_disabled, by_company)
+	query = _query_cache.get(key)
+	if query is None:
+		query = _query_cache[key] = _compile_children_query(doctype, is_root, include_disabled, by_company)
+	return query
+
+
+def _compile_children_query(doctype: str, is_root: bool, include_disabled: bool, by_company: bool) -> str:
 	doc = DocType(doctype)
-	parent_field = getattr(doc, parent_fieldname)
+	parent_field = getattr(doc, f"parent_{frappe.scrub(doctype)}")
+	is_account = doctype == "Account"
 
-	select_fields = [doc.name.as_("value"), doc.is_group.as_("expandable")]
+	query = frappe.qb.from_(doc).select(doc.name.as_("value"), doc.is_group.as_("expandable"))
 
 	# Additional fields required for Account tree view, mirroring upstream behaviour
-	if doctype == "Account":
-		select_fields.append(doc.root_type)
-
-	query = frappe.qb.from_(doc).select(*select_fields)
+	if is_account:
+		query = query.select(doc.root_type)
 
 	# Apply docstatus filter if column exists (matches upstream behaviour)
 	if frappe.db.has_column(doctype, "docstatus"):
 		query = query.where(doc.docstatus < 2)
 
-	if frappe.db.has_column(doctype, "disabled") and not include_disabled:
+	if not include_disabled and frappe.db.has_column(doctype, "disabled"):
 		query = query.where(doc.disabled == 0)
 
 	if is_root:
 		# Parent is blank or null for root nodes
 		query = query.where((parent_field == "") | parent_field.isnull())
 
-		if doctype == "Account":
+		if is_account:
 			query = query.select(doc.report_type, doc.account_currency)
 
-		if frappe.db.has_column(doctype, "company") and company:
-			query = query.where(doc.company == company)
+		if by_company and frappe.db.has_column(doctype, "company"):
+			query = query.where(doc.company == Parameter("%(company)s"))
 	else:
-		query = query.where(parent_field == parent)
+		query = query.where(parent_field == Parameter("%(parent)s"))
 		query = query.select(parent_field.as_("parent"))
 
-		if doctype == "Account":
+		if is_account:
 			query = query.select(doc.account_currency)
 
-	records = query.run(as_dict=True)
+	if is_account and is_root:
+		# Numbered roots sort by name (i.e. by number), unnumbered ones by root type
+		rank = Case().when(Coalesce(doc.account_number, "") != "", 0)
+		for position, root_type in enumerate(ROOT_TYPE_ORDER, start=1):
+			rank = rank.when(doc.root_type == root_type, position)
+		query = query.orderby(rank.else_(len(ROOT_TYPE_ORDER) + 1))
 
-	if doctype == "Account":
-		sort_accounts(records, is_root, key="value")
+	# Names of a numbered chart start with the account number: this is the number order
+	return query.orderby(doc.name).get_sql()
 
-	return records
+
+@frappe.whitelist()
+def get_subtree(company, root=None, depth=None, is_root=False, include_disabled=False, language=None):
+	"""
+	A whole branch of the Account tree in one ``lft BETWEEN`` query, for "Expand All".
+
+	``root`` is the Account to expand, or with ``is_root`` (or no ``root``) the tree's root
+	node, i.e. every account of ``company``; ``depth`` limits the levels returned below it.
+	The result has the shape of ``frappe.desk.treeview.get_all_nodes``: one
+	``{"parent", "data"}`` entry per expanded node, parents first, children in the order
+	`get_children` gives them.
+	"""
+	frappe.has_permission("Account", "read", throw=True)
+	if isinstance(include_disabled, str):
+		include_disabled = frappe.parse_json(include_disabled)
+	if isinstance(is_root, str):
+		is_root = frappe.parse_json(is_root)
+	depth = cint(depth) or None
+	whole_tree = bool(is_root) or not root
+
+	account = DocType("Account")
+	parent_account = Coalesce(account.parent_account, "")
+	query = (
+		frappe.qb.from_(account)
+		.select(
+			account.name.as_("value"),
+			account.is_group.as_("expandable"),
+			account.root_type,
+			account.report_type,
+			account.account_currency,
+			account.parent_account.as_("parent"),
+		)
+		.where(account.docstatus < 2)
+	)
+	if whole_tree:
+		query = query.where(account.company == company)
+	else:
+		branch = DocType("Account").as_("branch")
+		query = (
+			query.join(branch)
+			.on((branch.company == account.company) & account.lft.between(branch.lft, branch.rgt))
+			.where((branch.name == root) & (branch.company == company) & (account.name != root))
+		)
+	if not include_disabled:
+		query = query.where(account.disabled == 0)
+
+	# Siblings in get_children's order, sorted by the database so names compare with its
+	# collation: roots of an unnumbered chart by root type, everything else by name
+	rank = Case().when(parent_account != "", 0).when(Coalesce(account.account_number, "") != "", 0)
+	for position, root_type in enumerate(ROOT_TYPE_ORDER, start=1):
+		rank = rank.when(account.root_type == root_type, position)
+	query = query.orderby(parent_account).orderby(rank.else_(len(ROOT_TYPE_ORDER) + 1)).orderby(account.name)
+
+	root_value = root or ""
+	children = {}
+	for record in query.run(as_dict=True):
+		parent = (record.parent or "") if whole_tree else record.parent
+		if parent == "":
+			parent = root_value
+		if parent == root_value and whole_tree:
+			# Same fields as get_children: roots carry no parent
+			record.pop("parent")
+		else:
+			record.pop("report_type")
+		children.setdefault(parent, []).append(record)
+
+	# Expanded nodes parents first; children of a disabled or too deep node are left out
+	groups = {}
+	records = []
+	pending = [(root_value, 0)]
+	while pending:
+		node, level = pending.pop()
+		groups[node] = nodes = children.get(node, [])
+		records.extend(nodes)
+		if not depth or level + 1 < depth:
+			pending.extend((record.value, level + 1) for record in reversed(nodes) if record.expandable)
+
+	if language and uses_lebanese_labels(company):
+		add_localized_labels(records, company, language)
+
+	return [{"parent": parent, "data": data} for parent, data in groups.items()]
+
+
+def add_localized_labels(records, company, language):
+	"""Set ``label``/``english`` on each Account record from the company's label index."""
+	labels = get_labels_for(company, normalise_language(language), [record.value for record in records])
+	for record in records:
+		label = labels.get(record.value)
+		if label:
+			record.label = label["label"]
+			record.english = label["english"]
 
@@ -0,0 +1,6 @@
+from erpnext_lebanese.indexes import ensure_indexes
+
+
+def execute():
+	"""Create the composite lookup indexes of `erpnext_lebanese.indexes.LOOKUP_INDEXES`."""
+	ensure_indexes()
@@ -0,0 +1,17 @@
+import frappe
+
+from erpnext_lebanese.data_fixes import run_fixes
+
+
+def execute():
+	"""
+	Apply every rule of `erpnext_lebanese.data_fixes.ACCOUNT_FIXES` to the Lebanese companies.
+
+	Re-list this patch in patches.txt with a new trailing comment whenever a rule is added.
+	"""
+	report = run_fixes()
+	logger = frappe.logger("erpnext_lebanese")
+	if any(report["fixes"].values()):
+		logger.info({"data_fixes": report["fixes"]})
+	if report["violations"]:
+		logger.warning({"data_fix_violations": report["violations"][:50], "count": len(report["violations"])})
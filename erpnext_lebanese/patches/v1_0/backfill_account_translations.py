@@ -0,0 +1,55 @@
+import frappe
+from frappe.query_builder import Case, DocType
+from frappe.query_builder.functions import Coalesce
+
+from erpnext_lebanese.account_labels import clear_company_labels
+from erpnext_lebanese.chart_index import get_chart_index
+from erpnext_lebanese.chart_sync import get_lebanese_companies, record_chart_names
+from erpnext_lebanese.custom_fields import make_custom_fields
+
+# Account numbers per UPDATE ... CASE statement
+CHUNK_SIZE = 500
+
+
+def execute():
+	"""
+	Fill Account.arabic_name / french_name of installed Lebanese charts from the chart.
+
+	Matched by account number across all Lebanese companies at once; names already set
+	(edited by users) are kept.
+	"""
+	make_custom_fields()
+	companies = get_lebanese_companies()
+	if not companies:
+		return
+
+	index = get_chart_index()
+	names = {
+		index.numbers[pos]: {"arabic_name": index.names_ar[pos], "french_name": index.names_fr[pos]}
+		for pos in range(len(index))
+		if index.numbers[pos] and (index.names_ar[pos] or index.names_fr[pos])
+	}
+	numbers = sorted(names)
+
+	account = DocType("Account")
+	for start in range(0, len(numbers), CHUNK_SIZE):
+		chunk = numbers[start : start + CHUNK_SIZE]
+		query = frappe.qb.update(account)
+		for fieldname in ("arabic_name", "french_name"):
+			column = getattr(account, fieldname)
+			translated = [number for number in chunk if names[number][fieldname]]
+			if not translated:
+				continue
+
+			case = Case()
+			for number in translated:
+				case = case.when(account.account_number == number, names[number][fieldname])
+			# Keep translations already on the account
+			query = query.set(column, Case().when(Coalesce(column, "") != "", column).else_(case.else_(column)))
+
+		query.where(account.company.isin(companies) & account.account_number.isin(chunk)).run()
+
+	for company in companies:
+		clear_company_labels(company)
+	# Names still equal to these follow later chart changes (see chart_sync)
+	record_chart_names(index)
@@ -0,0 +1,17 @@
+import frappe
+
+from erpnext_lebanese.chart_sync import sync_chart
+from erpnext_lebanese.custom_fields import make_custom_fields
+
+
+def execute():
+	"""
+	Apply the current lebanese_standard.json to every installed Lebanese company.
+
+	Re-list this patch in patches.txt with a new trailing comment whenever the chart changes.
+	"""
+	# New accounts carry their Arabic / French names: the columns must exist already
+	make_custom_fields()
+	report = sync_chart()
+	if any(report["totals"].values()):
+		frappe.logger("erpnext_lebanese").info({"chart_sync": report["totals"]})
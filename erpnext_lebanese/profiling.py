@@ -0,0 +1,99 @@
+import time
+from contextlib import contextmanager
+
+import frappe
+
+WRITE_STATEMENTS = ("insert", "update", "delete", "replace")
+
+
+class Measurement:
+	"""Wall time, query count and rows written observed by `measure()` or `measure_calls()`."""
+
+	def __init__(self):
+		self.calls = 0
+		self.queries = 0
+		self.writes = 0
+		self.rows_written = 0
+		self.elapsed = 0.0
+
+	def as_dict(self) -> dict:
+		return {
+			"calls": self.calls,
+			"elapsed": round(self.elapsed, 6),
+			"queries": self.queries,
+			"writes": self.writes,
+			"rows_written": self.rows_written,
+		}
+
+
+@contextmanager
+def measure():
+	"""
+	Count every `frappe.db.sql` call (and the rows changed by writes) issued inside the block.
+
+	Works the same way `frappe.recorder` does, by wrapping `frappe.db.sql` for the duration
+	of the block, so nested measurements see the queries of their inner blocks too.
+	"""
+	measurement = Measurement()
+	db = frappe.db
+	original_sql = db.sql
+
+	def sql(query, *args, **kwargs):
+		measurement.queries += 1
+		result = original_sql(query, *args, **kwargs)
+		if str(query).lstrip().lower().startswith(WRITE_STATEMENTS):
+			measurement.writes += 1
+			rowcount = getattr(getattr(db, "_cursor", None), "rowcount", 0) or 0
+			measurement.rows_written += max(rowcount, 0)
+		return result
+
+	db.sql = sql
+	start = time.perf_counter()
+	try:
+		yield measurement
+	finally:
+		measurement.elapsed = time.perf_counter() - start
+		db.sql = original_sql
+
+
+@contextmanager
+def measure_calls(targets: dict[str, list[tuple[object, str]]]):
+	"""
+	Measure every call of the functions in ``targets`` while the block runs.
+
+	``targets`` maps a label to the ``(module, attribute)`` pairs to wrap; calls of all pairs
+	under one label accumulate into one `Measurement`. Patch the name where it is looked up
+	(e.g. the module that imported the function), as `unittest.mock.patch` would.
+
+	Yields ``{label: Measurement}``.
+	"""
+	results = {}
+	originals = []
+
+	for label, pairs in targets.items():
+		measurement = results[label] = Measurement()
+		for module, attribute in pairs:
+			original = getattr(module, attribute)
+			originals.append((module, attribute, original))
+			setattr(module, attribute, _measured(original, measurement))
+
+	try:
+		yield results
+	finally:
+		for module, attribute, original in reversed(originals):
+			setattr(module, attribute, original)
+
+
+def _measured(function, total: Measurement):
+	def wrapper(*args, **kwargs):
+		with measure() as call:
+			result = function(*args, **kwargs)
+
+		total.calls += 1
+		total.queries += call.queries
+		total.writes += call.writes
+		total.rows_written += call.rows_written
+		total.elapsed += call.elapsed
+		return result
+
+	return wrapper
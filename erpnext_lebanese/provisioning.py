@@ -0,0 +1,166 @@
+"""
+Staged provisioning of a Lebanese company, inside the caller's transaction.
+
+`provision_company` runs the stages of `STAGES` in order, each behind its own savepoint:
+
+- a failing required stage (the chart) is rolled back and re-raised, so the Company save
+  fails as a whole and no half-installed chart is left behind;
+- a failing optional stage is rolled back on its own, logged, and the next stage runs.
+
+Nothing here commits. The request, background job or setup wizard that saves the Company
+commits once when it finishes.
+"""
+from typing import Callable, NamedTuple
+
+import frappe
+
+from erpnext_lebanese.clone import clone_company
+from erpnext_lebanese.default_accounts import (
+	build_cost_center_defaults,
+	build_default_account_map,
+	build_warehouse_defaults,
+)
+from erpnext_lebanese.instrumentation import span
+from erpnext_lebanese.overrides.chart_of_accounts_create_override import (
+	create_charts as lebanese_create_charts,
+)
+from erpnext_lebanese.tax_templates import create_lebanese_tax_templates
+
+LOG_TITLE = "Lebanese Company Setup"
+
+# Used when no account matches the blueprint number (e.g. a customised chart)
+FALLBACK_ACCOUNT_TYPES = {
+	"default_receivable_account": "Receivable",
+	"default_payable_account": "Payable",
+}
+
+
+class Stage(NamedTuple):
+	name: str
+	run: Callable[[frappe._dict], None]
+	required: bool = False
+
+
+def provision_company(company, stages=None, overwrite=True) -> frappe._dict:
+	"""
+	Provision ``company`` (a Company document) with the Lebanese setup.
+
+	``stages`` limits the run to the named stages. With ``overwrite=False`` company default
+	fields that already hold a value are left alone.
+
+	Returns the run context, listing the ``completed`` and ``failed`` stages.
+	"""
+	context = frappe._dict(
+		company=company,
+		overwrite=overwrite,
+		cost_center=company.get("cost_center"),
+		completed=[],
+		failed=[],
+	)
+
+	for stage in STAGES:
+		if stages is None or stage.name in stages:
+			run_stage(stage, context)
+
+	return context
+
+
+def run_stage(stage: Stage, context: frappe._dict) -> None:
+	savepoint = f"lebanese_provisioning_{stage.name}"
+	frappe.db.savepoint(savepoint)
+	_report(context, stage, "started")
+
+	try:
+		with span(f"stage: {stage.name}"):
+			stage.run(context)
+	except Exception:
+		frappe.db.rollback(save_point=savepoint)
+		_report(context, stage, "failed")
+		if stage.required:
+			raise
+
+		context.failed.append(stage.name)
+		frappe.log_error(
+			title=f"{LOG_TITLE}: {stage.name}",
+			reference_doctype="Company",
+			reference_name=context.company.name,
+		)
+		return
+
+	frappe.db.release_savepoint(savepoint)
+	context.completed.append(stage.name)
+	_report(context, stage, "completed")
+
+
+def _report(context: frappe._dict, stage: Stage, status: str) -> None:
+	# Set by callers that want stage progress, e.g. the bulk provisioning jobs
+	observer = frappe.local.flags.lebanese_provisioning_observer
+	if observer:
+		observer(context.company.name, stage.name, status)
+
+
+def install_chart(context: frappe._dict) -> None:
+	company = context.company
+	frappe.local.flags.ignore_root_company_validation = True
+
+	if company.get("create_chart_of_accounts_based_on") == "Existing Company" and company.existing_company:
+		# Copy the template company's chart, cost centers, warehouses and VAT templates;
+		# the later stages then find everything in place
+		clone_company(company.name, company.existing_company)
+		return
+
+	# Bulk install unless the document-by-document path is explicitly requested
+	lebanese_create_charts(
+		company.name,
+		company.chart_of_accounts,
+		company.existing_company,
+		bulk=not frappe.flags.lebanese_chart_document_install,
+	)
+
+
+def set_default_accounts(context: frappe._dict) -> None:
+	company = context.company.name
+	defaults = build_default_account_map(company)
+
+	for fieldname, account_type in FALLBACK_ACCOUNT_TYPES.items():
+		if not defaults.get(fieldname):
+			account = frappe.db.get_value(
+				"Account", {"company": company, "account_type": account_type, "is_group": 0}
+			)
+			if account:
+				defaults[fieldname] = account
+
+	_set_company_defaults(context, defaults)
+
+
+def set_cost_centers(context: frappe._dict) -> None:
+	defaults = build_cost_center_defaults(context.company.name)
+	context.cost_center = defaults.get("cost_center") or context.cost_center
+	_set_company_defaults(context, defaults)
+
+
+def set_warehouses(context: frappe._dict) -> None:
+	_set_company_defaults(context, build_warehouse_defaults(context.company.name))
+
+
+def create_tax_templates(context: frappe._dict) -> None:
+	create_lebanese_tax_templates(context.company.name, context.cost_center)
+
+
+def _set_company_defaults(context: frappe._dict, values: dict[str, str]) -> None:
+	company = context.company
+	if not context.overwrite:
+		values = {fieldname: value for fieldname, value in values.items() if not company.get(fieldname)}
+
+	if values:
+		# One UPDATE for all fields, mirrored on the in-memory document
+		company.db_set(values)
+
+
+STAGES = (
+	Stage("chart", install_chart, required=True),
+	Stage("defaults", set_default_accounts),
+	Stage("cost_centers", set_cost_centers),
+	Stage("warehouses", set_warehouses),
+	Stage("tax_templates", create_tax_templates),
+)
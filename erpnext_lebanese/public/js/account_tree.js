@@ -11,6 +11,9 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 	// Force the server tree method to use the Lebanese-safe implementation.
 	settings.get_tree_nodes = "erpnext_lebanese.overrides.treeview_override.get_children";
 
+	// Labels persisted per company and language, revalidated by version on every tree load
+	const STORAGE_PREFIX = "erpnext_lebanese:account_labels";
+
 	const LANGUAGE_OPTIONS = [
 		{ label: __("English"), value: "en" },
 		{ label: __("Arabic"), value: "ar" },
@@ -27,6 +30,7 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 		console.log("[erpnext_lebanese] Account tree onload hook triggered.");
 		originalOnload && originalOnload(treeview);
 		setupLanguageSelector(treeview);
+		setupAccountSearch(treeview);
 	};
 
 	settings.onrender = function (node) {
@@ -44,6 +48,7 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 
 	settings.post_render = function (treeview) {
 		originalPostRender && originalPostRender(treeview);
+		installSubtreeLoader(treeview);
 		initializeLanguage(treeview);
 	};
 
@@ -56,6 +61,10 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 		// Apply RTL to balance areas after they're created
 		const treeview = frappe.treeview_settings?.Account?.treeview;
 		if (treeview) {
+			// Localized labels arrive inline with the nodes (see treeview_override.get_children)
+			const records = deep ? (nodes || []).flatMap((entry) => entry.data || []) : nodes || [];
+			collectInlineLabels(treeview, records);
+
 			const currentLang = treeview.__lebanese_language || "en";
 			if (currentLang === "ar") {
 				setTimeout(() => {
@@ -121,26 +130,104 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 
 		const defaultLang = resolveDefaultLanguage();
 		select.val(defaultLang);
+		// Ask get_children for labels from the very first tree load
+		setTreeLanguage(treeview, defaultLang);
 
 		select.on("change", () => {
 			const lang = select.val() || "en";
-			treeview.__lebanese_language = lang;
+			setTreeLanguage(treeview, lang);
 			applyRTLDirection(treeview, lang);
-			fetchLabels(treeview, lang, { force: true });
+			// Stored labels only need the visible nodes relabelled; otherwise reload them inline
+			loadVersionedLabels(treeview).then((loaded) => loaded || refreshTree(treeview));
 		});
 
 		const companyField = treeview.page.fields_dict?.company;
 		if (companyField && !companyField.$input.data("lebanese-language-bound")) {
 			companyField.$input.data("lebanese-language-bound", true);
 			companyField.$input.on("change", () => {
-				const lang = select.val() || "en";
+				// The tree reloads itself for the new company, labels inline until known
 				const state = getState();
 				state.cache = {};
-				fetchLabels(treeview, lang, { force: true });
+				setInlineLanguage(treeview, treeview.__lebanese_language);
+				loadVersionedLabels(treeview);
 			});
 		}
 	}
 
+	function setupAccountSearch(treeview) {
+		if (treeview.page.lebanese_account_search) {
+			return;
+		}
+
+		const field = treeview.page.add_field({
+			fieldtype: "Data",
+			fieldname: "lebanese_account_search",
+			label: __("Find Account"),
+		});
+		treeview.page.lebanese_account_search = field;
+
+		const awesomplete = new Awesomplete(field.$input.get(0), {
+			minChars: 1,
+			maxItems: 20,
+			autoFirst: true,
+			list: [],
+			// The server already matched and ranked the accounts (numbers, en/ar/fr names)
+			filter: () => true,
+			sort: false,
+		});
+		let results = {};
+
+		field.$input.on(
+			"input",
+			frappe.utils.debounce(() => {
+				const txt = field.$input.val();
+				const company = getCompany(treeview);
+				if (!txt || !company) return;
+
+				frappe.call({
+					method: "erpnext_lebanese.account_search.search_accounts",
+					args: { company, txt, language: treeview.__lebanese_language },
+					callback: (r) => {
+						results = {};
+						awesomplete.list = (r.message || []).map((row) => {
+							results[row.value] = row;
+							return { label: frappe.utils.escape_html(row.label), value: row.value };
+						});
+						awesomplete.evaluate();
+					},
+				});
+			}, 150)
+		);
+
+		field.$input.on("awesomplete-selectcomplete", () => {
+			const row = results[field.$input.val()];
+			field.$input.val("");
+			row && revealAccount(treeview, row);
+		});
+	}
+
+	async function revealAccount(treeview, row) {
+		const tree = treeview.tree;
+		if (!tree) return;
+
+		// Open every ancestor, loading the ones never expanded yet
+		for (const name of row.path || []) {
+			const node = tree.nodes[name];
+			if (!node) return;
+			if (!node.loaded) {
+				await tree.load_children(node);
+			} else if (!node.expanded) {
+				tree.toggle_node(node);
+			}
+		}
+
+		const target = tree.nodes[row.value];
+		if (target) {
+			tree.set_selected_node(target);
+			target.$tree_link?.get(0)?.scrollIntoView({ block: "center" });
+		}
+	}
+
 	function resolveDefaultLanguage() {
 		const lang = (frappe.boot.user.language || "").toLowerCase();
 		if (lang.startsWith("ar")) return "ar";
@@ -153,36 +240,132 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 		if (!select) return;
 
 		const lang = select.val() || resolveDefaultLanguage();
-		treeview.__lebanese_language = lang;
+		const changed = setTreeLanguage(treeview, lang);
 		applyRTLDirection(treeview, lang);
-		fetchLabels(treeview, lang);
+		loadVersionedLabels(treeview).then((loaded) => {
+			if (changed && !loaded) {
+				refreshTree(treeview);
+			}
+		});
 	}
 
-	function fetchLabels(treeview, lang, opts = {}) {
-		console.log("[erpnext_lebanese] Fetching labels for language:", lang);
-		const state = getState();
+	function setTreeLanguage(treeview, lang) {
+		const changed = treeview.__lebanese_language !== lang;
+		treeview.__lebanese_language = lang;
+		setInlineLanguage(treeview, lang);
+		return changed;
+	}
 
-		const companyField = treeview.page.fields_dict?.company;
-		const company = companyField ? companyField.get_value() : null;
+	function setInlineLanguage(treeview, lang) {
+		// get_children only adds labels inline while the company's full set is not known yet
+		treeview.args = treeview.args || {};
+		treeview.args.language = lang || undefined;
+		if (treeview.tree?.args && treeview.tree.args !== treeview.args) {
+			treeview.tree.args.language = lang || undefined;
+		}
+	}
+
+	function loadVersionedLabels(treeview) {
+		const company = getCompany(treeview);
 		if (!company) {
-			return;
+			return Promise.resolve(false);
 		}
 
-		const cacheKey = `${company}::${lang}`;
-		if (!opts.force && state.cache[cacheKey]) {
-			const payload = state.cache[cacheKey];
-			applyLanguagePayload(treeview, payload, lang);
+		const lang = treeview.__lebanese_language || resolveDefaultLanguage();
+		const stored = readStoredLabels(company, lang);
+
+		return frappe
+			.call({
+				method: "erpnext_lebanese.api.get_account_language_labels",
+				args: { company, language: lang, version: stored?.version, delta: 1, compact: 1 },
+			})
+			.then((r) => {
+				const message = r.message || {};
+				if (!message.enabled) {
+					return false;
+				}
+
+				let labels = stored?.labels;
+				if (message.delta && labels) {
+					labels = Object.assign({}, labels, expandLabels(message.labels));
+					(message.removed || []).forEach((name) => delete labels[name]);
+					storeLabels(company, lang, message.version, labels);
+				} else if (!message.not_modified || !labels) {
+					labels = expandLabels(message.labels);
+					storeLabels(company, lang, message.version, labels);
+				}
+
+				const entry = { enabled: true, language: lang, labels };
+				getState().cache[`${company}::${lang}`] = entry;
+				setInlineLanguage(treeview, null);
+				applyLanguagePayload(treeview, entry, lang);
+				return true;
+			})
+			.catch(() => false);
+	}
+
+	function expandLabels(payload) {
+		// Compact payloads are parallel arrays with "<number> - " and " - ABBR" cut off
+		if (!payload || payload.format !== "compact") {
+			return payload || {};
+		}
+
+		const labels = {};
+		payload.names.forEach((stem, i) => {
+			const prefix = payload.numbers[i] ? `${payload.numbers[i]} - ` : "";
+			const label = prefix + payload.labels[i];
+			const english = payload.english[i] === null ? label : prefix + payload.english[i];
+			labels[prefix + stem + payload.suffix] = { label, english };
+		});
+		return labels;
+	}
+
+	function readStoredLabels(company, lang) {
+		try {
+			return JSON.parse(localStorage.getItem(`${STORAGE_PREFIX}:${company}:${lang}`) || "null");
+		} catch (e) {
+			return null;
+		}
+	}
+
+	function storeLabels(company, lang, version, labels) {
+		if (!version) return;
+		try {
+			localStorage.setItem(`${STORAGE_PREFIX}:${company}:${lang}`, JSON.stringify({ version, labels }));
+		} catch (e) {
+			// Storage full or disabled: the labels are simply fetched again next time
+		}
+	}
+
+	function collectInlineLabels(treeview, records) {
+		const company = getCompany(treeview);
+		if (!company || !records.length) {
 			return;
 		}
 
-		frappe.call({
-			method: "erpnext_lebanese.api.get_account_language_labels",
-			args: { company, language: lang },
-		}).then((r) => {
-			const payload = r.message || { enabled: false, labels: {} };
-			state.cache[cacheKey] = payload;
-			applyLanguagePayload(treeview, payload, lang);
+		const lang = treeview.__lebanese_language || resolveDefaultLanguage();
+		const state = getState();
+		const cacheKey = `${company}::${lang}`;
+		const entry = (state.cache[cacheKey] = state.cache[cacheKey] || {
+			enabled: false,
+			language: lang,
+			labels: {},
+		});
+
+		records.forEach((record) => {
+			if (record && record.english !== undefined) {
+				entry.enabled = true;
+				entry.labels[record.value] = { label: record.label, english: record.english };
+			}
 		});
+
+		// Let the new nodes render first, then swap in the localized labels
+		setTimeout(() => applyLanguagePayload(treeview, entry, lang), 0);
+	}
+
+	function getCompany(treeview) {
+		const companyField = treeview.page.fields_dict?.company;
+		return companyField ? companyField.get_value() : null;
 	}
 
 	function applyLanguagePayload(treeview, payload, lang) {
@@ -205,7 +388,7 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 		}
 
 		updateLanguageSelector(treeview, payload.enabled);
-		refreshTree(treeview);
+		refreshVisibleNodes(treeview);
 	}
 
 	function applyRTLDirection(treeview, lang) {
@@ -269,12 +452,40 @@ console.log("[erpnext_lebanese] account_tree.js loading...");
 		}
 	}
 
+	function installSubtreeLoader(treeview) {
+		const tree = treeview.tree;
+		if (!tree || tree.__lebanese_subtree) return;
+		tree.__lebanese_subtree = true;
+
+		// "Expand All" (and every full reload) fetches the whole branch in one request
+		// instead of one get_children call per expanded node.
+		tree.get_all_nodes = function (value, is_root) {
+			const args = this.args || {};
+			return new Promise((resolve) => {
+				frappe.call({
+					method: "erpnext_lebanese.overrides.treeview_override.get_subtree",
+					args: {
+						company: getCompany(treeview),
+						root: value,
+						is_root: is_root ? 1 : 0,
+						include_disabled: args.include_disabled ? 1 : 0,
+						language: args.language,
+					},
+					callback: (r) => {
+						this.on_get_node(r.message, true);
+						resolve(r.message);
+					},
+				});
+			});
+		};
+	}
+
 	function refreshTree(treeview) {
 		const tree = treeview.tree;
 		if (!tree || !tree.root_node) return;
 
 		tree
-			.load_children(tree.root_node, false)
+			.load_children(tree.root_node, true)
 			.then(() => refreshVisibleNodes(treeview))
 			.catch(() => refreshVisibleNodes(treeview));
 	}
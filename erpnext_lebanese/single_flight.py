@@ -0,0 +1,59 @@
+"""
+Coalesce concurrent computations of the same cached value across workers.
+
+When many requests miss the same cache entry at once (every accountant opening the Chart of
+Accounts at month-end), only the one holding a short Redis lock computes the value and
+publishes it to the cache; the others poll the cache until it appears and reuse it. If the
+computing worker fails or is too slow, the waiters stop waiting and compute it themselves,
+so a lost lock only costs the duplicated work it was meant to save.
+"""
+import time
+
+import frappe
+
+LOCK_PREFIX = "lebanese_single_flight"
+
+# Seconds a computation may hold the lock, and the most a waiter waits for its result
+LOCK_TTL = 60
+WAIT_TIMEOUT = 15
+POLL_INTERVAL = 0.05
+
+# Deletes the lock only if this worker still owns it (it may have expired and been retaken)
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+	return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def single_flight(key: str, compute, read, lock_ttl: int = LOCK_TTL, wait_timeout: float = WAIT_TIMEOUT):
+	"""
+	Return ``read()`` once it has a result, running ``compute()`` in one worker only.
+
+	``compute`` must publish its result where ``read`` finds it and return it; ``read``
+	returns ``None`` while there is nothing published yet.
+	"""
+	cache = frappe.cache()
+	lock_key = cache.make_key(f"{LOCK_PREFIX}::{key}")
+	token = frappe.generate_hash(length=12)
+
+	if cache.set(lock_key, token, nx=True, ex=lock_ttl):
+		try:
+			return compute()
+		finally:
+			cache.eval(RELEASE_SCRIPT, 1, lock_key, token)
+
+	deadline = time.monotonic() + wait_timeout
+	while time.monotonic() < deadline:
+		time.sleep(POLL_INTERVAL)
+		result = read()
+		if result is not None:
+			return result
+		# ``lock_key`` is already prefixed: `exists` would prefix it again, so read it raw
+		if cache.get(lock_key) is None:
+			# The computing worker is done but published nothing (it failed): take over
+			break
+
+	result = read()
+	return result if result is not None else compute()
@@ -0,0 +1,100 @@
+import frappe
+
+from erpnext_lebanese.company_profile import get_company_profile
+from erpnext_lebanese.instrumentation import traced
+
+VAT_TITLE = "VAT 11%"
+VAT_RATE = 11.0
+
+# Tax template doctype -> VAT account number and extra fields of its tax row
+VAT_TEMPLATES = {
+	"Sales Taxes and Charges Template": {
+		"account_number": "4427",
+		"row": {},
+	},
+	"Purchase Taxes and Charges Template": {
+		"account_number": "4426.6",
+		"row": {"add_deduct_tax": "Add"},
+	},
+}
+
+LOG_TITLE = "Lebanese Tax Template Creation"
+
+
+@traced
+def create_lebanese_tax_templates(company: str, cost_center: str | None = None) -> list[str]:
+	"""
+	Create the VAT 11% sales and purchase templates of ``company`` if they do not exist yet.
+
+	The VAT accounts are read in the current transaction, so a chart installed earlier in
+	the same transaction is visible without committing first.
+	"""
+	if not company:
+		return []
+
+	# Resolve both VAT accounts with one query; the templates read them from the profile
+	get_company_profile(company).get_accounts(
+		[template["account_number"] for template in VAT_TEMPLATES.values()]
+	)
+
+	created = []
+	for doctype in VAT_TEMPLATES:
+		name = create_vat_template(doctype, company, cost_center)
+		if name:
+			created.append(name)
+	return created
+
+
+@traced
+def create_vat_template(doctype, company, cost_center=None):
+	template = VAT_TEMPLATES[doctype]
+	account_number = template["account_number"]
+
+	if frappe.db.exists(doctype, {"title": VAT_TITLE, "company": company}):
+		return None
+
+	profile = get_company_profile(company)
+	account = profile.get_account(account_number)
+
+	if not account:
+		frappe.log_error(
+			f"Account {account_number} not found for company {company}. Cannot create {doctype}.",
+			LOG_TITLE,
+		)
+		return None
+
+	cost_center = cost_center or profile.cost_center
+
+	if not cost_center:
+		frappe.log_error(
+			f"Cost center not found for company {company}. Cannot create {doctype}.",
+			LOG_TITLE,
+		)
+		return None
+
+	company_currency = profile.currency or "LBP"
+
+	doc = frappe.get_doc(
+		{
+			"doctype": doctype,
+			"title": VAT_TITLE,
+			"company": company,
+			"taxes": [
+				{
+					"charge_type": "On Net Total",
+					"account_head": account,
+					"description": f"VAT @ {VAT_RATE:g}%",
+					"included_in_print_rate": 0,
+					"included_in_paid_amount": 0,
+					"cost_center": cost_center,
+					"rate": VAT_RATE,
+					"account_currency": company_currency,
+					**template["row"],
+				}
+			],
+		}
+	)
+	doc.flags.ignore_permissions = True
+	doc.flags.ignore_mandatory = True
+	doc.insert()
+	return doc.name
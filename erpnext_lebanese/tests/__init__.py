@@ -1,2 +1,64 @@
 """Test package for erpnext_lebanese."""
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import random_string
 
+
+def unique_company(prefix: str) -> tuple[str, str]:
+	"""A company name starting with ``prefix`` and an abbreviation, both unused."""
+	suffix = random_string(5).upper()
+	return f"{prefix} {suffix}", f"{prefix[:2]}{suffix}".upper()[:5]
+
+
+def new_lebanese_company(prefix: str, **fields):
+	"""An unsaved Lebanese (LBP) Company named after ``prefix``."""
+	company_name, abbr = unique_company(prefix)
+	return frappe.get_doc(
+		{
+			"doctype": "Company",
+			"company_name": company_name,
+			"abbr": abbr,
+			"country": "Lebanon",
+			"default_currency": "LBP",
+			**fields,
+		}
+	)
+
+
+def delete_companies(companies) -> None:
+	for company in companies:
+		if frappe.db.exists("Company", company):
+			frappe.delete_doc("Company", company, force=1, ignore_permissions=True)
+	frappe.db.commit()
+
+
+class LebaneseCompanyTestCase(FrappeTestCase):
+	"""Tests sharing one Lebanese company, ``cls.company``, created for the class."""
+
+	company_prefix = "Test Co"
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.company = new_lebanese_company(cls.company_prefix).insert()
+
+	@classmethod
+	def tearDownClass(cls):
+		delete_companies([cls.company.name])
+		super().tearDownClass()
+
+
+class CompanyFactoryTestCase(FrappeTestCase):
+	"""Tests creating their own companies; every name in ``created_companies`` is deleted after each test."""
+
+	def setUp(self):
+		self.created_companies = []
+
+	def tearDown(self):
+		# Newest first: clones are deleted before their source company
+		delete_companies(reversed(self.created_companies))
+
+	def make_company(self, prefix: str, insert: bool = True, **fields):
+		company = new_lebanese_company(prefix, **fields)
+		self.created_companies.append(company.company_name)
+		return company.insert() if insert else company
@@ -0,0 +1,150 @@
+import frappe
+
+from erpnext_lebanese.account_labels import bump_labels_version, get_company_labels, get_labels_version
+from erpnext_lebanese.api import get_account_language_labels
+from erpnext_lebanese.overrides.treeview_override import get_children
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import LebaneseCompanyTestCase
+
+
+class TestAccountLabelIndex(LebaneseCompanyTestCase):
+	company_prefix = "Label Index Co"
+
+	def _receivable_parent(self):
+		return frappe.db.get_value(
+			"Account", {"company": self.company.name, "account_number": "411"}, "name"
+		)
+
+	def test_labels_are_served_from_cache(self):
+		labels = get_company_labels(self.company.name, "ar")
+		receivable = frappe.db.get_value(
+			"Account", {"company": self.company.name, "account_number": "4111"}, "name"
+		)
+		self.assertTrue(labels[receivable]["label"].startswith("4111 - "))
+		self.assertNotEqual(labels[receivable]["label"], labels[receivable]["english"])
+
+		with measure() as cached:
+			self.assertEqual(get_company_labels(self.company.name, "ar"), labels)
+		self.assertEqual(cached.queries, 0)
+
+	def test_doc_events_update_single_entries(self):
+		get_company_labels(self.company.name, "en")
+
+		account = frappe.get_doc(
+			{
+				"doctype": "Account",
+				"account_name": "Label Index Customer",
+				"account_number": "4111.99",
+				"company": self.company.name,
+				"parent_account": self._receivable_parent(),
+				"is_group": 0,
+			}
+		).insert(ignore_permissions=True)
+		self.assertEqual(
+			get_company_labels(self.company.name, "fr")[account.name]["label"],
+			"4111.99 - Label Index Customer",
+		)
+
+		account.delete(ignore_permissions=True)
+		self.assertNotIn(account.name, get_company_labels(self.company.name, "fr"))
+
+	def test_labels_scoped_to_parents_or_names(self):
+		parent = self._receivable_parent()
+		children = frappe.get_all(
+			"Account", filters={"company": self.company.name, "parent_account": parent}, pluck="name"
+		)
+
+		payload = get_account_language_labels(self.company.name, "ar", parents=[parent])
+		self.assertTrue(payload["partial"])
+		self.assertEqual(set(payload["labels"]), set(children))
+
+		payload = get_account_language_labels(self.company.name, "ar", names=frappe.as_json([parent]))
+		self.assertEqual(list(payload["labels"]), [parent])
+
+	def test_tree_children_carry_inline_labels(self):
+		parent = self._receivable_parent()
+		records = get_children("Account", parent, self.company.name, language="ar")
+		expected = get_account_language_labels(self.company.name, "ar", parents=[parent])["labels"]
+
+		self.assertTrue(records)
+		for record in records:
+			self.assertEqual(record.label, expected[record.value]["label"])
+			self.assertEqual(record.english, expected[record.value]["english"])
+
+		plain = get_children("Account", parent, self.company.name)
+		self.assertFalse(any("label" in record for record in plain))
+
+	def test_unchanged_version_is_not_sent_again(self):
+		first = get_account_language_labels(self.company.name, "ar")
+		self.assertTrue(first["labels"])
+
+		again = get_account_language_labels(self.company.name, "ar", version=first["version"])
+		self.assertTrue(again["not_modified"])
+		self.assertNotIn("labels", again)
+
+		account = frappe.get_doc(
+			"Account", frappe.db.get_value("Account", {"company": self.company.name, "account_number": "4111"})
+		)
+		account.account_name = f"{account.account_name} Renamed"
+		account.save(ignore_permissions=True)
+
+		changed = get_account_language_labels(self.company.name, "ar", version=first["version"])
+		self.assertNotEqual(changed["version"], first["version"])
+		self.assertIn(account.name, changed["labels"])
+
+	def test_bump_moves_a_handed_out_version(self):
+		version = get_labels_version(self.company.name)
+		self.assertEqual(get_labels_version(self.company.name), version)
+
+		bump_labels_version(self.company.name)
+		bumped = get_labels_version(self.company.name)
+
+		self.assertNotEqual(bumped, version)
+		self.assertEqual(int(bumped.partition("-")[0]), int(version.partition("-")[0]) + 1)
+
+	def test_compact_payload_expands_to_the_same_labels(self):
+		full = get_account_language_labels(self.company.name, "ar")
+		compact = get_account_language_labels(self.company.name, "ar", compact=1)["labels"]
+
+		expanded = {}
+		for i, stem in enumerate(compact["names"]):
+			prefix = f"{compact['numbers'][i]} - " if compact["numbers"][i] else ""
+			label = prefix + compact["labels"][i]
+			english = label if compact["english"][i] is None else prefix + compact["english"][i]
+			expanded[prefix + stem + compact["suffix"]] = {"label": label, "english": english}
+
+		self.assertEqual(expanded, full["labels"])
+		self.assertLess(len(frappe.as_json(compact)) * 2, len(frappe.as_json(full["labels"])))
+
+	def test_delta_sends_only_changed_accounts(self):
+		first = get_account_language_labels(self.company.name, "fr")
+		account = frappe.get_doc(
+			"Account", frappe.db.get_value("Account", {"company": self.company.name, "account_number": "4011"})
+		)
+		account.account_name = f"{account.account_name} Delta"
+		account.save(ignore_permissions=True)
+
+		delta = get_account_language_labels(self.company.name, "fr", version=first["version"], delta=1)
+		self.assertTrue(delta["delta"])
+		self.assertEqual(list(delta["labels"]), [account.name])
+		self.assertEqual(delta["removed"], [])
+
+		unknown = get_account_language_labels(self.company.name, "fr", version="1-unknown", delta=1)
+		self.assertNotIn("delta", unknown)
+		self.assertGreater(len(unknown["labels"]), 1)
+
+	def test_labels_come_from_the_account_name_columns(self):
+		from erpnext_lebanese.chart_index import get_chart_index
+
+		index = get_chart_index()
+		position = index.position("4111")
+		account = frappe.get_doc(
+			"Account", frappe.db.get_value("Account", {"company": self.company.name, "account_number": "4111"})
+		)
+		self.assertEqual(account.arabic_name, index.names_ar[position])
+		self.assertEqual(account.french_name, index.names_fr[position])
+
+		get_company_labels(self.company.name, "ar")
+		account.arabic_name = "زبائن مخصصون"
+		account.save(ignore_permissions=True)
+		self.assertEqual(get_company_labels(self.company.name, "ar")[account.name]["label"], "4111 - زبائن مخصصون")
@@ -0,0 +1,76 @@
+import frappe
+
+from erpnext_lebanese.account_resolver import clear_account_map, resolve_account, resolve_accounts
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import LebaneseCompanyTestCase
+
+
+class TestAccountResolver(LebaneseCompanyTestCase):
+	company_prefix = "Resolver Co"
+
+	def test_map_is_loaded_once_and_served_from_cache(self):
+		company = self.company.name
+		clear_account_map(company)
+
+		with measure() as first:
+			accounts = resolve_accounts(company, ["4011", "4111", "4427"])
+		self.assertEqual(first.queries, 1)
+		self.assertEqual(
+			accounts["4011"],
+			frappe.db.get_value("Account", {"company": company, "account_number": "4011"}),
+		)
+
+		with measure() as cached:
+			self.assertEqual(resolve_account(company, "4011"), accounts["4011"])
+			self.assertEqual(resolve_accounts(company, ["4111", "4427"]), {n: accounts[n] for n in ("4111", "4427")})
+		self.assertEqual(cached.queries, 0)
+
+	def test_doc_events_keep_the_map_current(self):
+		company = self.company.name
+		resolve_account(company, "4011")
+		parent = resolve_account(company, "401")
+
+		account = frappe.get_doc(
+			{
+				"doctype": "Account",
+				"account_name": "Resolver Test",
+				"account_number": "4019.9",
+				"company": company,
+				"parent_account": parent,
+				"root_type": "Liability",
+				"report_type": "Balance Sheet",
+			}
+		).insert(ignore_permissions=True)
+
+		with measure() as inserted:
+			self.assertEqual(resolve_account(company, "4019.9"), account.name)
+		self.assertEqual(inserted.queries, 0)
+
+		account.delete()
+		self.assertIsNone(resolve_account(company, "4019.9"))
+
+	def test_map_loaded_without_writes_survives_a_rollback(self):
+		company = self.company.name
+		clear_account_map(company)
+		frappe.db.commit()
+
+		resolve_account(company, "4011")
+		# Frappe ends read-only requests with a rollback
+		frappe.db.rollback()
+
+		with measure() as after_rollback:
+			resolve_account(company, "4111")
+		self.assertEqual(after_rollback.queries, 0)
+
+	def test_map_loaded_with_pending_writes_is_dropped_on_rollback(self):
+		company = self.company.name
+		clear_account_map(company)
+		frappe.db.commit()
+
+		frappe.db.set_value("Company", company, "website", "https://example.com")
+		resolve_account(company, "4011")
+		frappe.db.rollback()
+
+		with measure() as after_rollback:
+			resolve_account(company, "4111")
+		self.assertEqual(after_rollback.queries, 1)
@@ -0,0 +1,121 @@
+import frappe
+
+from erpnext_lebanese import account_search
+from erpnext_lebanese.account_search import (
+	account_query,
+	get_search_index,
+	normalise,
+	search_accounts,
+	search_link,
+)
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import LebaneseCompanyTestCase, delete_companies, new_lebanese_company
+
+
+class TestAccountSearch(LebaneseCompanyTestCase):
+	company_prefix = "Account Search Co"
+
+	def _account(self, account_number):
+		return frappe.get_doc(
+			"Account", frappe.db.get_value("Account", {"company": self.company.name, "account_number": account_number})
+		)
+
+	def _search(self, txt, **kwargs):
+		return [row["value"] for row in search_accounts(self.company.name, txt, **kwargs)]
+
+	def test_normalise_folds_arabic_and_latin_variants(self):
+		self.assertEqual(normalise("إيرادات"), normalise("ايرادات"))
+		self.assertEqual(normalise("أَصْـــول"), "اصول")
+		self.assertEqual(normalise("مؤسسة"), "موسسه")
+		self.assertEqual(normalise("مستوى"), "مستوي")
+		self.assertEqual(normalise("Créances Clients"), "creances clients")
+
+	def test_number_prefix_ranks_exact_number_first(self):
+		receivable = self._account("4111")
+		results = search_accounts(self.company.name, "411")
+		self.assertEqual(results[0]["account_number"], "411")
+		self.assertIn(receivable.name, [row["value"] for row in results])
+		self.assertTrue(all(row["account_number"].startswith("411") for row in results))
+
+		row = next(row for row in results if row["value"] == receivable.name)
+		self.assertEqual(row["path"][-1], receivable.parent_account)
+		self.assertFalse(frappe.db.get_value("Account", row["path"][0], "parent_account"))
+
+	def test_names_match_in_every_language(self):
+		account = self._account("4111")
+		account.arabic_name = "زبائن مؤسسات"
+		account.french_name = "Créances clients"
+		account.save(ignore_permissions=True)
+
+		self.assertIn(account.name, self._search("زباين موسسات"))
+		self.assertIn(account.name, self._search("زَبائِن"))
+		self.assertIn(account.name, self._search("creances cli"))
+		self.assertIn(account.name, self._search(account.account_name[:4]))
+
+		row = search_accounts(self.company.name, "Créances", language="ar")[0]
+		self.assertEqual(row["label"], "4111 - زبائن مؤسسات")
+
+	def test_index_follows_account_changes(self):
+		get_search_index(self.company.name)
+		with measure() as cached:
+			get_search_index(self.company.name)
+		self.assertEqual(cached.queries, 0)
+
+		account = self._account("4111")
+		account.french_name = "Clients recherchés"
+		account.save(ignore_permissions=True)
+		self.assertIn(account.name, self._search("recherches"))
+
+		new_name = frappe.rename_doc("Account", account.name, f"{account.name} Renamed", force=True)
+		self.assertIn(new_name, self._search("recherches"))
+		self.assertNotIn(account.name, self._search("recherches"))
+
+	def test_disabled_accounts_are_left_out_unless_asked(self):
+		account = self._account("4111")
+		account.disabled = 1
+		account.save(ignore_permissions=True)
+		try:
+			self.assertNotIn(account.name, self._search("4111"))
+			self.assertIn(account.name, self._search("4111", include_disabled=1))
+		finally:
+			account.disabled = 0
+			account.save(ignore_permissions=True)
+
+	def test_link_query_returns_name_and_label(self):
+		results = account_query(
+			"Account", "4111", "name", 0, 20, {"company": self.company.name, "is_group": 0}
+		)
+		self.assertTrue(results)
+		name, label = results[0]
+		self.assertEqual(frappe.db.get_value("Account", name, "account_number"), "4111")
+		self.assertTrue(label.startswith("4111"))
+		self.assertFalse(any(frappe.db.get_value("Account", row[0], "is_group") for row in results))
+
+	def test_link_search_uses_the_index_for_lebanese_companies(self):
+		account = self._account("4111")
+		results = search_link("Account", "4111", filters={"company": self.company.name})
+		self.assertEqual(results[0]["value"], account.name)
+		self.assertTrue(results[0]["description"].startswith("4111"))
+
+	def test_link_search_fallback_keeps_the_disabled_filter(self):
+		account = self._account("4111")
+		account.disabled = 1
+		account.save(ignore_permissions=True)
+		try:
+			# A list filter is not answered by the index
+			filters = {"company": self.company.name, "account_currency": ["in", ["LBP", "USD"]]}
+			results = search_link("Account", account.account_name, filters=filters, page_length=50)
+			self.assertNotIn(account.name, [row["value"] for row in results])
+		finally:
+			account.disabled = 0
+			account.save(ignore_permissions=True)
+
+	def test_link_search_of_other_companies_is_left_to_frappe(self):
+		company = new_lebanese_company("Search Other Co", country="France", chart_of_accounts="Standard")
+		company.insert(ignore_permissions=True)
+		try:
+			search_link("Account", "4111", filters={"company": company.name})
+			search_link("Account", "4111")
+			self.assertNotIn((frappe.local.site, company.name), account_search._indexes)
+		finally:
+			delete_companies([company.name])
@@ -0,0 +1,39 @@
+import frappe
+
+from erpnext_lebanese.bulk_provisioning import enqueue_companies, get_batch_status
+from erpnext_lebanese.tests import CompanyFactoryTestCase, unique_company
+
+
+class TestBulkProvisioning(CompanyFactoryTestCase):
+	def _spec(self):
+		company_name, abbr = unique_company("Bulk Co")
+		spec = {"company_name": company_name, "abbr": abbr}
+		self.created_companies.append(spec["company_name"])
+		return spec
+
+	def test_batch_provisions_each_company_and_reports_status(self):
+		specs = [self._spec(), self._spec()]
+		result = enqueue_companies(frappe.as_json([*specs, specs[0]]))
+
+		self.assertEqual(result["queued"], [spec["company_name"] for spec in specs])
+		self.assertEqual([row["company"] for row in result["skipped"]], [specs[0]["company_name"]])
+
+		status = get_batch_status(result["batch"])
+		self.assertTrue(status["done"])
+		self.assertEqual(status["totals"]["completed"], 2)
+		for spec in specs:
+			company_status = status["companies"][spec["company_name"]]
+			self.assertEqual(company_status["stage"], "tax_templates")
+			self.assertEqual(company_status["stage_status"], "completed")
+			self.assertTrue(frappe.db.count("Account", {"company": spec["company_name"]}))
+
+	def test_batch_status_serialises_as_json(self):
+		spec = self._spec()
+		batch = enqueue_companies([spec])["batch"]
+
+		status = frappe.parse_json(frappe.as_json(get_batch_status(batch)))
+		self.assertEqual(list(status["companies"]), [spec["company_name"]])
+		self.assertEqual(status["companies"][spec["company_name"]]["status"], "completed")
+
+	def test_specs_need_name_and_abbr(self):
+		self.assertRaises(frappe.ValidationError, enqueue_companies, [{"company_name": "No Abbr"}])
@@ -0,0 +1,70 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_lebanese.chart import (
+	ARTIFACT_COLUMNS,
+	COL_LFT,
+	COL_NUMBER,
+	COL_PARENT,
+	COL_RGT,
+	CHART_NAME,
+	compile_chart,
+	get_chart_artifact,
+	is_lebanese_chart,
+)
+from erpnext_lebanese.chart_index import ROOT, get_chart_index
+
+
+class TestChartArtifact(FrappeTestCase):
+	def test_rows_are_preordered_nested_set(self):
+		artifact = compile_chart()
+		rows = artifact["rows"]
+
+		self.assertEqual(artifact["columns"], list(ARTIFACT_COLUMNS))
+		self.assertGreater(len(rows), 500)
+		self.assertEqual(max(row[COL_RGT] for row in rows), 2 * len(rows))
+
+		for index, row in enumerate(rows):
+			parent = row[COL_PARENT]
+			self.assertLess(parent, index)
+			if parent >= 0:
+				self.assertTrue(rows[parent][COL_LFT] < row[COL_LFT] < row[COL_RGT] < rows[parent][COL_RGT])
+
+		numbers = [row[COL_NUMBER] for row in rows if row[COL_NUMBER]]
+		self.assertEqual(len(numbers), len(set(numbers)))
+
+	def test_artifact_is_cached_under_content_hash(self):
+		artifact = compile_chart()
+		cached = frappe.cache().get_value(f"lebanese_chart_artifact::{artifact['hash']}")
+
+		self.assertEqual(cached["hash"], artifact["hash"])
+		self.assertEqual(get_chart_artifact()["hash"], artifact["hash"])
+
+
+class TestChartIndex(FrappeTestCase):
+	def test_renamed_lebanese_charts_are_recognised(self):
+		for name in (CHART_NAME, "lebanese standard chart of accounts", "Lebanese Standard Chart of Accounts (2024)"):
+			self.assertTrue(is_lebanese_chart(name))
+		for name in (None, "", "Standard", "Standard with Numbers"):
+			self.assertFalse(is_lebanese_chart(name))
+
+	def test_index_matches_artifact(self):
+		rows = get_chart_artifact()["rows"]
+		index = get_chart_index()
+
+		self.assertIs(get_chart_index(), index)
+		self.assertEqual([list(row) for row in index.iter_rows()], [list(row) for row in rows])
+
+	def test_children_and_subtree_lookups(self):
+		index = get_chart_index()
+		self.assertEqual([index.numbers[pos] for pos in index.children(ROOT)], list("12345678"))
+
+		debtors = index.position("41")
+		children = [index.numbers[pos] for pos in index.children(debtors)]
+		self.assertIn("411", children)
+		self.assertTrue(all(index.parent(pos) == debtors for pos in index.children(debtors)))
+
+		branch = index.subtree(debtors)
+		self.assertIn(index.position("4111"), branch)
+		self.assertNotIn(index.position("401"), branch)
+		self.assertEqual(index.position_of_value(index.values[debtors]), debtors)
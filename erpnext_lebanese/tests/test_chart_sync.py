@@ -0,0 +1,137 @@
+import frappe
+
+from erpnext_lebanese.chart_index import get_chart_index
+from erpnext_lebanese.chart_sync import CHART_NAMES_KEY, get_previous_chart_names, sync_chart
+from erpnext_lebanese.tests import LebaneseCompanyTestCase
+
+
+class TestChartSync(LebaneseCompanyTestCase):
+	company_prefix = "Chart Sync Co"
+
+	def _account(self, number):
+		return frappe.db.get_value(
+			"Account",
+			{"company": self.company.name, "account_number": number},
+			["name", "account_name", "root_type", "report_type", "is_group", "parent_account"],
+			as_dict=True,
+		)
+
+	def test_dry_run_reports_and_sync_applies_chart_differences(self):
+		company = self.company.name
+		suppliers = self._account("401")
+		frappe.db.set_value(
+			"Account",
+			suppliers.name,
+			{
+				"root_type": "Expense",
+				"report_type": "Profit and Loss",
+				"account_name": "Old Label",
+				"modified_by": "Guest",
+			},
+			update_modified=False,
+		)
+		# A leaf of the chart, dropped behind the chart's back
+		removed = self._account("4119")
+		frappe.db.delete("Account", {"name": removed.name})
+
+		report = sync_chart([company], dry_run=True)
+		summary = report["companies"][company]
+		self.assertEqual(summary["new_accounts"], 1)
+		self.assertEqual(report["totals"]["root_type"], 1)
+		self.assertEqual(report["totals"]["report_type"], 1)
+		self.assertNotIn("account_name", report["totals"])
+		self.assertEqual(self._account("401").root_type, "Expense")
+
+		sync_chart([company])
+
+		self.assertEqual(self._account("401").root_type, "Liability")
+		self.assertEqual(frappe.db.get_value("Account", suppliers.name, "modified_by"), frappe.session.user)
+		# Names are the user's: a renamed account keeps its name
+		self.assertEqual(self._account("401").account_name, "Old Label")
+		self.assertEqual(self._account("4119").name, removed.name)
+
+		bounds = {
+			row.name: row
+			for row in frappe.get_all(
+				"Account", filters={"company": company}, fields=["name", "parent_account", "lft", "rgt"]
+			)
+		}
+		for row in bounds.values():
+			if row.parent_account:
+				parent = bounds[row.parent_account]
+				self.assertTrue(parent.lft < row.lft < row.rgt < parent.rgt)
+
+		self.assertFalse(any(sync_chart([company], dry_run=True)["totals"].values()))
+		frappe.db.set_value("Account", suppliers.name, "account_name", suppliers.account_name)
+
+	def _drop_leaf_under_a_leaf(self):
+		"""Delete 4119 and turn its parent into a leaf, as if the chart had just added the child."""
+		removed = self._account("4119")
+		frappe.db.delete("Account", {"name": removed.name})
+		frappe.db.set_value("Account", removed.parent_account, "is_group", 0)
+		return removed
+
+	def test_leaves_getting_new_children_become_groups(self):
+		removed = self._drop_leaf_under_a_leaf()
+
+		report = sync_chart([self.company.name])
+
+		self.assertEqual(report["totals"]["groups"], 1)
+		self.assertEqual(frappe.db.get_value("Account", removed.parent_account, "is_group"), 1)
+		self.assertEqual(self._account("4119").parent_account, removed.parent_account)
+
+	def test_new_children_of_a_leaf_with_entries_are_held_back(self):
+		removed = self._drop_leaf_under_a_leaf()
+		entry = frappe.get_doc(
+			{
+				"doctype": "GL Entry",
+				"name": frappe.generate_hash(length=10),
+				"account": removed.parent_account,
+				"company": self.company.name,
+				"posting_date": frappe.utils.today(),
+				"debit": 1,
+			}
+		)
+		entry.db_insert()
+		try:
+			report = sync_chart([self.company.name])
+			blocked = report["companies"][self.company.name]["blocked"]
+
+			self.assertEqual(report["totals"]["groups"], 0)
+			self.assertEqual([row["parent_account"] for row in blocked], [removed.parent_account])
+			self.assertEqual(frappe.db.get_value("Account", removed.parent_account, "is_group"), 0)
+			self.assertIsNone(self._account("4119"))
+		finally:
+			frappe.db.delete("GL Entry", {"name": entry.name})
+			sync_chart([self.company.name])
+
+	def test_translated_names_follow_the_chart_unless_edited(self):
+		index = get_chart_index()
+		outdated, edited, empty = (self._account(number) for number in ("4111", "4011", "401"))
+		chart_names = {
+			number: (index.names_ar[index.position(number)], index.names_fr[index.position(number)])
+			for number in ("4111", "4011", "401")
+		}
+		recorded = frappe.db.get_global(CHART_NAMES_KEY)
+
+		# 4111 still has the previous chart's name, 4011 was renamed by a user, 401 was never set
+		previous = get_previous_chart_names()
+		previous["4111"] = ["اسم قديم", chart_names["4111"][1]]
+		frappe.db.set_global(CHART_NAMES_KEY, frappe.as_json(previous))
+		frappe.db.set_value("Account", outdated.name, "arabic_name", "اسم قديم")
+		frappe.db.set_value("Account", edited.name, "arabic_name", "اسم المستخدم")
+		frappe.db.set_value("Account", empty.name, "french_name", "")
+		try:
+			report = sync_chart([self.company.name])
+
+			self.assertEqual(report["totals"]["arabic_name"], 1)
+			self.assertEqual(report["totals"]["french_name"], 1)
+			self.assertEqual(frappe.db.get_value("Account", outdated.name, "arabic_name"), chart_names["4111"][0])
+			self.assertEqual(frappe.db.get_value("Account", edited.name, "arabic_name"), "اسم المستخدم")
+			self.assertEqual(frappe.db.get_value("Account", empty.name, "french_name"), chart_names["401"][1])
+			# The applied chart is now the previous one
+			self.assertEqual(get_previous_chart_names()["4111"][0], chart_names["4111"][0])
+		finally:
+			frappe.db.set_value("Account", edited.name, "arabic_name", chart_names["4011"][0])
+			frappe.db.set_global(CHART_NAMES_KEY, recorded)
+
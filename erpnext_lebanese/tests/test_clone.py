@@ -0,0 +1,83 @@
+import frappe
+
+from erpnext_lebanese.tax_templates import VAT_TITLE
+from erpnext_lebanese.tests import CompanyFactoryTestCase
+
+
+class TestCompanyClone(CompanyFactoryTestCase):
+	def _structure(self, company):
+		rows = frappe.get_all(
+			"Account",
+			filters={"company": company},
+			fields=["name", "account_number", "account_name", "parent_account", "is_group", "root_type"],
+		)
+		numbers = {row.name: row.account_number or row.account_name for row in rows}
+		return {
+			(numbers[row.name], numbers.get(row.parent_account), row.is_group, row.root_type) for row in rows
+		}
+
+	def test_clone_copies_chart_and_setup_from_template_company(self):
+		source = self.make_company("Clone Source")
+		receivable_parent = frappe.db.get_value(
+			"Account", {"company": source.name, "account_number": "411"}, "name"
+		)
+		frappe.get_doc(
+			{
+				"doctype": "Account",
+				"account_name": "Branch Customers",
+				"account_number": "4111.7",
+				"company": source.name,
+				"parent_account": receivable_parent,
+				"is_group": 0,
+			}
+		).insert(ignore_permissions=True)
+
+		clone = self.make_company(
+			"Clone Branch",
+			create_chart_of_accounts_based_on="Existing Company",
+			existing_company=source.name,
+		)
+
+		self.assertEqual(self._structure(clone.name), self._structure(source.name))
+		self.assertTrue(
+			frappe.db.exists("Account", {"company": clone.name, "account_number": "4111.7"})
+		)
+		self.assertFalse(
+			frappe.db.exists("Account", {"company": clone.name, "name": ["like", f"% - {source.abbr}"]})
+		)
+
+		bounds = {
+			row.name: row
+			for row in frappe.get_all(
+				"Account", filters={"company": clone.name}, fields=["name", "parent_account", "lft", "rgt"]
+			)
+		}
+		for row in bounds.values():
+			if row.parent_account:
+				parent = bounds[row.parent_account]
+				self.assertTrue(parent.lft < row.lft < row.rgt < parent.rgt)
+
+		self.assertTrue(frappe.db.exists("Cost Center", f"Main - {clone.abbr}"))
+		self.assertEqual(
+			frappe.db.get_value("Cost Center", f"{clone.name} - {clone.abbr}", "cost_center_name"), clone.name
+		)
+		self.assertTrue(frappe.db.exists("Warehouse", f"Work In Progress - {clone.abbr}"))
+
+		# old_parent follows the renamed parent, so a first save is not taken for a move
+		for doctype, parent_field in (
+			("Account", "parent_account"),
+			("Cost Center", "parent_cost_center"),
+			("Warehouse", "parent_warehouse"),
+		):
+			for row in frappe.get_all(doctype, filters={"company": clone.name}, fields=[parent_field, "old_parent"]):
+				if row.old_parent:
+					self.assertEqual(row.old_parent, row[parent_field])
+
+		account = frappe.get_doc("Account", {"company": clone.name, "account_number": "4111.7"})
+		lft = account.lft
+		account.save(ignore_permissions=True)
+		self.assertEqual(frappe.db.get_value("Account", account.name, "lft"), lft)
+
+		template = frappe.get_doc("Sales Taxes and Charges Template", {"company": clone.name, "title": VAT_TITLE})
+		self.assertTrue(template.taxes[0].account_head.endswith(f" - {clone.abbr}"))
+		self.assertEqual(template.taxes[0].cost_center, f"Main - {clone.abbr}")
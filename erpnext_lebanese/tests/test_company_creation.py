@@ -7,6 +7,7 @@ from frappe.utils import random_string
 from erpnext_lebanese.overrides.setup_wizard_override import (
 	setup_company as wizard_setup_company,
 )
+from erpnext_lebanese.tests import new_lebanese_company
 
 LEBANESE_CHART = "Lebanese Standard Chart of Accounts"
 
@@ -49,6 +50,78 @@ class TestLebaneseCompanyCreation(FrappeTestCase):
 			fingerprint.add((key, row.is_group, row.root_type))
 		return fingerprint
 
+	def _account_rows_fingerprint(self, company_name):
+		rows = frappe.db.get_all(
+			"Account",
+			filters={"company": company_name},
+			fields=[
+				"name",
+				"account_number",
+				"account_name",
+				"parent_account",
+				"old_parent",
+				"is_group",
+				"root_type",
+				"report_type",
+				"account_type",
+				"account_currency",
+				"lft",
+				"rgt",
+			],
+		)
+		numbers = {row.name: row.account_number for row in rows}
+		fingerprint = set()
+		for row in rows:
+			fingerprint.add(
+				(
+					row.account_number or row.account_name,
+					row.account_name,
+					numbers.get(row.parent_account),
+					numbers.get(row.old_parent),
+					row.is_group,
+					row.root_type,
+					row.report_type,
+					row.account_type,
+					row.account_currency,
+					row.rgt - row.lft,
+				)
+			)
+		return fingerprint
+
+	def _insert_company(self, prefix):
+		company = new_lebanese_company(prefix)
+		self.created_companies.append(company.company_name)
+		return company.insert().name
+
+	def _assert_nested_set_consistent(self, company_name):
+		accounts = frappe.db.get_all(
+			"Account",
+			filters={"company": company_name},
+			fields=["name", "parent_account", "lft", "rgt"],
+		)
+		bounds = {row.name: (row.lft, row.rgt) for row in accounts}
+		for row in accounts:
+			self.assertLess(row.lft, row.rgt)
+			if row.parent_account:
+				parent_lft, parent_rgt = bounds[row.parent_account]
+				self.assertGreater(row.lft, parent_lft)
+				self.assertLess(row.rgt, parent_rgt)
+
+	def test_bulk_chart_install_matches_document_install(self):
+		bulk_company = self._insert_company("Bulk Chart Co")
+
+		frappe.flags.lebanese_chart_document_install = True
+		try:
+			document_company = self._insert_company("Doc Chart Co")
+		finally:
+			frappe.flags.lebanese_chart_document_install = False
+
+		self.assertEqual(
+			self._account_rows_fingerprint(bulk_company),
+			self._account_rows_fingerprint(document_company),
+		)
+		self._assert_nested_set_consistent(bulk_company)
+
 	def test_manual_company_creation_installs_lebanese_chart(self):
 		company_name, abbr = self._unique_company("Manual Test Co")
 		self.created_companies.append(company_name)
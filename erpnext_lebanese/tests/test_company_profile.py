@@ -0,0 +1,36 @@
+import frappe
+
+from erpnext_lebanese.company_profile import KEY_ACCOUNT_NUMBERS, get_company_profile
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import LebaneseCompanyTestCase
+
+
+class TestCompanyProfile(LebaneseCompanyTestCase):
+	company_prefix = "Profile Co"
+
+	def test_profile_is_read_once_per_request(self):
+		profile = get_company_profile(self.company.name)
+		self.assertTrue(profile.is_lebanese)
+		self.assertEqual(profile.abbr, self.company.abbr)
+		self.assertEqual(profile.currency, "LBP")
+
+		accounts = profile.get_accounts()
+		self.assertEqual(set(accounts), set(KEY_ACCOUNT_NUMBERS))
+		self.assertTrue(profile.cost_center)
+
+		with measure() as cached:
+			self.assertIs(get_company_profile(self.company.name), profile)
+			profile.get_account("4427")
+			profile.cost_center
+		self.assertEqual(cached.queries, 0)
+
+	def test_saving_the_company_drops_the_profile(self):
+		profile = get_company_profile(self.company.name)
+
+		company = frappe.get_doc("Company", self.company.name)
+		company.phone_no = "01-111111"
+		company.save()
+
+		refreshed = get_company_profile(self.company.name)
+		self.assertIsNot(refreshed, profile)
+		self.assertTrue(refreshed.is_lebanese)
@@ -0,0 +1,55 @@
+import frappe
+
+from erpnext_lebanese.account_labels import get_labels_version
+from erpnext_lebanese.data_fixes import check_root_type_invariants, run_fixes
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import LebaneseCompanyTestCase
+
+
+class TestDataFixes(LebaneseCompanyTestCase):
+	company_prefix = "Data Fix Co"
+
+	def _account(self, number):
+		return frappe.db.get_value(
+			"Account",
+			{"company": self.company.name, "account_number": number},
+			["name", "root_type", "report_type"],
+			as_dict=True,
+		)
+
+	def test_rule_fixes_the_branch_with_one_update(self):
+		company = self.company.name
+		corrupted = {"root_type": "Expense", "report_type": "Profit and Loss"}
+		frappe.db.set_value("Account", self._account("401").name, corrupted)
+		frappe.db.set_value("Account", self._account("4011").name, corrupted)
+
+		violations = check_root_type_invariants([company])
+		self.assertIn(self._account("401").name, [row["account"] for row in violations])
+
+		dry_run = run_fixes(["account_401_balance_sheet"], companies=[company], dry_run=True)
+		self.assertEqual(dry_run["fixes"]["account_401_balance_sheet"], 2)
+		self.assertEqual(self._account("401").root_type, "Expense")
+
+		with measure() as measurement:
+			report = run_fixes(["account_401_balance_sheet"], companies=[company])
+
+		self.assertEqual(measurement.writes, 1)
+		self.assertEqual(report["fixes"]["account_401_balance_sheet"], 2)
+		self.assertEqual(report["violations"], [])
+		for number in ("401", "4011"):
+			self.assertEqual(self._account(number).root_type, "Liability")
+			self.assertEqual(self._account(number).report_type, "Balance Sheet")
+
+	def test_applied_fixes_move_the_labels_version(self):
+		company = self.company.name
+		version = get_labels_version(company)
+		frappe.db.set_value("Account", self._account("401").name, "root_type", "Expense")
+
+		run_fixes(["account_401_balance_sheet"], companies=[company], dry_run=True)
+		self.assertEqual(get_labels_version(company), version)
+
+		run_fixes(["account_401_balance_sheet"], companies=[company])
+		self.assertNotEqual(get_labels_version(company), version)
+
+	def test_unknown_fix_is_rejected(self):
+		self.assertRaises(frappe.ValidationError, run_fixes, ["no_such_fix"])
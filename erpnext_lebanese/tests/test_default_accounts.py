@@ -0,0 +1,41 @@
+import frappe
+
+from erpnext_lebanese.default_accounts import ACCOUNT_BLUEPRINTS, build_default_account_map
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import LebaneseCompanyTestCase
+
+
+class TestDefaultAccountMap(LebaneseCompanyTestCase):
+	company_prefix = "Default Map Co"
+
+	def _account(self, number):
+		return frappe.db.get_value(
+			"Account",
+			{"company": self.company.name, "account_number": number},
+			["name", "account_type", "root_type", "report_type"],
+			as_dict=True,
+		)
+
+	def test_blueprints_resolve_with_one_read_and_one_write(self):
+		receivable = self._account("4111")
+		frappe.db.set_value("Account", receivable.name, "account_type", "")
+		stock_adjustment = self._account("6052")
+		frappe.db.set_value("Account", stock_adjustment.name, "report_type", "Balance Sheet")
+
+		with measure() as resolution:
+			defaults = build_default_account_map(self.company.name)
+
+		# One IN (...) read for all blueprints, one batched UPDATE for all corrections
+		self.assertEqual(resolution.queries, 2)
+		self.assertEqual(resolution.writes, 1)
+
+		self.assertEqual(defaults["default_receivable_account"], receivable.name)
+		self.assertEqual(self._account("4111").account_type, "Receivable")
+		self.assertEqual(self._account("6052").report_type, "Profit and Loss")
+		self.assertEqual(self._account("6052").account_type, "Stock Adjustment")
+		self.assertLessEqual(set(defaults), set(ACCOUNT_BLUEPRINTS))
+
+		with measure() as settled:
+			self.assertEqual(build_default_account_map(self.company.name), defaults)
+		self.assertEqual(settled.queries, 1)
+		self.assertEqual(settled.writes, 0)
@@ -0,0 +1,15 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_lebanese.indexes import LOOKUP_INDEXES, ensure_indexes
+
+
+class TestLookupIndexes(FrappeTestCase):
+	def test_indexes_exist_and_creation_is_idempotent(self):
+		ensure_indexes()
+
+		for doctype, indexes in LOOKUP_INDEXES.items():
+			for index_name in indexes:
+				self.assertTrue(frappe.db.has_index(f"tab{doctype}", index_name), index_name)
+
+		self.assertEqual(ensure_indexes(), [])
@@ -0,0 +1,68 @@
+import frappe
+
+from erpnext_lebanese.erpnext_lebanese.report.lebanese_provisioning_summary.lebanese_provisioning_summary import (
+	execute as provisioning_summary,
+)
+from erpnext_lebanese.instrumentation import LOG_DOCTYPE, span, trace
+from erpnext_lebanese.tests import CompanyFactoryTestCase
+
+
+class TestProvisioningLog(CompanyFactoryTestCase):
+	def test_company_creation_is_logged_step_by_step(self):
+		company = self.make_company("Traced Co")
+
+		log = frappe.get_last_doc(LOG_DOCTYPE, filters={"company": company.name})
+		self.assertEqual(log.operation, "on_update")
+		self.assertEqual(log.status, "Success")
+		self.assertGreater(log.queries, 0)
+
+		steps = {step.span: step for step in log.steps}
+		for name in ("create_default_accounts", "stage: chart", "build_default_account_map", "create_vat_template"):
+			self.assertIn(name, steps)
+		self.assertGreater(steps["stage: chart"].rows_written, 500)
+		self.assertGreater(steps["build_default_account_map"].depth, steps["create_default_accounts"].depth)
+
+		columns, data = provisioning_summary({"company": company.name, "group_by": "Step"})
+		self.assertIn("stage: chart", [row.span for row in data])
+
+	def test_only_provisioning_is_logged(self):
+		company = self.make_company("Traced Co")
+		logs = frappe.db.count(LOG_DOCTYPE, {"company": company.name})
+
+		company.reload()
+		company.save()
+
+		self.assertEqual(frappe.db.count(LOG_DOCTYPE, {"company": company.name}), logs)
+
+	def test_failed_step_is_recorded(self):
+		company = frappe.get_all("Company", pluck="name", limit=1)[0]
+
+		with self.assertRaises(ZeroDivisionError):
+			with trace(company, "test_failure"):
+				with span("doomed"):
+					1 / 0
+
+		log = frappe.get_last_doc(LOG_DOCTYPE, filters={"operation": "test_failure"})
+		self.assertEqual(log.status, "Failed")
+		self.assertEqual(log.steps[0].status, "Failed")
+		self.assertIn("ZeroDivisionError", log.error)
+
+	def test_spans_count_queries_from_one_wrapper(self):
+		company = frappe.get_all("Company", pluck="name", limit=1)[0]
+		db = frappe.local.db
+		wrapped = "sql" in vars(db)
+
+		with trace(company, "test_counters"):
+			with span("outer"):
+				frappe.db.sql("select 1")
+				with span("inner"):
+					frappe.db.sql("select 1")
+
+		# The connection is left as it was found, without a leftover instance attribute
+		self.assertEqual("sql" in vars(db), wrapped)
+
+		log = frappe.get_last_doc(LOG_DOCTYPE, filters={"operation": "test_counters"})
+		steps = {step.span: step for step in log.steps}
+		self.assertEqual(log.queries, 2)
+		self.assertEqual(steps["outer"].queries, 2)
+		self.assertEqual(steps["inner"].queries, 1)
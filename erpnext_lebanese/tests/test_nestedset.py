@@ -0,0 +1,65 @@
+import frappe
+
+from erpnext_lebanese.nestedset import get_max_rgt, rebuild_company_tree, reserve_tree_range
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import CompanyFactoryTestCase
+
+
+class TestCompanyScopedRebuild(CompanyFactoryTestCase):
+	def _create_company(self):
+		return self.make_company("Nested Set Co").name
+
+	def _bounds(self, company):
+		return {
+			row.name: (row.lft, row.rgt)
+			for row in frappe.db.get_all(
+				"Account", filters={"company": company}, fields=["name", "lft", "rgt"]
+			)
+		}
+
+	def test_rebuild_leaves_other_companies_untouched(self):
+		target = self._create_company()
+		other = self._create_company()
+		other_bounds = self._bounds(other)
+
+		renumbered = rebuild_company_tree("Account", target)
+
+		self.assertEqual(renumbered, frappe.db.count("Account", {"company": target}))
+		self.assertEqual(self._bounds(other), other_bounds)
+
+		target_bounds = self._bounds(target)
+		self.assertGreater(
+			min(lft for lft, _rgt in target_bounds.values()),
+			get_max_rgt("Account", exclude_company=target),
+		)
+		for row in frappe.db.get_all(
+			"Account", filters={"company": target}, fields=["name", "parent_account"]
+		):
+			if row.parent_account:
+				parent_lft, parent_rgt = target_bounds[row.parent_account]
+				lft, rgt = target_bounds[row.name]
+				self.assertTrue(parent_lft < lft < rgt < parent_rgt)
+
+	def test_rebuild_cost_does_not_grow_with_company_count(self):
+		target = self._create_company()
+		with measure() as before:
+			rebuild_company_tree("Account", target)
+
+		for _ in range(2):
+			self._create_company()
+
+		with measure() as after:
+			rebuild_company_tree("Account", target)
+
+		self.assertEqual(before.queries, after.queries)
+
+	def test_reserved_ranges_never_overlap(self):
+		first = reserve_tree_range("Account", 10)
+		second = reserve_tree_range("Account", 4)
+
+		self.assertGreater(first, get_max_rgt("Account"))
+		self.assertGreaterEqual(second, first + 10)
+		# The reservation is made outside the transaction: nothing is left to release
+		with measure() as reservation:
+			reserve_tree_range("Account", 1)
+		self.assertEqual(reservation.writes, 0)
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+import frappe
+
+from erpnext_lebanese.provisioning import provision_company
+from erpnext_lebanese.tests import CompanyFactoryTestCase
+
+
+class TestProvisioningPipeline(CompanyFactoryTestCase):
+	def _new_company(self):
+		return self.make_company("Provisioning Co", insert=False)
+
+	def test_provisioning_runs_every_stage_without_committing(self):
+		company = self._new_company()
+		with patch.object(frappe.db, "commit", wraps=frappe.db.commit) as commit:
+			company.insert()
+
+		commit.assert_not_called()
+		company.reload()
+		self.assertTrue(company.default_receivable_account)
+		self.assertTrue(company.cost_center)
+		self.assertTrue(company.default_wip_warehouse)
+		for doctype in ("Sales Taxes and Charges Template", "Purchase Taxes and Charges Template"):
+			self.assertTrue(frappe.db.exists(doctype, {"company": company.name, "title": "VAT 11%"}))
+
+	def test_failing_optional_stage_is_rolled_back_alone(self):
+		company = self._new_company().insert()
+
+		def failing_templates(company_name, cost_center=None):
+			frappe.db.set_value("Company", company_name, "phone_no", "01-000000")
+			raise frappe.ValidationError("template failure")
+
+		with patch(
+			"erpnext_lebanese.provisioning.create_lebanese_tax_templates", side_effect=failing_templates
+		):
+			context = provision_company(company, stages=("warehouses", "tax_templates"))
+
+		self.assertEqual(context.completed, ["warehouses"])
+		self.assertEqual(context.failed, ["tax_templates"])
+		self.assertFalse(frappe.db.get_value("Company", company.name, "phone_no"))
+
+	def test_failing_chart_stage_aborts_company_creation(self):
+		company = self._new_company()
+		with patch(
+			"erpnext_lebanese.provisioning.lebanese_create_charts",
+			side_effect=frappe.ValidationError("chart failure"),
+		):
+			self.assertRaises(frappe.ValidationError, company.insert)
+
+		self.assertFalse(frappe.db.count("Account", {"company": company.company_name}))
@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_lebanese.benchmarks.provisioning import compare_to_baseline, run
+
+
+class TestProvisioningBenchmark(FrappeTestCase):
+	def test_run_records_every_stage_as_json(self):
+		with tempfile.TemporaryDirectory() as directory:
+			output = os.path.join(directory, "provisioning-benchmark.json")
+			report = run(companies=1, paths="manual", output=output)
+
+			with open(output) as f:
+				self.assertEqual(json.load(f)["summary"], report["summary"])
+
+		stages = report["runs"][0]["stages"]
+		self.assertEqual(stages["create_charts"]["calls"], 1)
+		self.assertEqual(stages["bulk_insert"]["calls"], 1)
+		self.assertEqual(stages["build_default_account_map"]["calls"], 1)
+		self.assertEqual(stages["tax_templates"]["calls"], 1)
+		self.assertGreater(stages["create_charts"]["rows_written"], 500)
+		self.assertGreaterEqual(stages["create_charts"]["queries"], stages["bulk_insert"]["queries"])
+		self.assertGreaterEqual(stages["total"]["queries"], stages["create_charts"]["queries"])
+
+	def test_setup_wizard_path_provisions_the_lebanese_chart(self):
+		report = run(companies=1, paths="setup_wizard", output=None)
+
+		result = report["runs"][0]
+		self.assertEqual(result["path"], "setup_wizard")
+		self.assertEqual(result["stages"]["create_charts"]["calls"], 1)
+		self.assertEqual(result["stages"]["bulk_insert"]["calls"], 1)
+		self.assertIn("setup_wizard", report["summary"])
+		# Cleaned up after the run
+		self.assertFalse(frappe.db.exists("Company", result["company"]))
+
+	def test_regressions_beyond_thresholds_are_reported(self):
+		baseline = {"manual": {"tax_templates": {"elapsed": 0.1, "queries": 10}}}
+		summary = {"manual": {"tax_templates": {"elapsed": 0.11, "queries": 14}}}
+
+		regressions = compare_to_baseline(summary, baseline, time_threshold=0.25, query_threshold=0.1)
+
+		self.assertEqual([(r["stage"], r["metric"]) for r in regressions], [("tax_templates", "queries")])
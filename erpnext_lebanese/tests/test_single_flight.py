@@ -0,0 +1,72 @@
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import random_string
+
+from erpnext_lebanese.single_flight import LOCK_PREFIX, single_flight
+
+
+class TestSingleFlight(FrappeTestCase):
+	def setUp(self):
+		self.key = f"test::{random_string(8)}"
+		self.lock_key = frappe.cache().make_key(f"{LOCK_PREFIX}::{self.key}")
+
+	def tearDown(self):
+		frappe.cache().delete(self.lock_key)
+
+	def test_free_key_computes_and_releases_the_lock(self):
+		result = single_flight(self.key, lambda: "computed", lambda: None)
+
+		self.assertEqual(result, "computed")
+		self.assertIsNone(frappe.cache().get(self.lock_key))
+
+	def test_waiter_reuses_the_published_result(self):
+		# Another worker holds the lock and publishes on the second poll
+		frappe.cache().set(self.lock_key, "other-worker", ex=10)
+		polls = []
+
+		def read():
+			polls.append(1)
+			return "published" if len(polls) > 1 else None
+
+		def compute():
+			raise AssertionError("the waiter must not compute")
+
+		self.assertEqual(single_flight(self.key, compute, read), "published")
+		self.assertEqual(frappe.cache().get(self.lock_key), b"other-worker")
+
+	def test_waiter_takes_over_when_the_holder_gives_up(self):
+		frappe.cache().set(self.lock_key, "other-worker", ex=10)
+
+		result = single_flight(self.key, lambda: "computed", lambda: None, wait_timeout=0.2)
+
+		self.assertEqual(result, "computed")
+
+	def test_waiter_does_not_compute_while_the_lock_is_held(self):
+		frappe.cache().set(self.lock_key, "other-worker", ex=10)
+		polls = []
+		computed_after = []
+		start = time.monotonic()
+
+		def read():
+			polls.append(1)
+
+		def compute():
+			computed_after.append(time.monotonic() - start)
+			return "computed"
+
+		self.assertEqual(single_flight(self.key, compute, read, wait_timeout=0.3), "computed")
+		self.assertGreaterEqual(computed_after[0], 0.3)
+		self.assertGreater(len(polls), 2)
+
+	def test_waiter_takes_over_as_soon_as_the_holder_fails(self):
+		frappe.cache().set(self.lock_key, "other-worker", ex=10)
+		start = time.monotonic()
+
+		def read():
+			# The holder failed: its lock is released with nothing published
+			frappe.cache().delete(self.lock_key)
+
+		self.assertEqual(single_flight(self.key, lambda: "computed", read, wait_timeout=5), "computed")
+		self.assertLess(time.monotonic() - start, 1)
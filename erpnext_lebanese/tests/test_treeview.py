@@ -0,0 +1,87 @@
+import frappe
+
+from erpnext_lebanese.overrides import treeview_override
+from erpnext_lebanese.overrides.treeview_override import get_children, get_subtree
+from erpnext_lebanese.profiling import measure
+from erpnext_lebanese.tests import LebaneseCompanyTestCase
+
+
+class TestTreeChildren(LebaneseCompanyTestCase):
+	company_prefix = "Tree Co"
+
+	def test_expansion_is_one_sorted_query(self):
+		roots = get_children("Account", None, self.company.name, is_root=True)
+		self.assertEqual([root.value for root in roots], sorted(root.value for root in roots))
+
+		parent = next(root.value for root in roots if root.expandable)
+		get_children("Account", parent, self.company.name)
+		compiled = len(treeview_override._query_cache)
+
+		with measure() as expand:
+			children = get_children("Account", parent, self.company.name)
+
+		self.assertEqual(expand.queries, 1)
+		self.assertEqual(len(treeview_override._query_cache), compiled)
+		self.assertTrue(children)
+		self.assertEqual([child.value for child in children], sorted(child.value for child in children))
+		self.assertTrue(all(child.parent == parent for child in children))
+
+	def test_disabled_accounts_are_filtered_unless_asked(self):
+		parent = frappe.db.get_value("Account", {"company": self.company.name, "account_number": "401"})
+		child = frappe.get_all("Account", filters={"parent_account": parent}, pluck="name", limit=1)[0]
+		frappe.db.set_value("Account", child, "disabled", 1)
+
+		self.assertNotIn(child, [row.value for row in get_children("Account", parent, self.company.name)])
+		self.assertIn(
+			child,
+			[row.value for row in get_children("Account", parent, self.company.name, include_disabled=True)],
+		)
+
+	def test_subtree_matches_level_by_level_expansion_in_one_query(self):
+		company = self.company.name
+		root = frappe.db.get_value("Account", {"company": company, "account_number": "4"})
+
+		with measure() as subtree:
+			groups = get_subtree(company, root)
+		self.assertEqual(subtree.queries, 1)
+
+		expected = {}
+		pending = [root]
+		while pending:
+			parent = pending.pop()
+			children = get_children("Account", parent, company)
+			expected[parent] = [child.value for child in children]
+			pending.extend(child.value for child in children if child.expandable)
+
+		self.assertEqual(groups[0]["parent"], root)
+		self.assertEqual({group["parent"]: [row.value for row in group["data"]] for group in groups}, expected)
+
+		shallow = get_subtree(company, root, depth=1)
+		self.assertEqual([group["parent"] for group in shallow], [root])
+
+	def test_whole_tree_is_grouped_under_the_root_label(self):
+		groups = get_subtree(self.company.name, "Accounts", is_root=True, language="ar")
+
+		self.assertEqual(groups[0]["parent"], "Accounts")
+		roots = get_children("Account", None, self.company.name, is_root=True)
+		self.assertEqual([row.value for row in groups[0]["data"]], [row.value for row in roots])
+		self.assertTrue(all(row.get("label") for group in groups for row in group["data"]))
+
+	def test_subtree_orders_siblings_like_get_children(self):
+		company = self.company.name
+		parent = frappe.db.get_value("Account", {"company": company, "account_number": "411"})
+		# Unnumbered names whose case order differs from their codepoint order
+		for account_name in ("zeta Tree Test", "Alpha Tree Test", "beta Tree Test"):
+			frappe.get_doc(
+				{
+					"doctype": "Account",
+					"account_name": account_name,
+					"company": company,
+					"parent_account": parent,
+					"is_group": 0,
+				}
+			).insert(ignore_permissions=True)
+
+		groups = {group["parent"]: group["data"] for group in get_subtree(company, parent)}
+		children = get_children("Account", parent, company)
+		self.assertEqual([row.value for row in groups[parent]], [child.value for child in children])